@@ -1,9 +1,16 @@
+import base64
+import binascii
+import hashlib
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+import orjson
 
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel, Field
-
-from app.services.award_engine import award_engine, Bid, AwardCriteria, AwardDecision
+from app.services.award_engine import award_engine, load_bid_table, Bid, AwardCriteria, AwardDecision
+from app.services.bid_table import BidTable
 from app.core.auth import get_current_user
 
 router = APIRouter()
@@ -13,42 +20,163 @@ class CompareBidsRequest(BaseModel):
     bids: List[Bid]
     criteria: AwardCriteria = Field(default_factory=AwardCriteria)
 
-@router.post("/compare", response_model=AwardDecision)
+def _inline_schema(model: type) -> dict:
+    """JSON schema for `model` with its $defs inlined, for use in openapi_extra."""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def resolve(node):
+        if isinstance(node, dict):
+            ref = node.get("$ref", "")
+            if ref.startswith("#/$defs/"):
+                return resolve(defs[ref.split("/")[-1]])
+            return {k: resolve(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [resolve(v) for v in node]
+        return node
+
+    return resolve(schema)
+
+# Documents the raw-body endpoints below, which decode CompareBidsRequest by hand
+_COMPARE_BODY_DOC = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": _inline_schema(CompareBidsRequest)}},
+    }
+}
+
+def _decode_compare_request(raw: bytes) -> Tuple[str, BidTable, AwardCriteria]:
+    """
+    Decode a CompareBidsRequest body without building a pydantic model per bid.
+
+    orjson parses the body, the small envelope (description, criteria) is
+    validated with pydantic, and bids go straight into a BidTable. Invalid
+    payloads produce the same 422 shape FastAPI would.
+    """
+    try:
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError as e:
+        raise RequestValidationError([{"type": "json_invalid", "loc": ("body",), "msg": f"JSON decode error: {e}", "input": None}])
+    if not isinstance(data, dict):
+        raise RequestValidationError([{"type": "model_attributes_type", "loc": ("body",), "msg": "Input should be an object", "input": None}])
+
+    errors = []
+    requirement = data.get("requirement_description")
+    if not isinstance(requirement, str):
+        errors.append({"type": "string_type", "loc": ("body", "requirement_description"), "msg": "Input should be a valid string", "input": requirement})
+
+    criteria = AwardCriteria()
+    try:
+        if data.get("criteria") is not None:
+            criteria = AwardCriteria.model_validate(data["criteria"])
+    except ValidationError as e:
+        errors.extend({**err, "loc": ("body", "criteria", *err["loc"])} for err in e.errors())
+
+    table = None
+    if "bids" not in data:
+        errors.append({"type": "missing", "loc": ("body", "bids"), "msg": "Field required", "input": None})
+    else:
+        try:
+            table = load_bid_table(data["bids"])
+        except ValidationError as e:
+            errors.extend({**err, "loc": ("body", "bids", *err["loc"])} for err in e.errors())
+
+    if errors:
+        raise RequestValidationError(errors)
+    return requirement, table, criteria
+
+@router.post("/compare", response_model=AwardDecision, openapi_extra=_COMPARE_BODY_DOC)
 async def compare_bids(
-    request: CompareBidsRequest,
+    request: Request,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Evaluate multiple bids for a requirement using the Strategic Decision Engine.
-    
+
     1. Scores bids based on Price (50%), Delivery (30%), Reputation (20%).
     2. Uses AI (GPT-OSS 120B) to generate a "Senior Procurement Officer" justification.
-    
+
     Returns the recommended winner, scores, and verbal reasoning.
     """
-    if len(request.bids) < 2:
+    requirement, bids, criteria = _decode_compare_request(await request.body())
+    if len(bids) < 2:
         raise HTTPException(status_code=400, detail="At least 2 bids are required for comparison.")
 
     try:
         decision = await award_engine.generate_recommendation(
-            requirement_desc=request.requirement_description, 
-            bids=request.bids, 
-            criteria=request.criteria
+            requirement_desc=requirement,
+            bids=bids,
+            criteria=criteria
         )
         return decision
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Award engine error: {str(e)}")
 
-@router.post("/score-only")
+# Rows per chunk written to the NDJSON stream
+_STREAM_CHUNK_ROWS = 500
+
+def _payload_fingerprint(raw: bytes) -> str:
+    return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+def _encode_cursor(offset: int, fingerprint: str) -> str:
+    return base64.urlsafe_b64encode(f"{offset}:{fingerprint}".encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str, fingerprint: str) -> int:
+    """Return the rank offset stored in `cursor`; it must belong to the same bid set."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset_str, cursor_fp = base64.urlsafe_b64decode(padded).decode().split(":", 1)
+        offset = int(offset_str)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if cursor_fp != fingerprint or offset < 0:
+        raise HTTPException(status_code=400, detail="Cursor does not belong to this bid set.")
+    return offset
+
+@router.post("/score-only", openapi_extra=_COMPARE_BODY_DOC)
 async def score_bids_only(
-    request: CompareBidsRequest,
+    request: Request,
+    format: Literal["json", "ndjson"] = Query("json", description="'ndjson' streams one compact ranked row per line"),
+    top_k: Optional[int] = Query(None, ge=1, description="Only rank the best K bids"),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Page size; enables cursor pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Fast, math-only scoring without AI justification.
     Useful for quick sorting or real-time UI updates.
+
+    For large comparisons use `format=ndjson` (or `Accept: application/x-ndjson`):
+    rows are streamed in rank order and only carry the bid id and computed
+    scores, not the echoed input. `top_k` caps the ranking and `limit`/`cursor`
+    page through it; the cursor only works with an identical request body.
     """
-    scored = award_engine.calculate_scores(request.bids, request.criteria)
-    return {
-        "ranked_bids": scored
-    }
+    raw = await request.body()
+    _, bids, criteria = _decode_compare_request(raw)
+    scored = award_engine.score_table(bids, criteria)
+
+    fingerprint = _payload_fingerprint(raw)
+    total = len(scored) if top_k is None else min(top_k, len(scored))
+    start = _decode_cursor(cursor, fingerprint) if cursor else 0
+    stop = total if limit is None else min(start + limit, total)
+    next_cursor = _encode_cursor(stop, fingerprint) if stop < total else None
+
+    if format == "ndjson" or "application/x-ndjson" in request.headers.get("accept", ""):
+        def stream() -> Iterator[bytes]:
+            rows = scored.iter_compact(start, stop)
+            while True:
+                chunk = b"".join(orjson.dumps(row) + b"\n" for row in islice(rows, _STREAM_CHUNK_ROWS))
+                if not chunk:
+                    break
+                yield chunk
+
+        headers = {"X-Total-Count": str(total)}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return StreamingResponse(stream(), media_type="application/x-ndjson", headers=headers)
+
+    body: Dict[str, Any] = {"ranked_bids": list(scored.iter_rows(start, stop))}
+    if top_k is not None or limit is not None or cursor:
+        body["total"] = total
+        body["next_cursor"] = next_cursor
+    return Response(content=orjson.dumps(body), media_type="application/json")
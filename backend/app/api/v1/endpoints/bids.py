@@ -2,9 +2,11 @@
 from typing import List, Optional
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import structlog
+from app.core.exceptions import ConflictError
 from app.db.tenders_repo import tenders_repo
+from app.db.suppliers_repo import suppliers_repo
 
 logger = structlog.get_logger()
 
@@ -25,12 +27,14 @@ class TenderCreate(BaseModel):
 class BidCreate(BaseModel):
     contractor_name: str
     amount: float
+    delivery_days: Optional[int] = Field(None, ge=0, description="Quoted delivery time in days")
 
 class BidResponse(BaseModel):
     id: int
     tender_id: int
     contractor_name: str
     amount: float
+    delivery_days: Optional[int] = None
     status: str
     submitted_at: Optional[str]
 
@@ -97,7 +101,8 @@ async def place_bid(tender_id: int, body: BidCreate):
         return await tenders_repo.place_bid(
             tender_id=tender_id,
             contractor_name=body.contractor_name,
-            amount=body.amount
+            amount=body.amount,
+            delivery_days=body.delivery_days,
         )
     except HTTPException:
         raise
@@ -113,14 +118,44 @@ async def get_bids(tender_id: int):
         raise HTTPException(status_code=500, detail=str(e))
 
 from app.services.award_engine import award_engine, Bid as EngineBid, AwardCriteria, AwardDecision
-import random
+from app.services.award_batch import run_batch_analysis, BatchAwardSummary, BatchTenderResult
+from app.services.supplier_performance import to_engine_bid
+
+class BatchAnalyzeRequest(BaseModel):
+    tender_ids: List[int]
+    criteria: Optional[AwardCriteria] = None
+    max_concurrency: Optional[int] = None
+
+@router.post("/analyze-batch", response_model=BatchAwardSummary)
+async def analyze_tenders_batch(body: BatchAnalyzeRequest):
+    """
+    Run "Compare & Award" for many tenders in one job (e.g. month-end close).
+    Bids are fetched in one query, scored together, justified with bounded
+    LLM concurrency and persisted with a single bulk insert.
+    """
+    if not body.tender_ids:
+        raise HTTPException(status_code=400, detail="tender_ids must not be empty.")
+
+    def _log_progress(done: int, total: int, result: BatchTenderResult) -> None:
+        logger.info("Batch award progress", done=done, total=total, tender_id=result.tender_id, status=result.status)
+
+    try:
+        return await run_batch_analysis(
+            body.tender_ids,
+            criteria=body.criteria,
+            max_concurrency=body.max_concurrency,
+            on_progress=_log_progress,
+        )
+    except Exception as e:
+        logger.error(f"Batch analysis failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Batch analysis failed: {str(e)}")
 
 @router.post("/{tender_id}/analyze", response_model=AwardDecision)
 async def analyze_tender(tender_id: int):
     """
     Trigger the "Compare & Award" engine for a specific tender.
-    Fetches real bids from DB, simulates missing columns (delivery, reputation),
-    and runs the AI logic to pick a winner.
+    Fetches real bids from DB, fills delivery/reputation from each supplier's
+    performance profile, and runs the AI logic to pick a winner.
     """
     try:
         tender = await tenders_repo.get_tender_by_id(tender_id)
@@ -131,18 +166,9 @@ async def analyze_tender(tender_id: int):
         if len(db_bids) < 2:
             raise HTTPException(status_code=400, detail="Need at least 2 bids to compare.")
 
-        # Map DB bids to Engine Bids
-        # TODO: Add delivery_days and reputation to DB schema
-        engine_bids: List[EngineBid] = []
-        for b in list(db_bids):
-            engine_bids.append(EngineBid(
-                id=str(b["id"]),
-                supplier_name=b["contractor_name"],
-                price=float(b["amount"]),
-                delivery_days=random.randint(3, 14), # Simulated for now
-                reputation_score=round(float(random.uniform(3.5, 5.0)), 1), # Simulated
-                is_verified=True
-            ))
+        # Map DB bids to Engine Bids using persisted supplier performance
+        profiles = await suppliers_repo.get_profiles([b["contractor_name"] for b in db_bids])
+        engine_bids: List[EngineBid] = [to_engine_bid(b, profiles[b["contractor_name"]]) for b in db_bids]
 
         criteria = AwardCriteria(
             weight_price=0.5,
@@ -166,3 +192,25 @@ async def analyze_tender(tender_id: int):
     except Exception as e:
         logger.error(f"Analysis failed: {e}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+class AwardBidRequest(BaseModel):
+    bid_id: int
+
+@router.post("/{tender_id}/award", response_model=BidResponse)
+async def award_bid(tender_id: int, body: AwardBidRequest):
+    """
+    Accept a bid, close the tender and count the award towards the
+    supplier's performance profile.
+    """
+    try:
+        bid = await tenders_repo.award_bid(tender_id, body.bid_id)
+        if not bid:
+            raise HTTPException(status_code=404, detail="Bid not found on this tender")
+        await suppliers_repo.record_award(bid["contractor_name"])
+        return bid
+    except ConflictError as e:
+        raise HTTPException(status_code=409, detail=e.message)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,11 @@
 
+from typing import AsyncIterator
+
+import orjson
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from app.services.coordination_agent import coordination_agent, NotificationRequest, NotificationResult, Language, CommunicationStep
+from app.services.notification_batch import iter_notifications, BulkNotificationRequest
 from app.core.auth import get_current_user
 
 router = APIRouter()
@@ -22,3 +27,26 @@ async def generate_notification(
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Coordination agent error: {str(e)}")
+
+@router.post("/send-bulk")
+async def generate_notifications_bulk(
+    request: BulkNotificationRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Generate notifications for many recipients (e.g. every bidder after an award).
+
+    Streams NDJSON: one line per recipient as soon as its message is ready,
+    carrying its `index` in the request. Messages sharing a (step, language)
+    template are filled in from one translation; only free-form messages make
+    their own LLM call, with bounded concurrency.
+    """
+    async def stream() -> AsyncIterator[bytes]:
+        async for item in iter_notifications(request.notifications, request.max_concurrency):
+            yield orjson.dumps(item.model_dump(mode="json")) + b"\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        headers={"X-Total-Count": str(len(request.notifications))},
+    )
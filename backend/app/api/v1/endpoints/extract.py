@@ -1,7 +1,12 @@
+from typing import AsyncIterator
+
+import orjson
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from app.services.extraction_agent import extraction_agent, ExtractionResult
+from app.services.extraction_batch import BatchExtractionRequest, iter_extractions
 from app.core.auth import get_current_user
 
 router = APIRouter()
@@ -9,6 +14,10 @@ router = APIRouter()
 
 class ExtractRequest(BaseModel):
     ocr_text: str
+    # Skip the model when GSTIN (checksum-valid) and grand total are found locally
+    verification_only: bool = False
+    # Results are cached by normalised OCR text; false forces a fresh extraction
+    use_cache: bool = True
 
 
 @router.post("/", response_model=ExtractionResult)
@@ -23,7 +32,34 @@ async def extract_document(
     if not request.ocr_text or not request.ocr_text.strip():
         raise HTTPException(status_code=400, detail="ocr_text is required")
     try:
-        result = await extraction_agent.extract_invoice_data(request.ocr_text.strip())
+        result = await extraction_agent.extract_invoice_data(
+            request.ocr_text.strip(),
+            verification_only=request.verification_only,
+            use_cache=request.use_cache,
+        )
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Extraction failed: {str(e)}")
+
+
+@router.post("/batch")
+async def extract_documents_batch(
+    request: BatchExtractionRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Extract many documents (receipts, WhatsApp screenshots) at once.
+
+    Streams NDJSON: one line per document as soon as it is extracted,
+    carrying its `index` in the request. Short documents are packed several
+    to a model call; any the packed response misses are retried singly.
+    """
+    async def stream() -> AsyncIterator[bytes]:
+        async for item in iter_extractions(request.documents, request.max_concurrency):
+            yield orjson.dumps(item.model_dump(mode="json")) + b"\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        headers={"X-Total-Count": str(len(request.documents))},
+    )
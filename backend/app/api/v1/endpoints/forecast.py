@@ -1,6 +1,9 @@
 
-from fastapi import APIRouter, HTTPException, Depends
-from app.services.price_forecast import price_forecast_service, ForecastRequest, ForecastResult
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import JSONResponse
+from app.services.price_forecast import price_forecast_service, ForecastRequest, ForecastResult, MaterialType, Region
+from app.services.boq_pricing import price_boq, BOQRequest, BOQResult
+from app.services.market_data import market_data_service
 from app.core.auth import get_current_user
 
 router = APIRouter()
@@ -12,9 +15,9 @@ async def analyze_price_trend(
 ):
     """
     Generate a material price forecast and lock-rate recommendation.
-    
-    1. Analyzes historical trends (mocked for Phase 3).
-    2. Uses DeepSeek-R1 70B (Quantitative Analyst) to evaluate market conditions.
+
+    1. Reads the nightly precomputed forecast (Holt-Winters + DeepSeek-R1 70B commentary).
+    2. Computes the margin/quantity-specific cost impact and breach probability.
     3. Recommends "LOCK" or "WAIT" to protect developer margins.
     """
     try:
@@ -22,3 +25,51 @@ async def analyze_price_trend(
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Forecast engine error: {str(e)}")
+
+@router.post("/boq", response_model=BOQResult)
+async def analyze_boq(
+    request: BOQRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Price a whole bill of quantities against the market and the 30-day forecast.
+
+    Every line comes from the same batched Holt-Winters fit; per-line and total
+    costs carry forecast intervals, and the narrative is one LLM call for the BOQ.
+    """
+    try:
+        return await price_boq(request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"BOQ pricing error: {str(e)}")
+
+@router.get("/price-matrix")
+async def price_matrix(
+    request: Request,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Current price, 7-day change and trend for every material in every region.
+
+    One call for the whole dashboard. The ETag follows the market data date,
+    so reloads with If-None-Match get a 304 until new prices arrive.
+    """
+    try:
+        matrix = await market_data_service.get_price_matrix(
+            [m.value for m in MaterialType], [r.value for r in Region]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Price matrix error: {str(e)}")
+
+    etag = matrix.pop("etag")
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(matrix, headers=headers)
+
+@router.get("/cache-stats")
+async def market_data_cache_stats(current_user: dict = Depends(get_current_user)):
+    """
+    Hit/miss and eviction counters for the market price-series cache.
+    """
+    return market_data_service.cache_stats()
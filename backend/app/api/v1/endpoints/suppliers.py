@@ -0,0 +1,55 @@
+from typing import Any, Dict
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from app.core.exceptions import ConflictError
+from app.db.suppliers_repo import suppliers_repo
+
+router = APIRouter()
+
+
+class DeliveryEvent(BaseModel):
+    bid_id: int
+    actual_delivery_days: int = Field(..., ge=0)
+
+
+class DisputeEvent(BaseModel):
+    bid_id: int
+
+
+@router.get("/{supplier_name}/performance")
+async def get_supplier_performance(supplier_name: str) -> Dict[str, Any]:
+    """On-time rate, average delivery, disputes and derived reputation for a supplier."""
+    try:
+        profile = await suppliers_repo.get_profile(supplier_name)
+        return profile.summary()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/deliveries")
+async def record_delivery(event: DeliveryEvent) -> Dict[str, Any]:
+    """Record the actual delivery time of an awarded bid (once per bid); 409 if the bid wasn't awarded."""
+    try:
+        profile = await suppliers_repo.record_delivery(event.bid_id, event.actual_delivery_days)
+    except ConflictError as e:
+        raise HTTPException(status_code=409, detail=e.message)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Bid not found or delivery already recorded")
+    return profile.summary()
+
+
+@router.post("/disputes")
+async def record_dispute(event: DisputeEvent) -> Dict[str, Any]:
+    """Flag an awarded bid as disputed and update the supplier's dispute count; 409 if it wasn't awarded."""
+    try:
+        profile = await suppliers_repo.record_dispute(event.bid_id)
+    except ConflictError as e:
+        raise HTTPException(status_code=409, detail=e.message)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Bid not found or already disputed")
+    return profile.summary()
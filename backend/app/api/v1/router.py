@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import ai, award, forecast, coordination, projects, extract, transcribe, bids
+from app.api.v1.endpoints import ai, award, forecast, coordination, projects, extract, transcribe, bids, suppliers
 
 api_router = APIRouter()
 api_router.include_router(ai.router, prefix="/ai", tags=["ai"])
@@ -10,3 +10,4 @@ api_router.include_router(projects.router, prefix="/projects", tags=["projects"]
 api_router.include_router(extract.router, prefix="/extract", tags=["extract"])
 api_router.include_router(transcribe.router, prefix="/transcribe", tags=["transcribe"])
 api_router.include_router(bids.router, prefix="/bids", tags=["bids"])
+api_router.include_router(suppliers.router, prefix="/suppliers", tags=["suppliers"])
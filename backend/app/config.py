@@ -67,7 +67,76 @@ class Settings(BaseSettings):
     CIRCUIT_BREAKER_LATENCY_THRESHOLD_MS: int = 5000   # 5s as per roadmap
     CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 3
     CIRCUIT_BREAKER_RECOVERY_TIMEOUT_S: int = 60
-    
+
+    # Batch Award Analysis
+    # Max in-flight GPT-OSS 120B justification calls per batch run. Groq's
+    # per-key RPM on the 120B tier is low, so keep this near 2 x number of keys.
+    AWARD_BATCH_MAX_CONCURRENCY: int = 4
+
+    # Market Data
+    # Price series cached per (material, region, IST date); shorter windows
+    # are sliced from the longest series fetched.
+    MARKET_DATA_CACHE_MAX_ENTRIES: int = 512
+    MARKET_DATA_CACHE_TTL_S: int = 6 * 3600
+    # Directory for the memory-mapped daily price store (unset = regenerate on demand)
+    PRICE_STORE_DIR: Optional[str] = None
+    # Live price provider (unset = deterministic simulator)
+    PRICE_API_BASE_URL: Optional[str] = None
+    PRICE_API_KEY: str = ""
+    PRICE_API_TIMEOUT_S: float = 10.0
+    PRICE_API_MAX_CONNECTIONS: int = 20
+    # Max (material, region) pairs fetched at once when fanning out
+    PRICE_API_MAX_CONCURRENCY: int = 8
+
+    # Price Forecasts
+    # Nightly job: max in-flight DeepSeek-R1 commentary calls
+    FORECAST_PRECOMPUTE_MAX_CONCURRENCY: int = 3
+    # How often API processes re-read precomputed forecasts from the store
+    FORECAST_CACHE_REFRESH_S: int = 300
+
+    # Coordination
+    # Translate each (step, language) intent template once and fill values
+    # locally; free-form steps (defect notices) always go to the LLM
+    COORDINATION_TEMPLATE_CACHE: bool = True
+    # Bulk fan-out: in-flight Llama 3.3 calls allowed per configured Groq key
+    # (the budget scales with the keys the rotator can spread load over)
+    COORDINATION_BULK_CONCURRENCY_PER_KEY: int = 2
+
+    # Extraction
+    # OCR text longer than this is extracted in page/table-aligned chunks
+    EXTRACTION_CHUNK_CHARS: int = 6000
+    EXTRACTION_CHUNK_MAX_CONCURRENCY: int = 4
+    # Results cached by normalised OCR text hash (in memory, then extraction_results)
+    EXTRACTION_CACHE: bool = True
+    EXTRACTION_CACHE_MAX_ENTRIES: int = 2048
+    # Batched extraction: short documents are packed several to a model call
+    EXTRACTION_BATCH_DOC_CHARS: int = 1500
+    EXTRACTION_BATCH_MAX_DOCS: int = 8
+    EXTRACTION_BATCH_CHARS: int = 6000
+    EXTRACTION_BATCH_MAX_CONCURRENCY: int = 4
+
+    # OCR
+    AZURE_VISION_ENDPOINT: str = ""
+    AZURE_VISION_KEY: str = ""
+    # Pooled connections to the Read API, shared by all in-flight documents
+    AZURE_VISION_MAX_CONNECTIONS: int = 16
+    # Tesseract worker processes (0: one per core)
+    OCR_PROCESSES: int = 0
+    # PDFs: pages with at least this many text characters skip OCR; the rest
+    # are rasterised at OCR_PDF_DPI (300 is Tesseract's sweet spot for body text)
+    OCR_PDF_TEXT_MIN_CHARS: int = 25
+    OCR_PDF_DPI: int = 300
+    OCR_PDF_MAX_CONCURRENCY: int = 4
+    # Rotate, grayscale, downscale (an A4 page at OCR_PREPROCESS_DPI), crop and
+    # binarise images before OCR; COMPARE also OCRs the original and keeps the
+    # more confident result, to check the effect on accuracy
+    OCR_PREPROCESS: bool = True
+    OCR_PREPROCESS_DPI: int = 300
+    OCR_PREPROCESS_COMPARE: bool = False
+    # Dedup of uploaded images: an image whose decoded pixels are identical to
+    # an already-OCRed image in the same org reuses its OCR
+    IMAGE_DEDUP: bool = True
+
     # Pinecone
     PINECONE_API_KEY: str = ""
     PINECONE_ENVIRONMENT: str = "us-east-1"
@@ -23,3 +23,14 @@ class UnauthorizedError(AppException):
             status_code=401,
             details=details or {},
         )
+
+
+class ConflictError(AppException):
+    """Raised when a request conflicts with the current state of a resource."""
+    def __init__(self, message: str = "Conflict", details: dict = None):
+        super().__init__(
+            message=message,
+            error_code="CONFLICT",
+            status_code=409,
+            details=details or {},
+        )
@@ -0,0 +1,38 @@
+import json
+import structlog
+from typing import Any, Dict, Optional
+from app.db.session import get_db_pool
+
+logger = structlog.get_logger()
+
+class ExtractionsRepository:
+    """
+    Data access layer for `extraction_results`: one ExtractionResult payload
+    per (normalised OCR text hash, extraction version).
+    """
+
+    async def get_result(self, text_hash: str, version: str) -> Optional[Dict[str, Any]]:
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            payload = await conn.fetchval(
+                "SELECT payload_json FROM extraction_results WHERE text_hash = $1 AND version = $2",
+                text_hash, version,
+            )
+        if payload is None:
+            return None
+        return json.loads(payload) if isinstance(payload, str) else payload
+
+    async def save_result(self, text_hash: str, version: str, payload: Dict[str, Any]) -> None:
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO extraction_results (text_hash, version, payload_json, created_at)
+                VALUES ($1, $2, $3::jsonb, NOW())
+                ON CONFLICT (text_hash, version) DO UPDATE
+                SET payload_json = EXCLUDED.payload_json, created_at = NOW()
+                """,
+                text_hash, version, json.dumps(payload),
+            )
+
+extractions_repo = ExtractionsRepository()
@@ -0,0 +1,55 @@
+import structlog
+from typing import Any, Dict, Optional
+from app.db.session import get_db_pool
+
+logger = structlog.get_logger()
+
+class FingerprintsRepository:
+    """
+    Data access layer for `image_fingerprints`: one content hash (of the
+    decoded pixels) per uploaded image, indexed per org for exact-copy lookups.
+    """
+
+    async def find_original(self, org_id: Optional[str], content_hash: bytes, exclude_id: str) -> Optional[Dict[str, Any]]:
+        """The earliest original (non-duplicate) document of the org with identical pixels and completed OCR."""
+        # Spelled out for NULL orgs so both forms can use the (org_id, content_hash) index
+        org_clause = "f.org_id = $3" if org_id is not None else "f.org_id IS NULL AND $3::uuid IS NULL"
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(
+                f"""
+                SELECT f.document_id, d.ocr_text, d.ocr_confidence
+                FROM image_fingerprints f
+                JOIN documents d ON d.id = f.document_id
+                WHERE {org_clause}
+                  AND f.content_hash = $1
+                  AND f.duplicate_of IS NULL
+                  AND f.document_id <> $2
+                  AND d.ocr_status = 'completed'
+                ORDER BY f.created_at
+                LIMIT 1
+                """,
+                content_hash, exclude_id, org_id,
+            )
+        return dict(row) if row else None
+
+    async def save_fingerprint(
+        self,
+        document_id: str,
+        org_id: Optional[str],
+        content_hash: bytes,
+        duplicate_of: Optional[str] = None,
+    ) -> None:
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO image_fingerprints (document_id, org_id, content_hash, duplicate_of, created_at)
+                VALUES ($1, $2, $3, $4, NOW())
+                ON CONFLICT (document_id) DO UPDATE
+                SET content_hash = EXCLUDED.content_hash, duplicate_of = EXCLUDED.duplicate_of
+                """,
+                document_id, org_id, content_hash, duplicate_of,
+            )
+
+fingerprints_repo = FingerprintsRepository()
@@ -0,0 +1,47 @@
+import json
+import structlog
+from datetime import date
+from typing import List, Dict, Any
+from app.db.session import get_db_pool
+
+logger = structlog.get_logger()
+
+class ForecastsRepository:
+    """
+    Data access layer for `price_forecasts`: one precomputed forecast payload
+    per (IST market day, material, region), written by the nightly job.
+    """
+
+    async def save_forecasts(self, forecasts: List[Dict[str, Any]]) -> int:
+        """Upsert forecast payloads (each must carry as_of, material, region). Returns rows written."""
+        if not forecasts:
+            return 0
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO price_forecasts (as_of, material, region, payload_json, created_at)
+                SELECT *, NOW() FROM unnest($1::date[], $2::text[], $3::text[], $4::jsonb[])
+                ON CONFLICT (as_of, material, region) DO UPDATE
+                SET payload_json = EXCLUDED.payload_json, created_at = NOW()
+                """,
+                [date.fromisoformat(f["as_of"]) for f in forecasts],
+                [f["material"] for f in forecasts],
+                [f["region"] for f in forecasts],
+                [json.dumps(f) for f in forecasts],
+            )
+        return len(forecasts)
+
+    async def get_latest_forecasts(self) -> List[Dict[str, Any]]:
+        """Payloads from the most recent day that has any forecasts."""
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT payload_json FROM price_forecasts
+                WHERE as_of = (SELECT MAX(as_of) FROM price_forecasts)
+                """
+            )
+        return [json.loads(r["payload_json"]) if isinstance(r["payload_json"], str) else r["payload_json"] for r in rows]
+
+forecasts_repo = ForecastsRepository()
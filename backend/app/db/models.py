@@ -27,6 +27,7 @@ class AwardDecision(Base):
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, default=datetime.datetime.utcnow)
     project_id = Column(String, index=True, nullable=True) # If we have project IDs
+    tender_id = Column(Integer, index=True, nullable=True) # Set by batch award runs
     winner_bid_id = Column(String)
     winner_supplier = Column(String)
     score = Column(Float)
@@ -87,6 +87,34 @@ class Repository:
         except Exception as e:
             logger.error("Failed to persist award decision", error=str(e))
 
+    async def save_award_decisions_bulk(self, decisions: List[Dict[str, Any]]) -> int:
+        """
+        Persist many award decisions with a single INSERT ... SELECT FROM unnest(...).
+        Each dict carries: tender_id, project_id, winner_bid_id, winner_supplier,
+        score, justification, rankings.
+        """
+        if not decisions:
+            return 0
+        now = datetime.utcnow()
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO award_decisions (tender_id, project_id, timestamp, winner_bid_id, winner_supplier, score, justification, rankings_json)
+                SELECT * FROM unnest($1::int[], $2::text[], $3::timestamp[], $4::text[], $5::text[], $6::numeric[], $7::text[], $8::jsonb[])
+                """,
+                [d.get("tender_id") for d in decisions],
+                [d.get("project_id") for d in decisions],
+                [now] * len(decisions),
+                [d["winner_bid_id"] for d in decisions],
+                [d["winner_supplier"] for d in decisions],
+                [d["score"] for d in decisions],
+                [d["justification"] for d in decisions],
+                [json.dumps(d["rankings"]) for d in decisions],
+            )
+        logger.info("Award decisions bulk-saved to DB", count=len(decisions))
+        return len(decisions)
+
     # -------------------------------------------------------------------------
     # Projects
     # -------------------------------------------------------------------------
@@ -0,0 +1,144 @@
+import structlog
+from typing import Optional, List, Dict, Any
+from app.core.exceptions import ConflictError
+from app.db.session import get_db_pool
+from app.services.supplier_performance import SupplierProfile
+
+logger = structlog.get_logger()
+
+_PROFILE_COLUMNS = "supplier_name, awards_count, deliveries_count, on_time_count, total_delivery_days, dispute_count"
+
+def _row_to_profile(row) -> SupplierProfile:
+    return SupplierProfile(
+        supplier_name=row["supplier_name"],
+        awards_count=row["awards_count"],
+        deliveries_count=row["deliveries_count"],
+        on_time_count=row["on_time_count"],
+        total_delivery_days=row["total_delivery_days"],
+        dispute_count=row["dispute_count"],
+    )
+
+async def _ensure_awarded(conn, bid_id: int) -> None:
+    """Raise ConflictError if the bid exists but wasn't awarded; only awarded bids feed performance."""
+    status = await conn.fetchval("SELECT status FROM bids WHERE id = $1", bid_id)
+    if status is not None and status != "Accepted":
+        raise ConflictError("Bid was not awarded", {"bid_id": bid_id, "status": status})
+
+class SupplierPerformanceRepository:
+    """
+    Data access layer for the `supplier_performance` summary table.
+
+    Aggregates are maintained incrementally with UPSERTs when events happen,
+    so reads during scoring are primary-key lookups instead of scans over
+    bid history.
+    """
+
+    async def get_profiles(self, supplier_names: List[str]) -> Dict[str, SupplierProfile]:
+        """Fetch profiles for many suppliers in one query. Unknown suppliers get empty profiles."""
+        names = list(dict.fromkeys(supplier_names))
+        if not names:
+            return {}
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                f"SELECT {_PROFILE_COLUMNS} FROM supplier_performance WHERE supplier_name = ANY($1::text[])",
+                names,
+            )
+        profiles = {r["supplier_name"]: _row_to_profile(r) for r in rows}
+        for name in names:
+            profiles.setdefault(name, SupplierProfile(supplier_name=name))
+        return profiles
+
+    async def get_profile(self, supplier_name: str) -> SupplierProfile:
+        return (await self.get_profiles([supplier_name]))[supplier_name]
+
+    async def record_award(self, supplier_name: str) -> SupplierProfile:
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(
+                f"""
+                INSERT INTO supplier_performance (supplier_name, awards_count, updated_at)
+                VALUES ($1, 1, NOW())
+                ON CONFLICT (supplier_name) DO UPDATE
+                SET awards_count = supplier_performance.awards_count + 1, updated_at = NOW()
+                RETURNING {_PROFILE_COLUMNS}
+                """,
+                supplier_name,
+            )
+            return _row_to_profile(row)
+
+    async def record_delivery(self, bid_id: int, actual_delivery_days: int) -> Optional[SupplierProfile]:
+        """
+        Record the delivery of an awarded bid and fold it into the supplier's aggregates.
+        Returns None if the bid does not exist or its delivery was already recorded;
+        raises ConflictError if the bid wasn't awarded.
+        """
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                bid = await conn.fetchrow(
+                    """
+                    UPDATE bids
+                    SET actual_delivery_days = $2, delivered_at = NOW()
+                    WHERE id = $1 AND status = 'Accepted' AND actual_delivery_days IS NULL
+                    RETURNING contractor_name, delivery_days
+                    """,
+                    bid_id,
+                    actual_delivery_days,
+                )
+                if not bid:
+                    await _ensure_awarded(conn, bid_id)
+                    return None
+                promised = bid["delivery_days"]
+                on_time = 1 if promised is None or actual_delivery_days <= promised else 0
+                row = await conn.fetchrow(
+                    f"""
+                    INSERT INTO supplier_performance (supplier_name, deliveries_count, on_time_count, total_delivery_days, updated_at)
+                    VALUES ($1, 1, $2, $3, NOW())
+                    ON CONFLICT (supplier_name) DO UPDATE
+                    SET deliveries_count = supplier_performance.deliveries_count + 1,
+                        on_time_count = supplier_performance.on_time_count + EXCLUDED.on_time_count,
+                        total_delivery_days = supplier_performance.total_delivery_days + EXCLUDED.total_delivery_days,
+                        updated_at = NOW()
+                    RETURNING {_PROFILE_COLUMNS}
+                    """,
+                    bid["contractor_name"],
+                    on_time,
+                    actual_delivery_days,
+                )
+                return _row_to_profile(row)
+
+    async def record_dispute(self, bid_id: int) -> Optional[SupplierProfile]:
+        """
+        Flag an awarded bid as disputed (once) and bump the supplier's dispute count.
+        Returns None if the bid does not exist or is already disputed; raises
+        ConflictError if the bid wasn't awarded.
+        """
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                bid = await conn.fetchrow(
+                    """
+                    UPDATE bids SET disputed = TRUE
+                    WHERE id = $1 AND status = 'Accepted' AND NOT COALESCE(disputed, FALSE)
+                    RETURNING contractor_name
+                    """,
+                    bid_id,
+                )
+                if not bid:
+                    await _ensure_awarded(conn, bid_id)
+                    return None
+                row = await conn.fetchrow(
+                    f"""
+                    INSERT INTO supplier_performance (supplier_name, dispute_count, updated_at)
+                    VALUES ($1, 1, NOW())
+                    ON CONFLICT (supplier_name) DO UPDATE
+                    SET dispute_count = supplier_performance.dispute_count + 1, updated_at = NOW()
+                    RETURNING {_PROFILE_COLUMNS}
+                    """,
+                    bid["contractor_name"],
+                )
+                return _row_to_profile(row)
+
+# Global instance
+suppliers_repo = SupplierPerformanceRepository()
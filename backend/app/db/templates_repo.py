@@ -0,0 +1,34 @@
+import structlog
+from typing import Optional
+from app.db.session import get_db_pool
+
+logger = structlog.get_logger()
+
+class MessageTemplatesRepository:
+    """
+    Data access layer for `message_templates`: translated notification
+    templates with {placeholders}, keyed by (step, language, version).
+    """
+
+    async def get_template(self, step: str, language: str, version: str) -> Optional[str]:
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            return await conn.fetchval(
+                "SELECT template FROM message_templates WHERE step = $1 AND language = $2 AND version = $3",
+                step, language, version,
+            )
+
+    async def save_template(self, step: str, language: str, version: str, template: str) -> None:
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO message_templates (step, language, version, template, created_at)
+                VALUES ($1, $2, $3, $4, NOW())
+                ON CONFLICT (step, language, version) DO UPDATE
+                SET template = EXCLUDED.template, created_at = NOW()
+                """,
+                step, language, version, template,
+            )
+
+templates_repo = MessageTemplatesRepository()
@@ -3,6 +3,7 @@ import structlog
 import json
 from datetime import datetime
 from typing import Optional, List, Dict, Any
+from app.core.exceptions import ConflictError
 from app.db.session import get_db_pool
 
 logger = structlog.get_logger()
@@ -27,6 +28,7 @@ def _row_to_bid(row) -> Dict[str, Any]:
         "tender_id": row["tender_id"],
         "contractor_name": row["contractor_name"],
         "amount": row["amount"],
+        "delivery_days": row.get("delivery_days"),
         "status": row["status"],
         "submitted_at": row["submitted_at"].isoformat() if row.get("submitted_at") else None,
     }
@@ -99,21 +101,72 @@ class TendersRepository:
         tender_id: int,
         contractor_name: str,
         amount: float,
+        delivery_days: Optional[int] = None,
     ) -> Dict[str, Any]:
         pool = get_db_pool()
         async with pool.acquire() as conn:
             row = await conn.fetchrow(
                 """
-                INSERT INTO bids (tender_id, contractor_name, amount, status, submitted_at)
-                VALUES ($1, $2, $3, 'Pending', NOW())
-                RETURNING id, tender_id, contractor_name, amount, status, submitted_at
+                INSERT INTO bids (tender_id, contractor_name, amount, delivery_days, status, submitted_at)
+                VALUES ($1, $2, $3, $4, 'Pending', NOW())
+                RETURNING id, tender_id, contractor_name, amount, delivery_days, status, submitted_at
                 """,
                 tender_id,
                 contractor_name,
                 amount,
+                delivery_days,
             )
             return _row_to_bid(row)
 
+    async def award_bid(self, tender_id: int, bid_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Accept one bid, reject the rest and close the tender. Returns None if
+        the bid isn't on this tender; raises ConflictError if the tender is
+        already closed or has an accepted bid.
+        """
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                # Lock the tender so concurrent awards on it run one at a time
+                tender = await conn.fetchrow(
+                    "SELECT status FROM tenders WHERE id = $1 FOR UPDATE",
+                    tender_id,
+                )
+                if not tender:
+                    return None
+                if tender["status"] == "Closed":
+                    raise ConflictError("Tender is already closed", {"tender_id": tender_id})
+                accepted = await conn.fetchval(
+                    "SELECT id FROM bids WHERE tender_id = $1 AND status = 'Accepted' LIMIT 1",
+                    tender_id,
+                )
+                if accepted is not None:
+                    raise ConflictError(
+                        "Tender already has an accepted bid",
+                        {"tender_id": tender_id, "bid_id": accepted},
+                    )
+                row = await conn.fetchrow(
+                    """
+                    UPDATE bids SET status = 'Accepted'
+                    WHERE id = $1 AND tender_id = $2
+                    RETURNING *
+                    """,
+                    bid_id,
+                    tender_id,
+                )
+                if not row:
+                    return None
+                await conn.execute(
+                    "UPDATE bids SET status = 'Rejected' WHERE tender_id = $1 AND id <> $2",
+                    tender_id,
+                    bid_id,
+                )
+                await conn.execute(
+                    "UPDATE tenders SET status = 'Closed' WHERE id = $1",
+                    tender_id,
+                )
+                return _row_to_bid(row)
+
     async def get_bids_for_tender(self, tender_id: int) -> List[Dict[str, Any]]:
         pool = get_db_pool()
         async with pool.acquire() as conn:
@@ -123,5 +176,50 @@ class TendersRepository:
             )
             return [_row_to_bid(r) for r in rows]
 
+    async def get_tenders_by_ids(self, tender_ids: List[int]) -> List[Dict[str, Any]]:
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT t.*, COUNT(b.id) as bid_count 
+                FROM tenders t
+                LEFT JOIN bids b ON t.id = b.tender_id
+                WHERE t.id = ANY($1::int[])
+                GROUP BY t.id
+                ORDER BY t.id
+                """,
+                tender_ids,
+            )
+            return [_row_to_tender(r) for r in rows]
+
+    async def list_tender_ids(self, status: Optional[str] = None) -> List[int]:
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            if status:
+                rows = await conn.fetch(
+                    "SELECT id FROM tenders WHERE status = $1 ORDER BY id",
+                    status,
+                )
+            else:
+                rows = await conn.fetch("SELECT id FROM tenders ORDER BY id")
+            return [r["id"] for r in rows]
+
+    async def get_bids_for_tenders(self, tender_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """Fetch the bids of many tenders in a single query, grouped by tender."""
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT * FROM bids
+                WHERE tender_id = ANY($1::int[])
+                ORDER BY tender_id, amount ASC
+                """,
+                tender_ids,
+            )
+        grouped: Dict[int, List[Dict[str, Any]]] = {tid: [] for tid in tender_ids}
+        for r in rows:
+            grouped.setdefault(r["tender_id"], []).append(_row_to_bid(r))
+        return grouped
+
 # Global instance
 tenders_repo = TendersRepository()
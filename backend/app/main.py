@@ -53,6 +53,8 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Shutting down BuildBidz API")
+    from app.services.market_data import market_data_service
+    await market_data_service.aclose()
     await close_db()
 
 
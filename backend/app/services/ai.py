@@ -1,4 +1,5 @@
 from typing import List, Dict, Any, Optional
+import asyncio
 import time
 import structlog
 from groq import Groq
@@ -279,7 +280,10 @@ class GroqService:
             
             start_time = time.monotonic()
             
-            completion = self.client.chat.completions.create(
+            # The Groq SDK client is synchronous; run it off the event loop so
+            # concurrent callers (batch jobs, fan-outs) actually overlap.
+            completion = await asyncio.to_thread(
+                self.client.chat.completions.create,
                 model=model,
                 messages=messages,
                 temperature=temperature,
@@ -0,0 +1,160 @@
+# =============================================================================
+# BuildBidz - Batch Award Analysis
+# =============================================================================
+# Runs the Compare & Award engine across many tenders at once (month-end
+# close). Bids are fetched in one query, scored in one vectorised pass,
+# justifications fan out to the LLM under a concurrency cap, and all
+# decisions are written with a single bulk insert.
+# =============================================================================
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+import structlog
+
+from app.config import settings
+from app.db.repository import repo
+from app.db.suppliers_repo import suppliers_repo
+from app.db.tenders_repo import tenders_repo
+from app.services.ai import groq_service
+from app.services.award_engine import award_engine, AwardCriteria, AwardDecision, Bid
+from app.services.supplier_performance import to_engine_bid
+
+logger = structlog.get_logger()
+
+# =============================================================================
+# Data Models
+# =============================================================================
+
+class BatchTenderResult(BaseModel):
+    tender_id: int
+    status: str  # "awarded", "skipped", "failed"
+    decision: Optional[AwardDecision] = None
+    error: Optional[str] = None
+
+class BatchAwardSummary(BaseModel):
+    total: int
+    awarded: int
+    skipped: int
+    failed: int
+    persisted: int
+    duration_ms: float
+    results: List[BatchTenderResult]
+
+# Called after every tender finishes: (completed, total, result)
+ProgressCallback = Callable[[int, int, BatchTenderResult], None]
+
+# =============================================================================
+# Batch Runner
+# =============================================================================
+
+async def run_batch_analysis(
+    tender_ids: List[int],
+    criteria: Optional[AwardCriteria] = None,
+    max_concurrency: Optional[int] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> BatchAwardSummary:
+    """
+    Analyze and award many tenders in one run.
+
+    Tenders with fewer than 2 bids are skipped. A failed justification call
+    only fails its own tender; the rest of the batch is still persisted.
+    """
+    start = time.monotonic()
+    criteria = criteria or AwardCriteria(weight_price=0.5, weight_delivery=0.3, weight_reputation=0.2)
+    limit = max(1, max_concurrency or settings.AWARD_BATCH_MAX_CONCURRENCY)
+    tender_ids = list(dict.fromkeys(tender_ids))
+    total = len(tender_ids)
+    completed = 0
+
+    results: Dict[int, BatchTenderResult] = {}
+
+    def _finish(result: BatchTenderResult) -> None:
+        nonlocal completed
+        completed += 1
+        results[result.tender_id] = result
+        if on_progress:
+            on_progress(completed, total, result)
+
+    # 1. Fetch tenders, all their bids and the bidders' profiles (one query each)
+    tenders = {t["id"]: t for t in await tenders_repo.get_tenders_by_ids(tender_ids)}
+    bid_rows = await tenders_repo.get_bids_for_tenders(tender_ids)
+    profiles = await suppliers_repo.get_profiles(
+        [r["contractor_name"] for rows in bid_rows.values() for r in rows]
+    )
+
+    eligible: Dict[int, List[Bid]] = {}
+    for tid in tender_ids:
+        if tid not in tenders:
+            _finish(BatchTenderResult(tender_id=tid, status="skipped", error="Tender not found"))
+        elif len(bid_rows.get(tid, [])) < 2:
+            _finish(BatchTenderResult(tender_id=tid, status="skipped", error="Need at least 2 bids to compare."))
+        else:
+            eligible[tid] = [to_engine_bid(r, profiles.get(r["contractor_name"])) for r in bid_rows[tid]]
+
+    # 2. Score every eligible tender in one vectorised pass
+    ranked_by_tender = award_engine.score_tenders(eligible, criteria)
+
+    # 3. Fan out justification calls under the concurrency cap
+    semaphore = asyncio.Semaphore(limit)
+    to_persist: List[Dict[str, Any]] = []
+
+    async def _justify(tid: int) -> None:
+        tender = tenders[tid]
+        ranked = ranked_by_tender[tid]
+        messages = award_engine.build_justification_messages(
+            tender["description"] or tender["title"], ranked, criteria
+        )
+        try:
+            async with semaphore:
+                response = await groq_service.award_compare(messages, temperature=0.3)
+            justification = response.choices[0].message.content
+        except Exception as e:
+            logger.error("Batch award justification failed", tender_id=tid, error=str(e))
+            _finish(BatchTenderResult(tender_id=tid, status="failed", error=str(e)))
+            return
+
+        decision = award_engine.build_decision(ranked, justification, meta={"tender_id": tid, "batch": True})
+        to_persist.append({
+            "tender_id": tid,
+            "project_id": str(tender["project_id"]) if tender["project_id"] is not None else None,
+            "winner_bid_id": decision.recommended_bid_id,
+            "winner_supplier": ranked[0]["bid"].supplier_name,
+            "score": decision.score,
+            "justification": justification,
+            "rankings": decision.rankings,
+        })
+        _finish(BatchTenderResult(tender_id=tid, status="awarded", decision=decision))
+
+    await asyncio.gather(*(_justify(tid) for tid in eligible))
+
+    # 4. One bulk insert for the whole batch
+    persisted = 0
+    try:
+        persisted = await repo.save_award_decisions_bulk(to_persist)
+    except Exception as e:
+        logger.error("Failed to bulk-persist award decisions", count=len(to_persist), error=str(e))
+    for row in to_persist:
+        results[row["tender_id"]].decision.meta["persisted"] = persisted > 0
+
+    ordered = [results[tid] for tid in tender_ids]
+    summary = BatchAwardSummary(
+        total=total,
+        awarded=sum(1 for r in ordered if r.status == "awarded"),
+        skipped=sum(1 for r in ordered if r.status == "skipped"),
+        failed=sum(1 for r in ordered if r.status == "failed"),
+        persisted=persisted,
+        duration_ms=round((time.monotonic() - start) * 1000, 1),
+        results=ordered,
+    )
+    logger.info(
+        "Batch award analysis completed",
+        total=summary.total,
+        awarded=summary.awarded,
+        skipped=summary.skipped,
+        failed=summary.failed,
+        duration_ms=summary.duration_ms,
+    )
+    return summary
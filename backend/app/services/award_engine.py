@@ -6,12 +6,14 @@
 # for procurement decisions as defined in the AI Roadmap (2026).
 # =============================================================================
 
-from typing import List, Dict, Optional, Any
-from pydantic import BaseModel, Field
+from typing import List, Dict, Optional, Any, Hashable, Union
+from pydantic import BaseModel, Field, TypeAdapter
+import numpy as np
 import structlog
 import json
 
 from app.services.ai import groq_service
+from app.services.bid_table import BidTable, BidPayloadError, ScoredBids
 from app.core.model_config import TaskType
 
 logger = structlog.get_logger()
@@ -69,66 +71,108 @@ class AwardEngine:
         """
         if not bids:
             return []
+        return self.score_table(BidTable.from_bids(bids), criteria).ranked()
 
-        # Find ranges for normalization
-        prices = [b.price for b in bids]
-        min_price = min(prices)
-        max_price = max(prices)
-        price_range = max_price - min_price if max_price != min_price else 1
-
-        deliveries = [b.delivery_days for b in bids]
-        min_delivery = min(deliveries)
-        max_delivery = max(deliveries)
-        delivery_range = max_delivery - min_delivery if max_delivery != min_delivery else 1
-
-        scored_bids = []
-        for bid in bids:
-            # 1. Price Score (Lower is better) -> Invert
-            # 100 points for lowest price, 0 for highest
-            price_score = 100 * (1 - (bid.price - min_price) / price_range)
-            
-            # 2. Delivery Score (Lower is better) -> Invert
-            delivery_score = 100 * (1 - (bid.delivery_days - min_delivery) / delivery_range)
-            
-            # 3. Reputation Score (Higher is better) -> Scale 0-10 to 0-100
-            reputation_score = bid.reputation_score * 10
-            
-            # Final Weighted Score
-            final_score = (
-                (criteria.weight_price * price_score) +
-                (criteria.weight_delivery * delivery_score) +
-                (criteria.weight_reputation * reputation_score)
-            )
+    def score_table(self, table: BidTable, criteria: AwardCriteria) -> ScoredBids:
+        """
+        Score a column-oriented bid set without materialising per-bid objects.
+        This is the fast path for very large comparisons.
+        """
+        if not len(table):
+            empty = np.empty(0, dtype=np.float64)
+            return ScoredBids(table, np.empty(0, dtype=np.int64), empty, empty, empty, empty)
+        order, price_score, delivery_score, reputation_score, total, _ = self._score_columns(
+            table, np.array([len(table)], dtype=np.int64), criteria
+        )
+        return ScoredBids(table, order, price_score, delivery_score, reputation_score, total)
 
-            scored_bids.append({
-                "bid": bid,
-                "scores": {
-                    "price_raw": bid.price,
-                    "price_score": round(price_score, 1),
-                    "delivery_raw": bid.delivery_days,
-                    "delivery_score": round(delivery_score, 1),
-                    "reputation_raw": bid.reputation_score,
-                    "reputation_score": round(reputation_score, 1),
-                    "total": round(final_score, 1)
-                }
-            })
+    def score_tenders(
+        self,
+        bids_by_tender: Dict[Hashable, List[Bid]],
+        criteria: AwardCriteria,
+    ) -> Dict[Hashable, List[Dict[str, Any]]]:
+        """
+        Score the bids of many tenders in one vectorised pass.
+
+        Bids are flattened into contiguous per-tender segments so that the
+        min/max normalisation ranges can be computed with ``reduceat`` instead
+        of a Python loop per tender. Each tender's ranking is identical to what
+        ``calculate_scores`` returns for that tender alone.
+        """
+        keys = [k for k, b in bids_by_tender.items() if b]
+        ranked: Dict[Hashable, List[Dict[str, Any]]] = {k: [] for k in bids_by_tender}
+        if not keys:
+            return ranked
+
+        table = BidTable.from_bids([bid for k in keys for bid in bids_by_tender[k]])
+        counts = np.fromiter((len(bids_by_tender[k]) for k in keys), dtype=np.int64, count=len(keys))
+        order, price_score, delivery_score, reputation_score, total, group = self._score_columns(table, counts, criteria)
 
-        # Sort by total score descending
-        return sorted(scored_bids, key=lambda x: x["scores"]["total"], reverse=True)
+        # `order` is grouped by tender, so each tender is one contiguous slice
+        bounds = np.concatenate(([0], np.cumsum(counts))).tolist()
+        for g, key in enumerate(keys):
+            segment = order[bounds[g]:bounds[g + 1]]
+            ranked[key] = ScoredBids(table, segment, price_score, delivery_score, reputation_score, total).ranked()
+        return ranked
 
-    async def generate_recommendation(self, requirement_desc: str, bids: List[Bid], criteria: AwardCriteria) -> AwardDecision:
+    def _score_columns(self, table: BidTable, counts: np.ndarray, criteria: AwardCriteria):
         """
-        Full Analyze & Award workflow.
-        
-        1. Calculate math scores first (objective baseline).
-        2. Feed top 3 candidates to AI Model (GPT-OSS 120B) for narrative generation.
+        Vectorised scoring over contiguous groups of `counts` bids each.
+        Returns (order, price_score, delivery_score, reputation_score, total, group)
+        where `order` is sorted by group, then total descending.
+        """
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        group = np.repeat(np.arange(len(counts)), counts)
+
+        prices = table.prices
+        deliveries = table.delivery_days.astype(np.float64)
+        reputations = table.reputation_scores
+
+        # Per-group normalisation ranges, broadcast back to every bid
+        min_price = np.minimum.reduceat(prices, offsets)[group]
+        max_price = np.maximum.reduceat(prices, offsets)[group]
+        price_range = np.where(max_price != min_price, max_price - min_price, 1.0)
+
+        min_delivery = np.minimum.reduceat(deliveries, offsets)[group]
+        max_delivery = np.maximum.reduceat(deliveries, offsets)[group]
+        delivery_range = np.where(max_delivery != min_delivery, max_delivery - min_delivery, 1.0)
+
+        # 1. Price Score (Lower is better) -> Invert
+        price_raw_score = 100 * (1 - (prices - min_price) / price_range)
+        # 2. Delivery Score (Lower is better) -> Invert
+        delivery_raw_score = 100 * (1 - (deliveries - min_delivery) / delivery_range)
+        # 3. Reputation Score (Higher is better) -> Scale 0-10 to 0-100
+        reputation_raw_score = reputations * 10
+
+        final_score = (
+            criteria.weight_price * price_raw_score
+            + criteria.weight_delivery * delivery_raw_score
+            + criteria.weight_reputation * reputation_raw_score
+        )
+        total = np.round(final_score, 1)
+
+        # Group ascending, total descending; lexsort is stable so ties keep input order
+        order = np.lexsort((-total, group))
+        return (
+            order,
+            np.round(price_raw_score, 1),
+            np.round(delivery_raw_score, 1),
+            np.round(reputation_raw_score, 1),
+            total,
+            group,
+        )
+
+    def build_justification_messages(
+        self,
+        requirement_desc: str,
+        ranked_bids: List[Dict[str, Any]],
+        criteria: AwardCriteria,
+    ) -> List[Dict[str, str]]:
+        """
+        Build the "Senior Procurement Officer" prompt for a ranked bid list.
+        We only send the top 3 to the LLM to focus the reasoning.
         """
-        # 1. Math Scoring
-        ranked_bids = self.calculate_scores(bids, criteria)
         top_bid = ranked_bids[0]
-        
-        # 2. Prepare context for AI
-        # We only send the top 3 to the LLM to focus the reasoning
         candidates = ranked_bids[:3]
         
         candidate_summary = []
@@ -166,14 +210,68 @@ class AwardEngine:
         4. Be merit-based.
         """
         
-        messages = [
+        return [
             {"role": "user", "content": prompt_content}
         ]
 
+    def build_decision(
+        self,
+        ranked_bids: Union[List[Dict[str, Any]], ScoredBids],
+        justification: str,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> AwardDecision:
+        """Assemble the public AwardDecision from a ranked bid list or scored table."""
+        if isinstance(ranked_bids, ScoredBids):
+            rankings = ranked_bids.rankings()
+            top_bid_id = ranked_bids.table.ids[int(ranked_bids.order[0])]
+        else:
+            rankings = [
+                {
+                    "rank": i+1,
+                    "supplier": r["bid"].supplier_name,
+                    "total_score": r["scores"]["total"],
+                    "breakdown": r["scores"]
+                }
+                for i, r in enumerate(ranked_bids)
+            ]
+            top_bid_id = ranked_bids[0]["bid"].id
+        top = rankings[0]
+        # Every field is built from already-validated data; skip re-validating N rankings
+        return AwardDecision.model_construct(
+            recommended_bid_id=top_bid_id,
+            score=top["total_score"],
+            justification=justification,
+            rankings=rankings,
+            meta=meta or {}
+        )
+
+    async def generate_recommendation(
+        self,
+        requirement_desc: str,
+        bids: Union[List[Bid], BidTable],
+        criteria: AwardCriteria,
+    ) -> AwardDecision:
+        """
+        Full Analyze & Award workflow.
+        
+        1. Calculate math scores first (objective baseline).
+        2. Feed top 3 candidates to AI Model (GPT-OSS 120B) for narrative generation.
+        """
+        # 1. Math Scoring
+        table = bids if isinstance(bids, BidTable) else BidTable.from_bids(bids)
+        scored = self.score_table(table, criteria)
+        top_candidates = scored.ranked(limit=3)
+        top_bid = top_candidates[0]
+        
+        # 2. Prepare context for AI
+        messages = self.build_justification_messages(requirement_desc, top_candidates, criteria)
+
         # 3. AI Reasoning (via Router -> Model Award/GPT-OSS 120B)
         response = await groq_service.award_compare(messages, temperature=0.3)
         justification = response.choices[0].message.content
         
+        decision = self.build_decision(scored, justification, meta={"persisted": True})
+
         # 4. Persist Decision
         from app.db.repository import repo
         await repo.save_award_decision(
@@ -181,25 +279,31 @@ class AwardEngine:
             winner_supplier=top_bid["bid"].supplier_name,
             score=top_bid["scores"]["total"],
             justification=justification,
-            rankings=ranked_bids,
+            rankings=decision.rankings,
             project_id="PROJECT-123" # Placeholder for now
         )
         
-        return AwardDecision(
-            recommended_bid_id=top_bid["bid"].id,
-            score=top_bid["scores"]["total"],
-            justification=justification,
-            rankings=[
-                {
-                    "rank": i+1,
-                    "supplier": r["bid"].supplier_name,
-                    "total_score": r["scores"]["total"],
-                    "breakdown": r["scores"]
-                }
-                for i, r in enumerate(ranked_bids)
-            ],
-            meta={"persisted": True}
-        )
+        return decision
+
+# =============================================================================
+# Payload Decoding
+# =============================================================================
+
+_BID_LIST_ADAPTER = TypeAdapter(List[Bid])
+
+def load_bid_table(items: Any) -> BidTable:
+    """
+    Decode raw (JSON-parsed) bids into a BidTable.
+
+    Tries the strict vectorised decoder first; if the payload needs coercion
+    or is invalid, falls back to pydantic so accepted inputs and error
+    messages stay identical to validating `List[Bid]`. Raises
+    pydantic.ValidationError for invalid payloads.
+    """
+    try:
+        return BidTable.from_dicts(items)
+    except BidPayloadError:
+        return BidTable.from_bids(_BID_LIST_ADAPTER.validate_python(items))
 
 # Global Instance
 award_engine = AwardEngine()
@@ -0,0 +1,287 @@
+# =============================================================================
+# BuildBidz - Compact Bid Representation (Compare & Award fast path)
+# =============================================================================
+# Struct-of-arrays containers for large bid comparisons. Bids are decoded
+# straight from JSON into NumPy columns instead of one pydantic model plus
+# two nested dicts per bid; pydantic is only used at the API boundary when
+# the fast decoder cannot accept a payload as-is.
+# =============================================================================
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import orjson
+
+
+class BidPayloadError(ValueError):
+    """Raised when a bid payload doesn't fit the strict fast-path decoder."""
+
+
+class BidRow:
+    """Lightweight, attribute-compatible stand-in for a single `Bid`."""
+
+    __slots__ = ("id", "supplier_name", "price", "delivery_days", "reputation_score", "is_verified", "notes")
+
+    def __init__(
+        self,
+        id: str,
+        supplier_name: str,
+        price: float,
+        delivery_days: int,
+        reputation_score: float,
+        is_verified: bool = False,
+        notes: Optional[str] = None,
+    ):
+        self.id = id
+        self.supplier_name = supplier_name
+        self.price = price
+        self.delivery_days = delivery_days
+        self.reputation_score = reputation_score
+        self.is_verified = is_verified
+        self.notes = notes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class BidTable:
+    """Column-oriented bid set: one NumPy array per numeric field, lists for text."""
+
+    __slots__ = ("ids", "supplier_names", "prices", "delivery_days", "reputation_scores", "is_verified", "notes", "_source")
+
+    def __init__(
+        self,
+        ids: List[str],
+        supplier_names: List[str],
+        prices: np.ndarray,
+        delivery_days: np.ndarray,
+        reputation_scores: np.ndarray,
+        is_verified: List[bool],
+        notes: List[Optional[str]],
+        source: Optional[Sequence[Any]] = None,
+    ):
+        self.ids = ids
+        self.supplier_names = supplier_names
+        self.prices = prices
+        self.delivery_days = delivery_days
+        self.reputation_scores = reputation_scores
+        self.is_verified = is_verified
+        self.notes = notes
+        # Original Bid objects, when the table was built from them
+        self._source = source
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_bids(cls, bids: Sequence[Any]) -> "BidTable":
+        """Build a table from already-validated `Bid` objects (keeps them for `row`)."""
+        n = len(bids)
+        return cls(
+            ids=[b.id for b in bids],
+            supplier_names=[b.supplier_name for b in bids],
+            prices=np.fromiter((b.price for b in bids), dtype=np.float64, count=n),
+            delivery_days=np.fromiter((b.delivery_days for b in bids), dtype=np.int64, count=n),
+            reputation_scores=np.fromiter((b.reputation_score for b in bids), dtype=np.float64, count=n),
+            is_verified=[b.is_verified for b in bids],
+            notes=[b.notes for b in bids],
+            source=bids,
+        )
+
+    @classmethod
+    def from_dicts(cls, items: Any) -> "BidTable":
+        """
+        Strict, vectorised decode of a list of bid dicts.
+
+        Accepts only exact JSON types (no numeric strings, no 0/1 booleans).
+        Anything else raises BidPayloadError so the caller can fall back to
+        full pydantic validation for coercion and error reporting.
+        """
+        if not isinstance(items, list):
+            raise BidPayloadError("bids must be a list")
+        try:
+            ids = [d["id"] for d in items]
+            supplier_names = [d["supplier_name"] for d in items]
+            raw_prices = [d["price"] for d in items]
+            raw_delivery = [d["delivery_days"] for d in items]
+            raw_reputation = [d["reputation_score"] for d in items]
+            is_verified = [d.get("is_verified", False) for d in items]
+            notes = [d.get("notes") for d in items]
+        except (KeyError, TypeError, AttributeError) as e:
+            raise BidPayloadError(f"malformed bid: {e}") from e
+
+        if not all(type(x) is str for x in ids) or not all(type(x) is str for x in supplier_names):
+            raise BidPayloadError("id and supplier_name must be strings")
+        if not all(type(x) is bool for x in is_verified):
+            raise BidPayloadError("is_verified must be a boolean")
+        if not all(x is None or type(x) is str for x in notes):
+            raise BidPayloadError("notes must be a string or null")
+
+        prices = _numeric_column(raw_prices, "price")
+        delivery = _numeric_column(raw_delivery, "delivery_days")
+        reputation = _numeric_column(raw_reputation, "reputation_score")
+
+        if delivery.dtype.kind == "f":
+            if not np.all(np.isfinite(delivery)) or np.any(delivery != np.floor(delivery)):
+                raise BidPayloadError("delivery_days must be whole numbers")
+        if not np.all((reputation >= 0.0) & (reputation <= 10.0)):
+            raise BidPayloadError("reputation_score must be between 0 and 10")
+
+        return cls(
+            ids=ids,
+            supplier_names=supplier_names,
+            prices=prices.astype(np.float64, copy=False),
+            delivery_days=delivery.astype(np.int64, copy=False),
+            reputation_scores=reputation.astype(np.float64, copy=False),
+            is_verified=is_verified,
+            notes=notes,
+        )
+
+    @classmethod
+    def from_json(cls, payload: bytes) -> "BidTable":
+        """Decode a JSON array of bids with orjson straight into columns."""
+        try:
+            items = orjson.loads(payload)
+        except orjson.JSONDecodeError as e:
+            raise BidPayloadError(f"invalid JSON: {e}") from e
+        return cls.from_dicts(items)
+
+    def row(self, i: int) -> Any:
+        """The i-th bid as an attribute object (the original `Bid` if available)."""
+        if self._source is not None:
+            return self._source[i]
+        return BidRow(
+            id=self.ids[i],
+            supplier_name=self.supplier_names[i],
+            price=float(self.prices[i]),
+            delivery_days=int(self.delivery_days[i]),
+            reputation_score=float(self.reputation_scores[i]),
+            is_verified=self.is_verified[i],
+            notes=self.notes[i],
+        )
+
+
+def _numeric_column(values: List[Any], field: str) -> np.ndarray:
+    # A single str/None/nested entry makes NumPy infer a non-numeric dtype
+    arr = np.asarray(values) if values else np.empty(0, dtype=np.float64)
+    if arr.dtype.kind not in "iuf" or arr.ndim != 1:
+        raise BidPayloadError(f"{field} must be numeric")
+    return arr
+
+
+class ScoredBids:
+    """
+    Scores for a BidTable, kept as parallel arrays.
+
+    `order` holds table indices from best to worst; per-row dicts are only
+    materialised when a caller iterates over them.
+    """
+
+    __slots__ = ("table", "order", "price_score", "delivery_score", "reputation_score", "total")
+
+    def __init__(
+        self,
+        table: BidTable,
+        order: np.ndarray,
+        price_score: np.ndarray,
+        delivery_score: np.ndarray,
+        reputation_score: np.ndarray,
+        total: np.ndarray,
+    ):
+        self.table = table
+        self.order = order
+        self.price_score = price_score
+        self.delivery_score = delivery_score
+        self.reputation_score = reputation_score
+        self.total = total
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _score_dicts(self, indices: List[int]) -> Iterator[Dict[str, Any]]:
+        # Gather the selected rows with fancy indexing, then convert each
+        # column to Python scalars in one .tolist() call instead of per element
+        t = self.table
+        columns = zip(
+            t.prices[indices].tolist(),
+            self.price_score[indices].tolist(),
+            t.delivery_days[indices].tolist(),
+            self.delivery_score[indices].tolist(),
+            t.reputation_scores[indices].tolist(),
+            self.reputation_score[indices].tolist(),
+            self.total[indices].tolist(),
+        )
+        for price, price_score, delivery, delivery_score, reputation, reputation_score, total in columns:
+            yield {
+                "price_raw": price,
+                "price_score": price_score,
+                "delivery_raw": delivery,
+                "delivery_score": delivery_score,
+                "reputation_raw": reputation,
+                "reputation_score": reputation_score,
+                "total": total,
+            }
+
+    def ranked(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """`calculate_scores`-shaped rows: {"bid": <Bid-like>, "scores": {...}} best first."""
+        indices = self.order[:limit].tolist() if limit is not None else self.order.tolist()
+        return [
+            {"bid": self.table.row(i), "scores": scores}
+            for i, scores in zip(indices, self._score_dicts(indices))
+        ]
+
+    def iter_rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """JSON-ready rows for ranks [start, stop), with the bid echoed as a plain dict."""
+        t = self.table
+        indices = self.order[start:stop].tolist()
+        for i, scores in zip(indices, self._score_dicts(indices)):
+            yield {
+                "bid": {
+                    "id": t.ids[i],
+                    "supplier_name": t.supplier_names[i],
+                    "price": scores["price_raw"],
+                    "delivery_days": scores["delivery_raw"],
+                    "reputation_score": scores["reputation_raw"],
+                    "is_verified": t.is_verified[i],
+                    "notes": t.notes[i],
+                },
+                "scores": scores,
+            }
+
+    def iter_compact(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Rows for ranks [start, stop) carrying only the bid id and computed
+        scores; the client already has every other input field.
+        """
+        indices = self.order[start:stop].tolist()
+        ids = self.table.ids
+        columns = zip(
+            indices,
+            self.price_score[indices].tolist(),
+            self.delivery_score[indices].tolist(),
+            self.reputation_score[indices].tolist(),
+            self.total[indices].tolist(),
+        )
+        for rank, (i, price_score, delivery_score, reputation_score, total) in enumerate(columns, start=start + 1):
+            yield {
+                "rank": rank,
+                "id": ids[i],
+                "price_score": price_score,
+                "delivery_score": delivery_score,
+                "reputation_score": reputation_score,
+                "total": total,
+            }
+
+    def rankings(self) -> List[Dict[str, Any]]:
+        """`AwardDecision.rankings` built straight from the arrays."""
+        names = self.table.supplier_names
+        indices = self.order.tolist()
+        return [
+            {
+                "rank": rank,
+                "supplier": names[i],
+                "total_score": scores["total"],
+                "breakdown": scores,
+            }
+            for rank, (i, scores) in enumerate(zip(indices, self._score_dicts(indices)), start=1)
+        ]
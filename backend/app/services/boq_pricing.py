@@ -0,0 +1,228 @@
+# =============================================================================
+# BuildBidz - Bill of Quantities Pricing
+# =============================================================================
+# Prices a whole BOQ (many material x region lines) against today's market
+# and the 30-day forecast. All series come from the one batched Holt-Winters
+# fit, line and total costs are computed as arrays, and the narrative is a
+# single consolidated LLM call instead of one per line.
+#
+# Lock recommendations use the same Monte Carlo lock risk and lock rule as
+# /forecast/analyze. The rule scales with quantity, so it is simulated once
+# per distinct material x region pair rather than once per line.
+# =============================================================================
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+import structlog
+
+from app.services.ai import groq_service
+from app.services.forecast_engine import BatchForecast, normal_cdf
+from app.services.lock_risk import LockRiskResult, lock_risk, seed_for
+from app.services.price_forecast import MaterialType, Region, price_forecast_service
+
+logger = structlog.get_logger()
+
+# Lines shown to the LLM, largest current cost first; the rest are summarised
+MAX_PROMPT_LINES = 25
+
+# =============================================================================
+# Data Models
+# =============================================================================
+
+class BOQLine(BaseModel):
+    material: MaterialType
+    region: Region
+    quantity: float = Field(gt=0)
+    description: Optional[str] = None
+
+class BOQRequest(BaseModel):
+    lines: List[BOQLine] = Field(min_length=1, max_length=1000)
+    target_margin_percent: float = Field(default=12.0, description="Developer's target margin to protect")
+    include_analysis: bool = Field(default=True, description="One consolidated LLM narrative for the whole BOQ")
+
+class BOQLineResult(BaseModel):
+    material: MaterialType
+    region: Region
+    quantity: float
+    description: Optional[str] = None
+    unit: str
+    current_price: float
+    forecast_price_30d: float
+    current_cost: float
+    forecast_cost_30d: float
+    forecast_cost_lower_30d: float
+    forecast_cost_upper_30d: float
+    trend_direction: str
+    margin_breach_probability: float
+    lock_rate_recommendation: bool
+
+class BOQResult(BaseModel):
+    as_of: str
+    interval_level: float
+    lines: List[BOQLineResult]
+    total_current_cost: float
+    total_forecast_cost_30d: float
+    total_forecast_cost_lower_30d: float
+    total_forecast_cost_upper_30d: float
+    projected_cost_change: float
+    margin_breach_probability: float  # P(total 30d cost > current cost x (1 + margin))
+    ai_analysis: Optional[str] = None
+
+# =============================================================================
+# Pricing
+# =============================================================================
+
+def comonotonic_exceedance(quantity: np.ndarray, log_mean: np.ndarray, log_sd: np.ndarray, threshold: float) -> float:
+    """
+    P(sum_i quantity_i * exp(log_mean_i + log_sd_i * Z) > threshold) for one shared Z.
+
+    Construction materials move together (fuel, freight, monsoon), so the
+    lines are treated as perfectly correlated: the conservative choice, and
+    the one under which summing per-line interval bounds is exact. The total
+    is increasing in Z, so the probability is one normal tail at the Z where
+    the total crosses the threshold.
+    """
+    z = np.linspace(-8.0, 8.0, 1601)
+    totals = (quantity[:, None] * np.exp(log_mean[:, None] + log_sd[:, None] * z[None, :])).sum(axis=0)
+    if threshold <= totals[0]:
+        return 1.0
+    if threshold >= totals[-1]:
+        return 0.0
+    return float(1.0 - normal_cdf(np.interp(threshold, totals, z)))
+
+
+def pair_risks(
+    batch: BatchForecast,
+    pairs: Dict[Tuple[str, str], int],
+    target_margin_percent: float,
+    as_of: str,
+) -> Dict[Tuple[str, str], LockRiskResult]:
+    """Lock risk per unit of each (material, region) pair, seeded as /forecast/analyze seeds it."""
+    return {
+        pair: lock_risk(
+            current_price=float(batch.last_price[i]),
+            quantity=1.0,
+            target_margin_percent=target_margin_percent,
+            log_mean_path=batch.log_mean[i],
+            sigma=float(batch.sigma[i]),
+            alpha=float(batch.params[i, 0]),
+            beta=float(batch.params[i, 1]),
+            phi=float(batch.params[i, 3]),
+            seed=seed_for(as_of, *pair),
+        )
+        for pair, i in pairs.items()
+    }
+
+
+async def price_boq(request: BOQRequest) -> BOQResult:
+    """Price every BOQ line and the total, now and at the 30-day horizon."""
+    service = price_forecast_service
+    index, batch = await service.forecast_all()
+    as_of = str(service.fitted_as_of)
+
+    rows = np.array([index[(line.material.value, line.region.value)] for line in request.lines])
+    qty = np.array([line.quantity for line in request.lines])
+    margin = request.target_margin_percent / 100
+
+    current = batch.last_price[rows]
+    median, lower, upper = batch.median[rows, -1], batch.lower[rows, -1], batch.upper[rows, -1]
+    log_mean, log_sd = batch.log_mean[rows, -1], batch.log_sd[rows, -1]
+
+    change = median / current - 1
+    trend = np.where(change > service.STABLE_BAND, "UP", np.where(change < -service.STABLE_BAND, "DOWN", "STABLE"))
+
+    keys = [(line.material.value, line.region.value) for line in request.lines]
+    risks = await asyncio.to_thread(
+        pair_risks, batch, {key: index[key] for key in keys}, request.target_margin_percent, as_of
+    )
+    breach = [risks[key].breach_probability for key in keys]
+    lock = [service.should_lock(risks[key], 1.0, float(current[i])) for i, key in enumerate(keys)]
+
+    current_cost, forecast_cost = qty * current, qty * median
+    cost_lower, cost_upper = qty * lower, qty * upper
+    total_current = float(current_cost.sum())
+    total_breach = comonotonic_exceedance(qty, log_mean, log_sd, total_current * (1 + margin))
+
+    units = [service.unit_for(line.material, line.region) for line in request.lines]
+    lines = [
+        BOQLineResult(
+            material=line.material,
+            region=line.region,
+            quantity=line.quantity,
+            description=line.description,
+            unit=units[i],
+            current_price=round(float(current[i]), 2),
+            forecast_price_30d=round(float(median[i]), 2),
+            current_cost=round(float(current_cost[i]), 2),
+            forecast_cost_30d=round(float(forecast_cost[i]), 2),
+            forecast_cost_lower_30d=round(float(cost_lower[i]), 2),
+            forecast_cost_upper_30d=round(float(cost_upper[i]), 2),
+            trend_direction=str(trend[i]),
+            margin_breach_probability=round(float(breach[i]), 4),
+            lock_rate_recommendation=bool(lock[i]),
+        )
+        for i, line in enumerate(request.lines)
+    ]
+
+    result = BOQResult(
+        as_of=as_of,
+        interval_level=batch.interval_level,
+        lines=lines,
+        total_current_cost=round(total_current, 2),
+        total_forecast_cost_30d=round(float(forecast_cost.sum()), 2),
+        total_forecast_cost_lower_30d=round(float(cost_lower.sum()), 2),
+        total_forecast_cost_upper_30d=round(float(cost_upper.sum()), 2),
+        projected_cost_change=round(float(forecast_cost.sum()) - total_current, 2),
+        margin_breach_probability=round(total_breach, 4),
+    )
+    if request.include_analysis:
+        result.ai_analysis = await _boq_analysis(result, request.target_margin_percent)
+    return result
+
+
+async def _boq_analysis(result: BOQResult, target_margin_percent: float) -> str:
+    """One narrative for the whole BOQ."""
+    ranked = sorted(result.lines, key=lambda line: line.current_cost, reverse=True)
+    shown, rest = ranked[:MAX_PROMPT_LINES], ranked[MAX_PROMPT_LINES:]
+    table = "\n".join(
+        f"- {line.material.value} / {line.region.value}: {line.quantity:g} {line.unit.split('/')[-1]}, "
+        f"cost {line.current_cost:,.0f} -> {line.forecast_cost_30d:,.0f} "
+        f"({(line.forecast_price_30d / line.current_price - 1) * 100:+.1f}%), {line.trend_direction}, "
+        f"breach risk {line.margin_breach_probability:.0%}, {'LOCK' if line.lock_rate_recommendation else 'WAIT'}"
+        for line in shown
+    )
+    if rest:
+        table += f"\n- {len(rest)} smaller lines totalling {sum(line.current_cost for line in rest):,.0f}"
+
+    level = int(result.interval_level * 100)
+    prompt_content = f"""
+        Role: Quantitative Supply Chain Analyst for BuildBidz.
+
+        Task: Review the material cost outlook for a bill of quantities.
+
+        BOQ Lines (statistical forecast, already computed):
+        {table}
+
+        Totals:
+        - Current Cost: {result.total_current_cost:,.0f}
+        - 30-day Forecast Cost: {result.total_forecast_cost_30d:,.0f} ({level}% interval {result.total_forecast_cost_lower_30d:,.0f} to {result.total_forecast_cost_upper_30d:,.0f})
+        - Probability the total rise exceeds the {target_margin_percent:g}% margin: {result.margin_breach_probability:.0%}
+
+        Goal:
+        Tell the estimator which lines to lock now and which can wait, and why.
+        Do not change the numbers above.
+
+        Output:
+        Provide a concise, data-driven analysis (max 5 sentences) for the whole BOQ.
+        Focus on supply chain variables (seasonal demand, logistics) behind the largest movements.
+        """
+
+    try:
+        response = await groq_service.price_forecast([{"role": "user", "content": prompt_content}], temperature=0.2)
+        return response.choices[0].message.content
+    except Exception as e:
+        logger.error("AI BOQ analysis failed", error=str(e))
+        return "AI analysis unavailable. Proceed with caution based on mathematical trend."
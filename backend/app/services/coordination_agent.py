@@ -6,11 +6,17 @@
 # into Hindi/Hinglish for contractors using Llama 3.3 70B.
 # =============================================================================
 
-from typing import List, Dict, Optional, Any
+import asyncio
+import hashlib
+import re
+import time
+from typing import List, Dict, Optional, Any, Tuple
 from enum import Enum
 from pydantic import BaseModel
 import structlog
 
+from app.config import settings
+from app.db.templates_repo import templates_repo
 from app.services.ai import groq_service
 
 logger = structlog.get_logger()
@@ -45,6 +51,55 @@ class NotificationResult(BaseModel):
     whatsapp_formatted: str
     audio_transcription_url: Optional[str] = None # For future voice synthesis
 
+# =============================================================================
+# Intent Templates
+# =============================================================================
+# Fixed-shape steps differ only in names, amounts and dates, so they are
+# translated once per language with the {placeholders} left in, and filled
+# in locally per message. DEFECT_NOTICE and anything custom is free-form and
+# always goes to the LLM.
+
+INTENT_TEMPLATES: Dict[CommunicationStep, str] = {
+    CommunicationStep.AWARD_NOTIFICATION: (
+        "Notify contractor {contractor_name} that they have won the bid for {project_name}. "
+        "Total Amount: {amount}. Start Date: {start_date}. "
+        "Ask them to confirm acceptance by replying 'YES'."
+    ),
+    CommunicationStep.SITE_READY: (
+        "Inform {contractor_name} that the site for {project_name} is ready for their work. "
+        "They should bring their team and materials by tomorrow morning."
+    ),
+    CommunicationStep.PAYMENT_RELEASED: (
+        "Tell {contractor_name} that payment of {amount} has been released via UPI/NEFT. "
+        "Allocations: {breakdown}."
+    ),
+}
+
+FORMATTING_RULES = (
+    "\n\nFORMATTING RULES:\n"
+    "- Use WhatsApp formatting (*Bold* for amounts/dates)\n"
+    "- Use 1-2 relevant emojis 👷🧱💰\n"
+    "- Keep it under 50 words."
+)
+
+TEMPLATE_RULES = (
+    "\n\nTEMPLATE RULES:\n"
+    "- This is a reusable template. Keep every placeholder in curly braces, such as "
+    "{contractor_name}, exactly as written: do not translate, rename or fill it in.\n"
+    "- Use each placeholder exactly once and do not add new ones.\n"
+    "- Output only the message."
+)
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+def render_template(template: str, values: Dict[str, Any]) -> str:
+    """Fill {placeholders} in one pass (values are never re-scanned for braces)."""
+    def fill(match: "re.Match[str]") -> str:
+        value = values.get(match.group(1))
+        return "-" if value is None else str(value)
+    return _PLACEHOLDER.sub(fill, template)
+
 # =============================================================================
 # Coordination Agent Service
 # =============================================================================
@@ -58,8 +113,21 @@ class CoordinationAgent:
        - Translate technical terms into contractor-friendly language.
        - Convert formal English to Hindi/Hinglish/Regional.
        - Format for WhatsApp (bolding, emojis).
+
+    Template steps are translated once per (step, language) and cached in
+    memory and in `message_templates`, so those notifications need no LLM call.
+    A failed translation is remembered for TEMPLATE_RETRY_S, during which
+    those notifications go straight to the per-message LLM call.
     """
 
+    TEMPLATE_RETRY_S = 300.0
+
+    def __init__(self):
+        self._templates: Dict[Tuple[str, str, str], str] = {}
+        self._template_locks: Dict[Tuple[str, str, str], asyncio.Lock] = {}
+        # key -> monotonic time of the last failed translation
+        self._template_failures: Dict[Tuple[str, str, str], float] = {}
+
     async def _get_system_prompt(self, language: Language) -> str:
         """
         Returns the persona prompt for the Local Facilitator.
@@ -85,42 +153,113 @@ class CoordinationAgent:
         else:
             return base_prompt + "Output in clear, simple English."
 
-    async def generate_notification(self, request: NotificationRequest) -> NotificationResult:
+    def _template_key(self, step: CommunicationStep, language: Language, system_prompt: str) -> Tuple[str, str, str]:
+        """Cache key; the version changes whenever the source template or prompts do."""
+        source = "\x00".join([system_prompt, INTENT_TEMPLATES[step], FORMATTING_RULES, TEMPLATE_RULES])
+        version = hashlib.blake2b(source.encode(), digest_size=8).hexdigest()
+        return step.value, language.value, version
+
+    async def get_template(self, step: CommunicationStep, language: Language) -> Optional[str]:
+        """
+        Translated template for a step, or None if it couldn't be produced
+        (the caller then falls back to a per-message LLM call).
+        """
+        system_prompt = await self._get_system_prompt(language)
+        key = self._template_key(step, language, system_prompt)
+        template = self._templates.get(key)
+        if template is not None or self._recently_failed(key):
+            return template
+
+        # One translation per key, however many notifications are waiting on it
+        lock = self._template_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            template = self._templates.get(key)
+            if template is not None or self._recently_failed(key):
+                return template
+
+            try:
+                template = await templates_repo.get_template(*key)
+            except Exception as e:
+                logger.warning("Template store unavailable", error=str(e))
+
+            if template is None:
+                template = await self._translate_template(step, system_prompt)
+                if template is None:
+                    self._template_failures[key] = time.monotonic()
+                    return None
+                try:
+                    await templates_repo.save_template(*key, template)
+                except Exception as e:
+                    logger.warning("Could not persist template", step=step.value, language=language.value, error=str(e))
+
+            self._templates[key] = template
+            self._template_failures.pop(key, None)
+            return template
+
+    def _recently_failed(self, key: Tuple[str, str, str]) -> bool:
+        failed_at = self._template_failures.get(key)
+        return failed_at is not None and time.monotonic() - failed_at < self.TEMPLATE_RETRY_S
+
+    async def _translate_template(self, step: CommunicationStep, system_prompt: str) -> Optional[str]:
+        source = INTENT_TEMPLATES[step]
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": source + FORMATTING_RULES + TEMPLATE_RULES},
+        ]
+        try:
+            response = await groq_service.coordinate(messages, temperature=0.2)
+            template = response.choices[0].message.content.strip()
+        except Exception as e:
+            logger.error("Template translation failed", step=step.value, error=str(e))
+            return None
+
+        # A template that lost or invented a placeholder can't be filled safely
+        expected = _PLACEHOLDER.findall(source)
+        found = _PLACEHOLDER.findall(template)
+        if sorted(found) != sorted(expected):
+            logger.warning("Translated template placeholders mismatch", step=step.value, expected=expected, found=found)
+            return None
+        return template
+
+    @staticmethod
+    def _template_values(request: NotificationRequest) -> Dict[str, Any]:
+        return {**request.details, "contractor_name": request.contractor_name, "project_name": request.project_name}
+
+    def fill_template(self, request: NotificationRequest, template: str) -> NotificationResult:
+        """Notification from an already translated template (pure string work)."""
+        message_text = render_template(template, self._template_values(request))
+        return NotificationResult(
+            original_intent=request.step.name,
+            translated_message=message_text,
+            whatsapp_formatted=message_text,
+        )
+
+    async def generate_notification(
+        self, request: NotificationRequest, use_template: bool = True, raise_errors: bool = False
+    ) -> NotificationResult:
         """
         Generates a translated, formatted message for a contractor.
+        With `use_template=False` the template cache is skipped (the caller
+        already knows there is no template) and the message is generated by LLM.
+        An LLM failure gives a placeholder message, or with `raise_errors`
+        is raised so the caller can report it.
         """
-        # 1. Select Template Strategy
-        if request.step == CommunicationStep.AWARD_NOTIFICATION:
-            user_content = (
-                f"Notify contractor {request.contractor_name} that they have won the bid for "
-                f"{request.project_name}. "
-                f"Total Amount: {request.details.get('amount')}. "
-                f"Start Date: {request.details.get('start_date')}. "
-                "Ask them to confirm acceptance by replying 'YES'."
-            )
-        elif request.step == CommunicationStep.SITE_READY:
-            user_content = (
-                f"Inform {request.contractor_name} that the site for {request.project_name} "
-                "is ready for their work. "
-                "They should bring their team and materials by tomorrow morning."
-            )
-        elif request.step == CommunicationStep.PAYMENT_RELEASED:
-            user_content = (
-                f"Tell {request.contractor_name} that payment of {request.details.get('amount')} "
-                f"has been released via UPI/NEFT. Allocations: {request.details.get('breakdown')}."
-            )
+        # 1. Template steps: cached translation + local fill, no LLM round trip
+        if use_template and settings.COORDINATION_TEMPLATE_CACHE and request.step in INTENT_TEMPLATES:
+            template = await self.get_template(request.step, request.language)
+            if template is not None:
+                return self.fill_template(request, template)
+
+        # 2. Select Template Strategy
+        if request.step in INTENT_TEMPLATES:
+            user_content = render_template(INTENT_TEMPLATES[request.step], self._template_values(request))
         else:
             user_content = f"Message to {request.contractor_name}: {str(request.details)}"
 
-        # 2. Add specific formatting instructions
-        user_content += (
-            "\n\nFORMATTING RULES:\n"
-            "- Use WhatsApp formatting (*Bold* for amounts/dates)\n"
-            "- Use 1-2 relevant emojis 👷🧱💰\n"
-            "- Keep it under 50 words."
-        )
+        # 3. Add specific formatting instructions
+        user_content += FORMATTING_RULES
 
-        # 3. AI Generation (Llama 3.3 70B via Router)
+        # 4. AI Generation (Llama 3.3 70B via Router)
         system_prompt = await self._get_system_prompt(request.language)
         
         messages = [
@@ -134,9 +273,11 @@ class CoordinationAgent:
             message_text = response.choices[0].message.content
         except Exception as e:
             logger.error("Coordination AI failed", error=str(e))
+            if raise_errors:
+                raise
             message_text = f"[AI Error] Please contact {request.contractor_name} manually."
 
-        # 4. Result
+        # 5. Result
         return NotificationResult(
             original_intent=request.step.name,
             translated_message=message_text,
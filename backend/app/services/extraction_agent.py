@@ -6,15 +6,27 @@
 # using GPT-OSS 20B (or equivalent Llama 3 model) via Groq.
 # =============================================================================
 
+import asyncio
+import hashlib
 import json
-from typing import List, Dict, Optional, Any
-from pydantic import BaseModel, Field
+import time
+from typing import List, Dict, Optional, Any, Tuple
+from pydantic import BaseModel, Field, ValidationError
 import structlog
 
+from app.config import settings
+from app.core.model_config import TaskType, get_model_for_task
 from app.services.ai import groq_service
+from app.services.extraction_cache import ExtractionCache, ocr_text_key
+from app.services.extraction_chunks import ChunkMetric, merge_chunk_results, split_chunks
+from app.services.invoice_patterns import PreExtraction, find_pans, is_valid_gstin, pre_extract, trim_ocr_text
 
 logger = structlog.get_logger()
 
+# Bump when extraction changes in a way the prompt hash can't see (merge rules,
+# chunking, output fields) so cached results from the old logic stop matching
+EXTRACTION_CACHE_REVISION = 1
+
 # =============================================================================
 # Data Models
 # =============================================================================
@@ -36,6 +48,8 @@ class ExtractionResult(BaseModel):
     total_amount: Optional[float] = None
     line_items: List[LineItem] = []
     verification_ready: bool = Field(False, description="True if GSTIN and Total Amount are present")
+    chunks: Optional[List[ChunkMetric]] = Field(None, description="Per-chunk metrics when extracted in chunks")
+    cached: bool = Field(False, description="Served from the extraction cache")
 
 # =============================================================================
 # Extraction Agent Service
@@ -49,50 +63,238 @@ class ExtractionAgent:
     Focuses on Indian context (GSTIN, PAN, Lakhs/Crores).
     """
 
-    async def extract_invoice_data(self, ocr_text: str) -> ExtractionResult:
+    def __init__(self):
+        self.cache = ExtractionCache(settings.EXTRACTION_CACHE_MAX_ENTRIES)
+
+    @staticmethod
+    def _hints(pre: PreExtraction) -> str:
+        lines = []
+        if pre.gstin:
+            lines.append(f"- gstin: {pre.gstin} (checksum verified; may be the buyer's if the supplier's is unreadable)")
+        if pre.pan:
+            lines.append(f"- pan: {pre.pan}")
+        if pre.total_amount is not None:
+            lines.append(f"- total_amount: {pre.total_amount:.2f}")
+        if not lines:
+            return ""
+        return "\n\nPRE-EXTRACTED (validated locally; use unless the text clearly contradicts):\n" + "\n".join(lines)
+
+    @staticmethod
+    def _merge(data: Dict[str, Any], pre: PreExtraction) -> Dict[str, Any]:
         """
-        Extracts structured data from invoice OCR text.
+        Prefer locally validated values where the model's are missing or fail
+        validation. The regex total only fills a missing one: it reads a single
+        labelled line, so a model total that disagrees is kept.
         """
-        system_prompt = (
-            "You are an expert data extraction AI for Indian construction documents. "
-            "Extract structured data from the provided OCR text into JSON format. "
-            "Focus on capturing GSTIN (15 chars), PAN (10 chars), and Line Items. "
-            "If a value is missing, return null. "
-            "Format dates as YYYY-MM-DD. "
-            "Normalize amounts to floats (remove commas/currency symbols). "
-            "Identify the document type as INVOICE, RECEIPT, or WHATSAPP."
+        if pre.gstin and not (isinstance(data.get("gstin"), str) and is_valid_gstin(data["gstin"].upper())):
+            data["gstin"] = pre.gstin
+        if pre.pan and not (isinstance(data.get("pan"), str) and find_pans(data["pan"]) == [data["pan"].upper()]):
+            data["pan"] = pre.pan
+        if pre.total_amount is not None and data.get("total_amount") is None:
+            data["total_amount"] = pre.total_amount
+        return data
+
+    @staticmethod
+    def _from_pre(pre: PreExtraction) -> ExtractionResult:
+        return ExtractionResult(
+            document_type=pre.document_type or "UNKNOWN",
+            gstin=pre.gstin,
+            pan=pre.pan,
+            total_amount=pre.total_amount,
+            verification_ready=bool(pre.gstin and pre.total_amount),
         )
 
-        user_prompt = f"OCR TEXT:\n{ocr_text}\n\nReturn JSON matching this schema: {{ document_type, vendor_name, invoice_number, invoice_date, gstin, pan, total_amount, line_items: [ {{ description, quantity, unit, unit_price, total_price }} ] }}"
+    SYSTEM_PROMPT = (
+        "You are an expert data extraction AI for Indian construction documents. "
+        "Extract structured data from the provided OCR text into JSON format. "
+        "Focus on capturing GSTIN (15 chars), PAN (10 chars), and Line Items. "
+        "If a value is missing, return null. "
+        "Format dates as YYYY-MM-DD. "
+        "Normalize amounts to floats (remove commas/currency symbols). "
+        "Identify the document type as INVOICE, RECEIPT, or WHATSAPP."
+    )
+    BATCH_INSTRUCTIONS = (
+        "The OCR TEXT holds several independent documents, each starting with a line "
+        "'### DOCUMENT <key>'. Extract each one on its own; never carry values between documents. "
+        "Return one JSON object {\"documents\": {\"<key>\": <document JSON>}} with every key present."
+    )
+    SCHEMA_HINT = "{ document_type, vendor_name, invoice_number, invoice_date, gstin, pan, total_amount, line_items: [ { description, quantity, unit, unit_price, total_price } ] }"
 
-        messages = [
-            {"role": "system", "content": system_prompt},
+    def _messages(self, text: str, pre: PreExtraction, part: Optional[Tuple[int, int]] = None) -> List[Dict[str, str]]:
+        intro = "OCR TEXT"
+        if part is not None:
+            intro = (
+                f"OCR TEXT (part {part[0]} of {part[1]} of one document; extract only what appears in this part, "
+                "null for anything not shown here)"
+            )
+        user_prompt = f"{intro}:\n{text}{self._hints(pre)}\n\nReturn JSON matching this schema: {self.SCHEMA_HINT}"
+        return [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
         ]
 
+    async def _complete(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        # Use 'extract' task type (mapped to GPT-OSS 20B / Llama 3 8B)
+        response = await groq_service.extract(messages, temperature=0.1, response_format={"type": "json_object"})
+        content = response.choices[0].message.content
         try:
-            # Use 'extract' task type (mapped to GPT-OSS 20B / Llama 3 8B)
-            response = await groq_service.extract(messages, temperature=0.1, response_format={"type": "json_object"})
-            content = response.choices[0].message.content
-            
-            # Parse JSON
-            data = json.loads(content)
-            
-            # Determine verification readiness
-            # Ready if we have a GSTIN and a Total Amount
-            verification_ready = bool(data.get("gstin") and data.get("total_amount"))
-            data["verification_ready"] = verification_ready
-            
-            return ExtractionResult(**data)
-
+            return json.loads(content)
         except json.JSONDecodeError:
             logger.error("Failed to parse AI response as JSON", content=content)
-            # Return empty result with raw text as fallback if needed, or just specific error
-            return ExtractionResult(document_type="UNKNOWN")
+            raise
+
+    def _finish(self, data: Dict[str, Any], pre: PreExtraction, **extra) -> ExtractionResult:
+        data = self._merge(data, pre)
+        # Determine verification readiness
+        # Ready if we have a GSTIN and a Total Amount
+        data["verification_ready"] = bool(data.get("gstin") and data.get("total_amount"))
+        return ExtractionResult(**data, **extra)
+
+    def cache_version(self) -> str:
+        """Changes whenever the prompts, the extraction model or the revision do."""
+        mapping = get_model_for_task(TaskType.EXTRACTION)
+        source = "\x00".join([
+            str(EXTRACTION_CACHE_REVISION), self.SYSTEM_PROMPT, self.SCHEMA_HINT, self.BATCH_INSTRUCTIONS,
+            mapping.system_prompt_template or "", mapping.primary.model_id,
+        ])
+        return hashlib.blake2b(source.encode(), digest_size=8).hexdigest()
+
+    async def extract_invoice_data(
+        self,
+        ocr_text: str,
+        verification_only: bool = False,
+        chunked: Optional[bool] = None,
+        use_cache: bool = True,
+    ) -> ExtractionResult:
+        """
+        Extracts structured data from invoice OCR text.
+
+        GSTIN, PAN and the total are pre-extracted with regexes and the GSTIN
+        checksum, then passed to the model as hints along with the trimmed
+        OCR text. With `verification_only`, a confident pre-pass (valid GSTIN
+        and a labelled grand total) is returned without calling the model.
+
+        Text longer than EXTRACTION_CHUNK_CHARS (or any text, with
+        `chunked=True`) is split and extracted in parallel chunks.
+
+        Complete model results are cached by normalised OCR text hash, so
+        re-uploads and worker retries of the same document are served
+        without another model call.
+        """
+        pre = pre_extract(ocr_text)
+        if verification_only and pre.confident:
+            return self._from_pre(pre)
+
+        if not (use_cache and settings.EXTRACTION_CACHE):
+            result, _ = await self._extract(ocr_text, pre, chunked)
+            return result
+
+        async def extract() -> Tuple[Dict[str, Any], bool]:
+            result, complete = await self._extract(ocr_text, pre, chunked)
+            return result.model_dump(), complete
+
+        payload, hit = await self.cache.get_or_extract(ocr_text_key(ocr_text), self.cache_version(), extract)
+        if hit:
+            logger.info("Extraction cache hit", document_type=payload.get("document_type"))
+        return ExtractionResult(**{**payload, "cached": hit})
+
+    async def _extract(
+        self, ocr_text: str, pre: PreExtraction, chunked: Optional[bool]
+    ) -> Tuple[ExtractionResult, bool]:
+        """(result, complete); incomplete results are pre-pass fallbacks or partial chunk merges."""
+        if chunked is None:
+            chunked = len(ocr_text) > settings.EXTRACTION_CHUNK_CHARS
+        if chunked:
+            return await self._extract_chunked(ocr_text, pre)
+
+        text = trim_ocr_text(ocr_text)
+        logger.debug("OCR text trimmed for extraction", chars_before=len(ocr_text), chars_after=len(text))
+
+        try:
+            return self._finish(await self._complete(self._messages(text, pre)), pre), True
+
+        except json.JSONDecodeError:
+            # Fall back to what the deterministic pass found
+            return self._from_pre(pre), False
             
         except Exception as e:
             logger.error("Extraction AI failed", error=str(e))
             raise
 
+    async def extract_packed(self, documents: List[Tuple[str, PreExtraction]]) -> List[Optional[ExtractionResult]]:
+        """
+        Extract several short documents (trimmed text, pre-pass) in one
+        JSON-mode call. Returns one result per document, None where the
+        response had no valid entry for it; raises if the call itself fails.
+        """
+        keys = [f"d{i + 1}" for i in range(len(documents))]
+        blocks = "\n\n".join(
+            f"### DOCUMENT {key}\n{text}{self._hints(pre)}" for key, (text, pre) in zip(keys, documents)
+        )
+        user_prompt = (
+            f"OCR TEXT:\n{blocks}\n\n{self.BATCH_INSTRUCTIONS}\n"
+            f"Each document JSON matches this schema: {self.SCHEMA_HINT}"
+        )
+        data = await self._complete([
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ])
+        found = data.get("documents") if isinstance(data, dict) else None
+        if not isinstance(found, dict):
+            logger.error("Batched extraction response has no documents object", keys=list(data)[:5] if isinstance(data, dict) else None)
+            return [None] * len(documents)
+
+        results: List[Optional[ExtractionResult]] = []
+        for key, (_, pre) in zip(keys, documents):
+            entry = found.get(key)
+            try:
+                results.append(self._finish(dict(entry), pre) if isinstance(entry, dict) else None)
+            except ValidationError as e:
+                logger.warning("Batched extraction entry failed validation", key=key, error=str(e))
+                results.append(None)
+        return results
+
+    async def _extract_chunked(self, ocr_text: str, pre: PreExtraction) -> Tuple[ExtractionResult, bool]:
+        """Extract page/table-aligned chunks in parallel and merge them deterministically."""
+        chunks = [trim_ocr_text(c) for c in split_chunks(ocr_text, settings.EXTRACTION_CHUNK_CHARS)]
+        semaphore = asyncio.Semaphore(settings.EXTRACTION_CHUNK_MAX_CONCURRENCY)
+        errors: List[Exception] = []
+
+        async def one(index: int, chunk: str) -> Tuple[Optional[Dict[str, Any]], ChunkMetric]:
+            start = time.monotonic()
+            try:
+                async with semaphore:
+                    data = await self._complete(self._messages(chunk, pre, part=(index + 1, len(chunks))))
+                status, error = "ok", None
+            except Exception as e:
+                logger.error("Chunk extraction failed", chunk=index, error=str(e))
+                errors.append(e)
+                data, status, error = None, "failed", str(e)
+            metric = ChunkMetric(
+                index=index,
+                chars=len(chunk),
+                line_items=len((data or {}).get("line_items") or []),
+                duration_ms=round((time.monotonic() - start) * 1000, 1),
+                status=status,
+                error=error,
+            )
+            return data, metric
+
+        outcomes = await asyncio.gather(*(one(i, c) for i, c in enumerate(chunks)))
+        metrics = [m for _, m in outcomes]
+        logger.info(
+            "Chunked extraction complete",
+            chunks=len(chunks),
+            failed=sum(m.status == "failed" for m in metrics),
+            max_chunk_ms=max((m.duration_ms for m in metrics), default=0.0),
+        )
+
+        if len(errors) == len(chunks):
+            if all(isinstance(e, json.JSONDecodeError) for e in errors):
+                return self._from_pre(pre), False
+            raise errors[0]
+        result = self._finish(merge_chunk_results([d for d, _ in outcomes]), pre, chunks=metrics)
+        return result, not errors
+
 # Global Instance
 extraction_agent = ExtractionAgent()
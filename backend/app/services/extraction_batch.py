@@ -0,0 +1,182 @@
+# =============================================================================
+# BuildBidz - Batched Extraction
+# =============================================================================
+# Extracts many documents at once. Receipts and WhatsApp screenshots give a
+# few hundred characters of OCR text each, so paying a full request (and a
+# rate-limit slot) per document is mostly overhead: short documents are
+# packed several to a JSON-mode call and split back out per document. Any
+# document the packed response doesn't cover with a valid entry, and every
+# long document, goes through the normal single-document extraction.
+# Results are yielded as they finish.
+# =============================================================================
+
+import asyncio
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+import structlog
+
+from app.config import settings
+from app.services.extraction_agent import extraction_agent, ExtractionResult
+from app.services.extraction_cache import ocr_text_key
+from app.services.invoice_patterns import PreExtraction, pre_extract, trim_ocr_text
+
+logger = structlog.get_logger()
+
+# =============================================================================
+# Data Models
+# =============================================================================
+
+class BatchDocument(BaseModel):
+    ocr_text: str = Field(min_length=1)
+    document_id: Optional[str] = None  # caller's reference, echoed back
+
+class BatchExtractionRequest(BaseModel):
+    documents: List[BatchDocument] = Field(min_length=1, max_length=500)
+    max_concurrency: Optional[int] = Field(None, ge=1)
+
+class BatchExtractionItem(BaseModel):
+    index: int  # position in the request
+    document_id: Optional[str] = None
+    status: str  # "ok", "failed"
+    via: Optional[str] = None  # "cache", "batch" (packed call) or "single"
+    result: Optional[ExtractionResult] = None
+    error: Optional[str] = None
+
+class BatchExtractionSummary(BaseModel):
+    total: int
+    ok: int
+    failed: int
+    cached: int   # served from the extraction cache
+    batched: int  # extracted in a packed multi-document call
+    duration_ms: float
+    results: List[BatchExtractionItem]
+
+# Called as every document finishes: (completed, total, item)
+ProgressCallback = Callable[[int, int, BatchExtractionItem], None]
+
+# =============================================================================
+# Packing
+# =============================================================================
+
+def pack_documents(sizes: List[int], max_docs: int, max_chars: int) -> List[List[int]]:
+    """Group document positions in order, each group within `max_docs` and `max_chars`."""
+    groups: List[List[int]] = []
+    current: List[int] = []
+    chars = 0
+    for i, size in enumerate(sizes):
+        if current and (len(current) >= max_docs or chars + size > max_chars):
+            groups.append(current)
+            current, chars = [], 0
+        current.append(i)
+        chars += size
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def iter_extractions(
+    documents: List[BatchDocument],
+    max_concurrency: Optional[int] = None,
+) -> AsyncIterator[BatchExtractionItem]:
+    """Yield one item per document, in completion order."""
+    agent = extraction_agent
+    semaphore = asyncio.Semaphore(max_concurrency or settings.EXTRACTION_BATCH_MAX_CONCURRENCY)
+    queue: asyncio.Queue = asyncio.Queue()
+    version = agent.cache_version()
+
+    # Identical documents (same normalised text) are extracted once and share the result
+    by_key: Dict[str, List[int]] = {}
+    for i, doc in enumerate(documents):
+        by_key.setdefault(ocr_text_key(doc.ocr_text), []).append(i)
+
+    def emit(key: str, **fields) -> None:
+        for i in by_key[key]:
+            queue.put_nowait(BatchExtractionItem(index=i, document_id=documents[i].document_id, **fields))
+
+    async def single(key: str) -> None:
+        try:
+            async with semaphore:
+                result = await agent.extract_invoice_data(documents[by_key[key][0]].ocr_text)
+            emit(key, status="ok", via="single", result=result)
+        except Exception as e:
+            logger.error("Batch extraction failed", index=by_key[key][0], error=str(e))
+            emit(key, status="failed", error=str(e))
+
+    async def packed(group: List[Tuple[str, str, PreExtraction]]) -> None:
+        try:
+            async with semaphore:
+                results = await agent.extract_packed([(text, pre) for _, text, pre in group])
+        except Exception as e:
+            logger.warning("Packed extraction failed, retrying documents singly", documents=len(group), error=str(e))
+            results = [None] * len(group)
+        retry = []
+        for (key, _, _), result in zip(group, results):
+            if result is None:
+                retry.append(key)
+                continue
+            if settings.EXTRACTION_CACHE:
+                await agent.cache.put(key, version, result.model_dump())
+            emit(key, status="ok", via="batch", result=result)
+        await asyncio.gather(*(single(key) for key in retry))
+
+    async def run() -> None:
+        # 1. Cached documents are answered straight away
+        short: List[Tuple[str, str, PreExtraction]] = []
+        long: List[str] = []
+        for key, positions in by_key.items():
+            cached = await agent.cache.get(key, version) if settings.EXTRACTION_CACHE else None
+            if cached is not None:
+                emit(key, status="ok", via="cache", result=ExtractionResult(**{**cached, "cached": True}))
+                continue
+            text = documents[positions[0]].ocr_text
+            trimmed = trim_ocr_text(text)
+            if len(trimmed) <= settings.EXTRACTION_BATCH_DOC_CHARS:
+                short.append((key, trimmed, pre_extract(text)))
+            else:
+                long.append(key)
+
+        # 2. Short documents are packed; long ones (possibly chunked) go alone
+        groups = pack_documents(
+            [len(text) for _, text, _ in short], settings.EXTRACTION_BATCH_MAX_DOCS, settings.EXTRACTION_BATCH_CHARS
+        )
+        await asyncio.gather(
+            *(packed([short[i] for i in group]) if len(group) > 1 else single(short[group[0]][0]) for group in groups),
+            *(single(key) for key in long),
+        )
+
+    runner = asyncio.create_task(run())
+    try:
+        for _ in range(len(documents)):
+            yield await queue.get()
+    finally:
+        runner.cancel()
+
+
+async def run_batch_extraction(
+    documents: List[BatchDocument],
+    max_concurrency: Optional[int] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> BatchExtractionSummary:
+    """Collect `iter_extractions` into one summary (request order)."""
+    start = time.monotonic()
+    items: List[BatchExtractionItem] = []
+    async for item in iter_extractions(documents, max_concurrency):
+        items.append(item)
+        if on_progress:
+            on_progress(len(items), len(documents), item)
+    items.sort(key=lambda item: item.index)
+    ok = sum(item.status == "ok" for item in items)
+    summary = BatchExtractionSummary(
+        total=len(items),
+        ok=ok,
+        failed=len(items) - ok,
+        cached=sum(item.via == "cache" for item in items),
+        batched=sum(item.via == "batch" for item in items),
+        duration_ms=round((time.monotonic() - start) * 1000, 1),
+        results=items,
+    )
+    logger.info("Batch extraction complete", total=summary.total, failed=summary.failed,
+                cached=summary.cached, batched=summary.batched, duration_ms=summary.duration_ms)
+    return summary
@@ -0,0 +1,131 @@
+# =============================================================================
+# BuildBidz - Extraction Result Cache
+# =============================================================================
+# The same invoice arrives many times: forwarded on WhatsApp, re-scanned, or
+# retried by the extraction worker. Results are cached by a hash of the
+# normalised OCR text, in a bounded in-process LRU in front of the
+# `extraction_results` table, under a version key so prompt or model
+# changes invalidate old entries.
+# =============================================================================
+
+import asyncio
+import hashlib
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import structlog
+
+from app.db.extractions_repo import extractions_repo
+
+logger = structlog.get_logger()
+
+_DECORATION = re.compile(r"^[\W_]*$")
+
+
+def normalise_ocr_text(text: str) -> str:
+    """OCR text with layout noise removed: Unicode-normalised, whitespace
+    collapsed, blank and separator-only lines dropped. Case is kept (it
+    matters for GSTINs and invoice numbers)."""
+    lines = (re.sub(r"\s+", " ", line).strip() for line in unicodedata.normalize("NFKC", text).splitlines())
+    return "\n".join(line for line in lines if not _DECORATION.match(line))
+
+
+def ocr_text_key(text: str) -> str:
+    return hashlib.blake2b(normalise_ocr_text(text).encode(), digest_size=16).hexdigest()
+
+
+class ExtractionCache:
+    """
+    LRU of extraction payloads keyed by (text hash, version), backed by
+    Postgres. Concurrent misses for the same key share one extraction.
+    Store failures are logged and treated as misses.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, key: Tuple[str, str], payload: Dict[str, Any]) -> None:
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _lookup(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        payload = self._entries.get(key)
+        if payload is not None:
+            self._entries.move_to_end(key)
+            return payload
+        try:
+            payload = await extractions_repo.get_result(*key)
+        except Exception as e:
+            logger.warning("Extraction store unavailable", error=str(e))
+            return None
+        if payload is not None:
+            self._remember(key, payload)
+        return payload
+
+    async def get(self, text_hash: str, version: str) -> Optional[Dict[str, Any]]:
+        """Cached payload or None (memory first, then Postgres)."""
+        payload = await self._lookup((text_hash, version))
+        if payload is not None:
+            self.hits += 1
+        return payload
+
+    async def put(self, text_hash: str, version: str, payload: Dict[str, Any]) -> None:
+        self._remember((text_hash, version), payload)
+        try:
+            await extractions_repo.save_result(text_hash, version, payload)
+        except Exception as e:
+            logger.warning("Could not persist extraction result", text_hash=text_hash, error=str(e))
+
+    async def get_or_extract(
+        self,
+        text_hash: str,
+        version: str,
+        extract: Callable[[], Awaitable[Tuple[Dict[str, Any], bool]]],
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        (payload, hit). On a miss `extract()` returns (payload, cacheable);
+        only cacheable payloads (complete model results, not fallbacks) are stored.
+        """
+        key = (text_hash, version)
+        payload = self._entries.get(key)
+        if payload is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload, True
+
+        flight = self._inflight.setdefault(key, asyncio.Lock())
+        async with flight:
+            try:
+                payload = await self.get(text_hash, version)
+                if payload is not None:
+                    return payload, True
+
+                self.misses += 1
+                payload, cacheable = await extract()
+                if cacheable:
+                    await self.put(text_hash, version, payload)
+                return payload, False
+            finally:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
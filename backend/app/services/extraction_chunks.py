@@ -0,0 +1,160 @@
+# =============================================================================
+# BuildBidz - Extraction Chunking
+# =============================================================================
+# Splits long OCR text (multi-page invoices, BOQs) into chunks the extractor
+# handles comfortably, and merges the per-chunk results back into one
+# document deterministically.
+#
+# Splits fall on page boundaries (form feeds from the OCR worker, or
+# "Page N of M" lines), then on blank-line blocks, then between table rows.
+# A chunk that continues a table repeats the table's column header row.
+# =============================================================================
+
+import re
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+# =============================================================================
+# Data Models
+# =============================================================================
+
+class ChunkMetric(BaseModel):
+    index: int
+    chars: int
+    line_items: int
+    duration_ms: float
+    status: str  # "ok", "failed"
+    error: Optional[str] = None
+
+# =============================================================================
+# Splitting
+# =============================================================================
+
+_PAGE_LINE = re.compile(r"^\s*(?:-+\s*)?page\s*\d+(?:\s*(?:of|/)\s*\d+)?\s*(?:-+)?\s*$", re.I)
+_TABLE_HEADER = re.compile(r"\b(?:description|particulars|item)\b.*\b(?:qty|quantity|rate|amount|price)\b", re.I)
+
+
+def split_pages(text: str) -> List[str]:
+    """Pages from form feeds and standalone "Page N (of M)" lines."""
+    pages: List[str] = []
+    for block in text.split("\f"):
+        current: List[str] = []
+        for line in block.split("\n"):
+            if _PAGE_LINE.match(line):
+                if any(l.strip() for l in current):
+                    pages.append("\n".join(current))
+                current = []
+                continue
+            current.append(line)
+        if any(l.strip() for l in current):
+            pages.append("\n".join(current))
+    return pages
+
+
+def _split_block(block: str, max_chars: int) -> List[str]:
+    """Split an oversized block between rows, repeating the table header row."""
+    lines = block.split("\n")
+    header = next((l for l in lines if _TABLE_HEADER.search(l)), None)
+    parts: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in lines:
+        if current and size + len(line) + 1 > max_chars:
+            parts.append("\n".join(current))
+            current = [header] if header is not None and line is not header else []
+            size = sum(len(l) + 1 for l in current)
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        parts.append("\n".join(current))
+    return parts
+
+
+def split_chunks(text: str, max_chars: int) -> List[str]:
+    """
+    Chunks of at most ~`max_chars`, never splitting inside a line. Pages are
+    packed together while they fit; a page that doesn't fit is split on
+    blank lines, and a block that still doesn't fit is split between rows.
+    """
+    chunks: List[str] = []
+    current = ""
+
+    def flush() -> None:
+        nonlocal current
+        if current.strip():
+            chunks.append(current.strip("\n"))
+        current = ""
+
+    for page in split_pages(text):
+        if len(current) + len(page) + 1 <= max_chars:
+            current = f"{current}\n{page}" if current else page
+            continue
+        flush()
+        if len(page) <= max_chars:
+            current = page
+            continue
+        for block in re.split(r"\n\s*\n", page):
+            pieces = [block] if len(block) <= max_chars else _split_block(block, max_chars)
+            for piece in pieces:
+                if len(current) + len(piece) + 2 > max_chars:
+                    flush()
+                current = f"{current}\n\n{piece}" if current else piece
+        flush()
+    flush()
+    return chunks
+
+# =============================================================================
+# Merging
+# =============================================================================
+
+HEADER_FIELDS = ("vendor_name", "invoice_number", "invoice_date", "gstin", "pan")
+
+# Rows that restate running totals rather than describe goods
+_NOT_AN_ITEM = re.compile(r"^\s*(?:(?:brought|carried)\s*(?:forward|fwd|over)|b/?f|c/?f|sub\s*-?\s*total|total)\b", re.I)
+
+
+def _item_key(item: Dict[str, Any]) -> tuple:
+    return (
+        re.sub(r"\s+", " ", str(item.get("description") or "")).strip().lower(),
+        item.get("quantity"), item.get("unit_price"), item.get("total_price"),
+    )
+
+
+def merge_chunk_results(results: List[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    One document from per-chunk extractions (None for failed chunks), in chunk order.
+
+    - Header fields: first non-null value (the header is on the first page).
+    - total_amount: last non-null value (the grand total is on the last page).
+    - document_type: first value other than UNKNOWN.
+    - line_items: concatenated; carried-forward/subtotal rows are dropped, and
+      a row repeated across a chunk boundary (a row split over two pages) is
+      kept once. Identical rows inside one chunk are real and are kept.
+    """
+    merged: Dict[str, Any] = {field: None for field in HEADER_FIELDS}
+    merged["document_type"] = "UNKNOWN"
+    merged["total_amount"] = None
+    items: List[Dict[str, Any]] = []
+
+    for data in results:
+        if not data:
+            continue
+        for field in HEADER_FIELDS:
+            if merged[field] is None and data.get(field):
+                merged[field] = data[field]
+        if merged["document_type"] == "UNKNOWN" and data.get("document_type") not in (None, "", "UNKNOWN"):
+            merged["document_type"] = data["document_type"]
+        if data.get("total_amount") is not None:
+            merged["total_amount"] = data["total_amount"]
+
+        chunk_items = [
+            item for item in data.get("line_items") or []
+            if isinstance(item, dict) and item.get("description") and not _NOT_AN_ITEM.match(str(item["description"]))
+        ]
+        if items and chunk_items and _item_key(items[-1]) == _item_key(chunk_items[0]):
+            chunk_items = chunk_items[1:]
+        items.extend(chunk_items)
+
+    merged["line_items"] = items
+    return merged
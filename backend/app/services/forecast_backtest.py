@@ -0,0 +1,236 @@
+# =============================================================================
+# BuildBidz - Forecast Backtesting
+# =============================================================================
+# Replays rolling-origin forecasts over historical price windows: at every
+# origin the model only sees the history up to that day, forecasts the next
+# horizon, and is scored against what actually happened. The lock/wait
+# decision the service would have made is scored too, as the saving from
+# locking versus buying at the horizon.
+#
+# History comes from any PriceDataSource (SimulatedDataSource, or the price
+# store via StoredDataSource), so runs are fully offline. Each origin fits
+# every series in one batched call; origins are spread over a process pool.
+# =============================================================================
+
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+import structlog
+
+from app.services.forecast_engine import fit_forecast
+from app.services.price_data_source import PriceDataSource
+from app.services.price_forecast import PriceForecastService
+
+logger = structlog.get_logger()
+
+# Forecast days reported individually in the MAPE curve
+REPORT_HORIZONS = (1, 7, 14, 30)
+
+# =============================================================================
+# Data Models
+# =============================================================================
+
+class SeriesBacktest(BaseModel):
+    material: str
+    region: str
+    mape: float                 # mean absolute % error over all origins and forecast days
+    mape_at_horizon: float      # ... on the last forecast day only
+    coverage: float             # share of actuals inside the forecast interval
+    lock_decisions: int
+    lock_hit_rate: Optional[float] = None   # share of locks where the price did rise
+    pnl_percent: float          # saving from locks summed over decisions, in % of each decision's spend
+
+class BacktestReport(BaseModel):
+    start: str
+    end: str
+    origins: int
+    series: int
+    history_days: int
+    horizon_days: int
+    interval_level: float
+    target_margin_percent: float
+    lock_premium_percent: float
+    mape: float
+    mape_by_horizon: Dict[int, float]
+    coverage: float
+    lock_decisions: int
+    lock_hit_rate: Optional[float] = None
+    pnl_percent_per_decision: float  # mean saving per origin x series decision (waits count as 0)
+    pnl_percent_per_lock: Optional[float] = None
+    by_series: List[SeriesBacktest]
+    duration_ms: float
+
+# =============================================================================
+# History
+# =============================================================================
+
+async def load_history(
+    source: PriceDataSource, pairs: Sequence[Tuple[str, str]], start: date, end: date
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(dates (T,), prices (S, T)) on one daily grid for [start, end]; missing days are NaN."""
+    dates = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    days = len(dates)
+    series = await asyncio.gather(*(source.get_price_history(m, r, days, end_date=end) for m, r in pairs))
+    prices = np.full((len(pairs), days), np.nan)
+    for i, s in enumerate(series):
+        if len(s):
+            prices[i, (s.dates - dates[0]).astype(np.int64)] = s.prices
+    return dates, prices
+
+# =============================================================================
+# Scoring (runs in worker processes)
+# =============================================================================
+
+# Set once per worker by the pool initializer so origins don't re-ship the matrix
+_history: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+
+def _init_worker(dates: np.ndarray, prices: np.ndarray) -> None:
+    global _history
+    _history = (dates, prices)
+
+
+def _score_origin(
+    origin: int,
+    history_days: int,
+    horizon: int,
+    interval_level: float,
+    stable_band: float,
+    breach_lock_probability: float,
+    margin: float,
+    premium: float,
+) -> Dict[str, np.ndarray]:
+    """Fit on the `history_days` before `origin` and score the next `horizon` days, per series."""
+    dates, prices = _history
+    past = prices[:, origin - history_days:origin]
+    actual = prices[:, origin:origin + horizon]
+    batch = fit_forecast(past, dates[origin - history_days:origin], horizon=horizon, interval_level=interval_level)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ape = np.abs(batch.median - actual) / actual
+    inside = (actual >= batch.lower) & (actual <= batch.upper)
+    observed = np.isfinite(actual)
+
+    # Same rule as the request path: lock if waiting is expected to cost more
+    # than the stable band (plus the lock premium), or the margin is at risk
+    current = batch.last_price
+    expected_rise = np.exp(batch.log_mean[:, -1] + batch.log_sd[:, -1] ** 2 / 2) / current - 1
+    breach = batch.prob_above(current * (1 + margin))
+    lock = (expected_rise > stable_band + premium) | (breach >= breach_lock_probability)
+
+    final = actual[:, -1]
+    rose = final > current
+    saving = np.where(lock, final / current - 1 - premium, 0.0)  # vs. buying at the horizon
+    decided = np.isfinite(final) & np.isfinite(current)
+    return {
+        "ape": np.where(observed, ape, 0.0),
+        "observed": observed,
+        "inside": inside & observed,
+        "lock": lock & decided,
+        "hit": lock & decided & rose,
+        "saving": np.where(decided, saving, 0.0),
+        "decided": decided,
+    }
+
+# =============================================================================
+# Runner
+# =============================================================================
+
+async def run_backtest(
+    source: PriceDataSource,
+    pairs: Sequence[Tuple[str, str]],
+    start: date,
+    end: date,
+    history_days: int = 730,
+    horizon: int = 30,
+    step_days: int = 7,
+    interval_level: float = 0.9,
+    target_margin_percent: float = 12.0,
+    lock_premium_percent: float = 0.0,
+    workers: Optional[int] = None,
+) -> BacktestReport:
+    """
+    Rolling-origin backtest over [start, end]: the first origin has
+    `history_days` of history before it, the last leaves a full `horizon`
+    after it, and origins advance `step_days` at a time.
+
+    `workers=1` scores in-process; otherwise origins go to a process pool
+    (default: one worker per CPU).
+    """
+    started = time.monotonic()
+    dates, prices = await load_history(source, pairs, start, end)
+    origins = list(range(history_days, len(dates) - horizon + 1, step_days))
+    if not origins:
+        raise ValueError(f"[{start}, {end}] is too short for {history_days} days of history plus a {horizon}-day horizon")
+
+    args = (
+        history_days, horizon, interval_level,
+        PriceForecastService.STABLE_BAND, PriceForecastService.MARGIN_BREACH_LOCK_PROBABILITY,
+        target_margin_percent / 100, lock_premium_percent / 100,
+    )
+    workers = min(workers or os.cpu_count() or 1, len(origins))
+    if workers == 1:
+        _init_worker(dates, prices)
+        scored = [_score_origin(o, *args) for o in origins]
+    else:
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(dates, prices)) as pool:
+            scored = await asyncio.gather(*(loop.run_in_executor(pool, _score_origin, o, *args) for o in origins))
+
+    # Stack to (origins, S, H) / (origins, S) and reduce
+    stacked = {k: np.stack([s[k] for s in scored]) for k in scored[0]}
+    ape, observed, inside = stacked["ape"], stacked["observed"], stacked["inside"]
+    lock, hit, saving, decided = stacked["lock"], stacked["hit"], stacked["saving"], stacked["decided"]
+
+    def ratio(num, den) -> Optional[float]:
+        return round(float(num / den), 4) if den else None
+
+    by_series = [
+        SeriesBacktest(
+            material=material,
+            region=region,
+            mape=ratio(ape[:, i].sum(), observed[:, i].sum()) or 0.0,
+            mape_at_horizon=ratio(ape[:, i, -1].sum(), observed[:, i, -1].sum()) or 0.0,
+            coverage=ratio(inside[:, i].sum(), observed[:, i].sum()) or 0.0,
+            lock_decisions=int(lock[:, i].sum()),
+            lock_hit_rate=ratio(hit[:, i].sum(), lock[:, i].sum()),
+            pnl_percent=round(float(saving[:, i].sum()) * 100, 2),
+        )
+        for i, (material, region) in enumerate(pairs)
+    ]
+
+    total_locks = int(lock.sum())
+    report = BacktestReport(
+        start=str(dates[0]),
+        end=str(dates[-1]),
+        origins=len(origins),
+        series=len(pairs),
+        history_days=history_days,
+        horizon_days=horizon,
+        interval_level=interval_level,
+        target_margin_percent=target_margin_percent,
+        lock_premium_percent=lock_premium_percent,
+        mape=ratio(ape.sum(), observed.sum()) or 0.0,
+        mape_by_horizon={
+            h: ratio(ape[:, :, h - 1].sum(), observed[:, :, h - 1].sum()) or 0.0
+            for h in REPORT_HORIZONS if h <= horizon
+        },
+        coverage=ratio(inside.sum(), observed.sum()) or 0.0,
+        lock_decisions=total_locks,
+        lock_hit_rate=ratio(hit.sum(), total_locks),
+        pnl_percent_per_decision=round(float(saving.sum() / max(decided.sum(), 1)) * 100, 4),
+        pnl_percent_per_lock=round(float(saving.sum() / total_locks) * 100, 4) if total_locks else None,
+        by_series=by_series,
+        duration_ms=round((time.monotonic() - started) * 1000, 1),
+    )
+    logger.info(
+        "Backtest complete", origins=report.origins, series=report.series, workers=workers,
+        mape=report.mape, coverage=report.coverage, duration_ms=report.duration_ms,
+    )
+    return report
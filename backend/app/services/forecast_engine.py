@@ -0,0 +1,170 @@
+# =============================================================================
+# BuildBidz - Statistical Forecast Engine
+# =============================================================================
+# Damped-trend Holt-Winters (additive, on log prices) in pure NumPy, fitted
+# for every material x region series in a single batched pass.
+#
+# Seasonality is indexed by calendar month rather than a fixed period, which
+# captures the monsoon dip (June-September) and the pre-monsoon construction
+# peak on daily data. Smoothing parameters are chosen per series from a
+# small grid: all series x all candidates are filtered together as one
+# (S, P) state array, so the Python loop only runs over time steps.
+# =============================================================================
+
+import math
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Candidate smoothing parameters (error-correction form)
+ALPHAS = (0.05, 0.1, 0.2, 0.4)   # level
+BETAS = (0.0, 0.005, 0.02)       # trend
+GAMMAS = (0.0, 0.01, 0.03)       # calendar-month seasonal
+PHIS = (0.9, 0.98)               # trend damping
+
+# One-step errors from the first days are dominated by initialisation
+WARMUP_DAYS = 14
+
+_erf = np.vectorize(math.erf, otypes=[np.float64])
+
+
+def _param_grid() -> np.ndarray:
+    grid = np.array(np.meshgrid(ALPHAS, BETAS, GAMMAS, PHIS, indexing="ij"))
+    return grid.reshape(4, -1).T  # (P, 4): alpha, beta, gamma, phi
+
+
+def _month_index(dates: np.ndarray) -> np.ndarray:
+    return (dates.astype("datetime64[M]").astype(np.int64) % 12).astype(np.intp)
+
+
+def normal_cdf(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + _erf(np.asarray(x, dtype=np.float64) / math.sqrt(2.0)))
+
+
+@dataclass
+class BatchForecast:
+    """Forecasts for S series over H days (price scale, intervals from the model)."""
+    dates: np.ndarray        # (H,) datetime64[D]
+    median: np.ndarray       # (S, H)
+    lower: np.ndarray        # (S, H)
+    upper: np.ndarray        # (S, H)
+    log_mean: np.ndarray     # (S, H)
+    log_sd: np.ndarray       # (S, H)
+    last_price: np.ndarray   # (S,)
+    sigma: np.ndarray        # (S,) one-step residual std (log scale)
+    params: np.ndarray       # (S, 4) alpha, beta, gamma, phi
+    interval_level: float
+
+    def prob_above(self, price: np.ndarray, h: Optional[int] = None) -> np.ndarray:
+        """P(price at horizon h > `price`) per series (h defaults to the last day)."""
+        idx = (h or self.dates.shape[0]) - 1
+        z = (self.log_mean[:, idx] - np.log(price)) / self.log_sd[:, idx]
+        return normal_cdf(z)
+
+    def direction_confidence(self, h: Optional[int] = None) -> np.ndarray:
+        """Probability the price moves the way the point forecast says, vs. today."""
+        p_up = self.prob_above(self.last_price, h)
+        return np.maximum(p_up, 1.0 - p_up)
+
+
+def _initial_state(y: np.ndarray, observed: np.ndarray, months: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Level/trend from a per-series least-squares line, seasonal from monthly residual means."""
+    t = np.arange(y.shape[1], dtype=np.float64)
+    n = observed.sum(axis=1)
+    y0 = np.where(observed, y, 0.0)
+    t_mean = (observed * t).sum(axis=1) / n
+    y_mean = y0.sum(axis=1) / n
+    dt = np.where(observed, t - t_mean[:, None], 0.0)
+    slope = (dt * (y0 - y_mean[:, None]) * observed).sum(axis=1) / np.maximum((dt * dt).sum(axis=1), 1e-12)
+    intercept = y_mean - slope * t_mean
+
+    resid = np.where(observed, y - (intercept[:, None] + slope[:, None] * t), 0.0)
+    onehot = np.eye(12)[months]                      # (T, 12)
+    counts = observed.astype(np.float64) @ onehot    # (S, 12)
+    season = np.divide(resid @ onehot, counts, out=np.zeros_like(counts), where=counts > 0)
+    seen = counts > 0
+    season -= np.where(seen, season, 0.0).sum(axis=1, keepdims=True) / np.maximum(seen.sum(axis=1, keepdims=True), 1)
+    season[~seen] = 0.0
+    return intercept, slope, season
+
+
+def fit_forecast(
+    prices: np.ndarray,
+    dates: np.ndarray,
+    horizon: int = 30,
+    interval_level: float = 0.9,
+) -> BatchForecast:
+    """
+    Fit all series at once and forecast `horizon` days past the last date.
+
+    `prices` is (S, T) on the shared daily grid `dates` (T,); missing days
+    are NaN and simply skip the state update. Each series needs at least a
+    couple of observations.
+    """
+    prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    S, T = prices.shape
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y = np.log(prices)
+    observed = np.isfinite(y)
+    months = _month_index(dates)
+
+    grid = _param_grid()
+    P = grid.shape[0]
+    alpha, beta, gamma, phi = (grid[:, k][None, :] for k in range(4))  # (1, P)
+
+    intercept, slope, season0 = _initial_state(y, observed, months)
+    level = np.repeat(intercept[:, None], P, axis=1)
+    trend = np.repeat(slope[:, None], P, axis=1)
+    season = np.repeat(season0[:, None, :], P, axis=1)    # (S, P, 12)
+    sse = np.zeros((S, P))
+
+    for t in range(T):
+        m = months[t]
+        s_m = season[:, :, m]
+        ok = observed[:, t][:, None]
+        e = np.where(ok, y[:, t][:, None] - (level + phi * trend + s_m), 0.0)
+        if t >= WARMUP_DAYS:
+            sse += e * e
+        level = level + phi * trend + alpha * e
+        trend = phi * trend + beta * e
+        season[:, :, m] = s_m + gamma * e
+
+    # Best candidate per series
+    best = np.argmin(sse, axis=1)
+    rows = np.arange(S)
+    level, trend, season = level[rows, best], trend[rows, best], season[rows, best]
+    params = grid[best]
+    a, b, phi_s = params[:, 0:1], params[:, 1:2], params[:, 3:4]
+    n_scored = np.maximum(observed[:, WARMUP_DAYS:].sum(axis=1), 1)
+    sigma = np.sqrt(sse[rows, best] / n_scored)
+
+    # h-step forecast: l + (phi + ... + phi^h) b + s[month(t+h)]
+    h = np.arange(1, horizon + 1)
+    f_dates = dates[-1] + h.astype("timedelta64[D]")
+    phi_pow = phi_s ** h[None, :]                                   # (S, H)
+    damp_sum = np.cumsum(phi_pow, axis=1)
+    log_mean = level[:, None] + damp_sum * trend[:, None] + season[:, _month_index(f_dates)]
+
+    # ETS(A,Ad,N) variance: sigma^2 (1 + sum_{j<h} (alpha + beta * damp_sum_j)^2)
+    c = a + b * damp_sum
+    var_factor = 1.0 + np.concatenate([np.zeros((S, 1)), np.cumsum(c[:, :-1] ** 2, axis=1)], axis=1)
+    log_sd = sigma[:, None] * np.sqrt(var_factor)
+
+    z = NormalDist().inv_cdf(0.5 + interval_level / 2)
+    last_idx = T - 1 - np.argmax(observed[:, ::-1], axis=1)
+    return BatchForecast(
+        dates=f_dates,
+        median=np.exp(log_mean),
+        lower=np.exp(log_mean - z * log_sd),
+        upper=np.exp(log_mean + z * log_sd),
+        log_mean=log_mean,
+        log_sd=log_sd,
+        last_price=prices[rows, last_idx],
+        sigma=sigma,
+        params=params,
+        interval_level=interval_level,
+    )
@@ -0,0 +1,27 @@
+# =============================================================================
+# BuildBidz - Image Deduplication
+# =============================================================================
+# Site teams upload the same receipt photo from several phones. Scope: exact
+# copies only. An image reuses an earlier upload's OCR when its decoded,
+# upright pixels are identical - the same file uploaded again, or re-saved
+# losslessly / in another container. Recompressed or resized forwards are
+# OCRed again: receipts printed from one template differ in a few digits of
+# small print, which neither a perceptual hash nor a thumbnail comparison
+# tells apart from compression noise, and reusing another receipt's amounts
+# is worse than a repeated OCR call.
+#
+# The lookup is an equality match on the content hash, indexed per org.
+# =============================================================================
+
+import hashlib
+import io
+
+
+def content_hash(image_bytes: bytes) -> bytes:
+    """SHA-256 of the decoded, upright pixels: equal only for pixel-identical images, whatever the file format."""
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(image_bytes))).convert("RGB")
+    digest = hashlib.sha256(f"{image.width}x{image.height}:".encode())
+    digest.update(image.tobytes())
+    return digest.digest()
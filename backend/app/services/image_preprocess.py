@@ -0,0 +1,171 @@
+# =============================================================================
+# BuildBidz - OCR Image Preprocessing
+# =============================================================================
+# Phone photos of invoices are 8-12 MP JPEGs, far more pixels than OCR needs
+# for text. Before OCR each image is rotated upright from its EXIF
+# orientation, converted to grayscale, downscaled so an A4 page would come
+# out at OCR_PREPROCESS_DPI, cropped to the inked area and binarised with an
+# Otsu threshold. The result is a small PNG: quicker to upload to Azure and
+# quicker for Tesseract to read.
+#
+# With OCR_PREPROCESS_COMPARE both the original and the preprocessed image
+# are OCRed, so the effect on accuracy can be checked on real uploads.
+# =============================================================================
+
+import asyncio
+import io
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from pydantic import BaseModel
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+# Long side of an A4 page in inches; photos are assumed to frame about one page
+A4_LONG_INCHES = 11.69
+# Padding kept around the inked area, as a share of each side
+CROP_MARGIN = 0.02
+
+OCRFunction = Callable[[bytes], Awaitable[Dict[str, Any]]]
+
+# =============================================================================
+# Data Models
+# =============================================================================
+
+class PreprocessedImage(BaseModel):
+    image: bytes
+    original_bytes: int
+    output_bytes: int
+    original_size: Tuple[int, int]
+    output_size: Tuple[int, int]
+    rotated: bool
+    duration_ms: float
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.output_bytes
+
+    def metrics(self) -> Dict[str, Any]:
+        return self.model_dump(exclude={"image"}) | {"bytes_saved": self.bytes_saved}
+
+# =============================================================================
+# Preprocessing
+# =============================================================================
+
+def otsu_threshold(histogram: List[int]) -> int:
+    """Gray level (0-255) that best separates ink from paper."""
+    total = sum(histogram)
+    weighted_total = sum(level * count for level, count in enumerate(histogram))
+    background = weighted_background = 0
+    best_level, best_variance = 127, -1.0
+    for level, count in enumerate(histogram):
+        background += count
+        if background == 0:
+            continue
+        foreground = total - background
+        if foreground == 0:
+            break
+        weighted_background += level * count
+        mean_b = weighted_background / background
+        mean_f = (weighted_total - weighted_background) / foreground
+        variance = background * foreground * (mean_b - mean_f) ** 2
+        if variance > best_variance:
+            best_level, best_variance = level, variance
+    return best_level
+
+
+def preprocess_image(image_bytes: bytes, dpi: int = 0, binarise: bool = True) -> PreprocessedImage:
+    """Upright, grayscale, downscaled, cropped (and binarised) PNG of `image_bytes`."""
+    from PIL import Image, ImageOps
+
+    start = time.monotonic()
+    max_side = round(A4_LONG_INCHES * (dpi or settings.OCR_PREPROCESS_DPI))
+
+    image = Image.open(io.BytesIO(image_bytes))
+    original_size = image.size
+    # JPEGs can be decoded straight to grayscale at a fraction of full size
+    image.draft("L", (max_side, max_side))
+    orientation = image.getexif().get(0x0112, 1)
+    image = ImageOps.exif_transpose(image).convert("L")
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    threshold = otsu_threshold(image.histogram())
+    ink = image.point(lambda v: 255 if v <= threshold else 0).getbbox()
+    if ink is not None:
+        pad_x, pad_y = round(image.width * CROP_MARGIN), round(image.height * CROP_MARGIN)
+        left, top, right, bottom = ink
+        image = image.crop((
+            max(left - pad_x, 0), max(top - pad_y, 0),
+            min(right + pad_x, image.width), min(bottom + pad_y, image.height),
+        ))
+    if binarise:
+        image = image.point(lambda v: 255 if v > threshold else 0, mode="1")
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    output = buffer.getvalue()
+    return PreprocessedImage(
+        image=output,
+        original_bytes=len(image_bytes),
+        output_bytes=len(output),
+        original_size=original_size,
+        output_size=image.size,
+        rotated=orientation not in (None, 1),
+        duration_ms=round((time.monotonic() - start) * 1000, 1),
+    )
+
+# =============================================================================
+# OCR Wrapper
+# =============================================================================
+
+async def _timed(ocr: OCRFunction, image: bytes) -> Tuple[Dict[str, Any], float]:
+    start = time.monotonic()
+    result = await ocr(image)
+    return result, round((time.monotonic() - start) * 1000, 1)
+
+
+def _summary(result: Dict[str, Any], ocr_ms: float) -> Dict[str, Any]:
+    return {"ocr_ms": ocr_ms, "chars": len(result.get("text", "")), "confidence": result.get("confidence")}
+
+
+async def ocr_with_preprocessing(
+    image_bytes: bytes,
+    ocr: OCRFunction,
+    preprocess: Callable[[bytes], Awaitable[PreprocessedImage]],
+    compare: bool = False,
+) -> Dict[str, Any]:
+    """
+    OCR the preprocessed image, recording the preprocessing metrics and OCR
+    time under `preprocess`. With `compare`, the original is OCRed as well
+    and the result with the higher confidence is returned.
+    """
+    try:
+        prepared = await preprocess(image_bytes)
+    except Exception as e:
+        # Formats Pillow can't open (HEIC without the plugin, corrupt files) go to OCR as is
+        logger.warning("Image preprocessing failed, using original", error=str(e))
+        return await ocr(image_bytes)
+    if not compare:
+        result, ocr_ms = await _timed(ocr, prepared.image)
+        return {**result, "preprocess": {**prepared.metrics(), "ocr_ms": ocr_ms}}
+
+    (processed, processed_ms), (original, original_ms) = await asyncio.gather(
+        _timed(ocr, prepared.image), _timed(ocr, image_bytes)
+    )
+    comparison = {"preprocessed": _summary(processed, processed_ms), "original": _summary(original, original_ms)}
+    use_original = (original.get("confidence") or 0.0) > (processed.get("confidence") or 0.0)
+    logger.info(
+        "OCR preprocessing comparison",
+        bytes_saved=prepared.bytes_saved,
+        used="original" if use_original else "preprocessed",
+        **{f"{k}_{m}": v for k, s in comparison.items() for m, v in s.items()},
+    )
+    chosen, ocr_ms = (original, original_ms) if use_original else (processed, processed_ms)
+    return {
+        **chosen,
+        "preprocess": {**prepared.metrics(), "ocr_ms": ocr_ms, "used": "original" if use_original else "preprocessed",
+                       "compare": comparison},
+    }
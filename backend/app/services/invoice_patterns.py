@@ -0,0 +1,294 @@
+# =============================================================================
+# BuildBidz - Invoice Field Pre-extraction
+# =============================================================================
+# Deterministic pass over OCR text for the fields that are fully regular:
+# GSTIN (15 chars with a mod-36 check character), PAN (10 chars, also
+# embedded in the GSTIN) and the invoice total in ₹ / lakh / crore notation.
+# Results feed the extractor as validated hints, and the OCR text is trimmed
+# of decoration and boilerplate before it is sent to the model.
+# =============================================================================
+
+import re
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel
+
+# =============================================================================
+# Data Models
+# =============================================================================
+
+class PreExtraction(BaseModel):
+    gstin: Optional[str] = None
+    gstin_valid: bool = False              # check character verified
+    pan: Optional[str] = None
+    pan_source: Optional[str] = None       # "text", "gstin" or "text+gstin"
+    total_amount: Optional[float] = None
+    total_confidence: float = 0.0          # 0-1, from the label the amount sat next to
+    document_type: Optional[str] = None    # from title keywords, if any
+
+    @property
+    def confident(self) -> bool:
+        """Enough to verify the invoice without the model."""
+        return self.gstin_valid and self.total_amount is not None and self.total_confidence >= 0.9
+
+# =============================================================================
+# GSTIN / PAN
+# =============================================================================
+
+_ALNUM36 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# State/UT codes in use, plus 97 (other territory) and 99 (centre jurisdiction)
+_STATE_CODES = {f"{n:02d}" for n in range(1, 39)} | {"97", "99"}
+
+# Characters OCR commonly confuses, mapped by what the position must hold
+_TO_DIGIT = str.maketrans({"O": "0", "D": "0", "Q": "0", "I": "1", "L": "1", "Z": "2", "S": "5", "B": "8", "G": "6"})
+_TO_LETTER = str.maketrans({"0": "O", "1": "I", "2": "Z", "5": "S", "8": "B", "6": "G"})
+# 2 digits (state), 5 letters + 4 digits + 1 letter (PAN), entity number, 'Z', check
+_GSTIN_SHAPE = "DDLLLLLDDDDLAZA"
+
+_GSTIN_CANDIDATE = re.compile(r"(?<![0-9A-Z])[0-9A-Z]{15}(?![0-9A-Z])")
+# Matched on the compacted line, where the label is glued on ("GSTIN/UIN:27AAP..." -> "GSTIN/UIN27AAP...")
+_GSTIN_LABELLED = re.compile(r"GST(?:IN)?(?:/?UIN)?(?:NO)?([0-9A-Z]{15})")
+_PAN = re.compile(r"(?<![0-9A-Z])[A-Z]{3}[ABCFGHJLPT][A-Z][0-9]{4}[A-Z](?![0-9A-Z])")
+
+
+def gstin_check_char(first14: str) -> str:
+    """Mod-36 check character over the first 14 GSTIN characters."""
+    total = 0
+    for i, ch in enumerate(first14):
+        product = _ALNUM36.index(ch) * (2 if i % 2 else 1)
+        total += product // 36 + product % 36
+    return _ALNUM36[(36 - total % 36) % 36]
+
+
+def is_valid_gstin(gstin: str) -> bool:
+    if len(gstin) != 15 or gstin[:2] not in _STATE_CODES or gstin[13] != "Z":
+        return False
+    if not all(ch in _ALNUM36 for ch in gstin) or not _PAN.fullmatch(gstin[2:12]):
+        return False
+    return gstin_check_char(gstin[:14]) == gstin[14]
+
+
+def _repair_gstin(token: str) -> str:
+    """Undo OCR look-alike swaps using the character class each position requires."""
+    out = []
+    for ch, kind in zip(token, _GSTIN_SHAPE):
+        if kind == "D":
+            ch = ch.translate(_TO_DIGIT)
+        elif kind == "L":
+            ch = ch.translate(_TO_LETTER)
+        elif kind == "Z" and ch == "2":
+            ch = "Z"
+        out.append(ch)
+    return "".join(out)
+
+
+def _match_gstin(token: str) -> Optional[str]:
+    """`token` as a valid GSTIN, trying look-alike repairs; the entity number
+    and check character may be a letter or a digit, so both readings are tried."""
+    if is_valid_gstin(token):
+        return token
+    fixed = _repair_gstin(token)
+    for entity in dict.fromkeys((fixed[12], fixed[12].translate(_TO_DIGIT), fixed[12].translate(_TO_LETTER))):
+        for check in dict.fromkeys((fixed[14], fixed[14].translate(_TO_DIGIT), fixed[14].translate(_TO_LETTER))):
+            candidate = fixed[:12] + entity + "Z" + check
+            if is_valid_gstin(candidate):
+                return candidate
+    return None
+
+
+def _line_gstins(line: str) -> List[str]:
+    """GSTINs on one (uppercased) line."""
+    # Whole tokens first: "Supplier 27AAPFU0939F1ZV", "GSTIN/UIN: 27AAPFU0939F1ZV"
+    tokens = [m.group() for m in _GSTIN_CANDIDATE.finditer(line)]
+    # GSTINs printed with spaces or dashes only appear once the line is compacted
+    compact = re.sub(r"[\s\-.:]", "", line)
+    tokens += [m.group(1) for m in _GSTIN_LABELLED.finditer(compact)]
+    matches = [g for g in (_match_gstin(token) for token in tokens) if g is not None]
+    if matches:
+        return matches
+    # Last resort, a spaced-out GSTIN glued to the word before it: every
+    # 15-character window, checksum-valid as printed (no look-alike repair)
+    return [compact[i:i + 15] for i in range(len(compact) - 14) if is_valid_gstin(compact[i:i + 15])]
+
+
+def find_gstins(text: str) -> List[str]:
+    """Checksum-valid GSTINs in order of appearance (look-alike OCR errors repaired)."""
+    found: List[str] = []
+    for line in text.upper().splitlines():
+        for gstin in _line_gstins(line):
+            if gstin not in found:
+                found.append(gstin)
+    return found
+
+
+def find_pans(text: str) -> List[str]:
+    return list(dict.fromkeys(_PAN.findall(text.upper())))
+
+# =============================================================================
+# Amounts
+# =============================================================================
+
+_UNITS = {"lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "lacs": 1e5, "l": 1e5, "crore": 1e7, "crores": 1e7, "cr": 1e7}
+
+_AMOUNT = re.compile(
+    r"(?P<cur>₹|\brs\.?|\binr)?\s*"
+    r"(?P<num>\d{1,3}(?:,\d{2,3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?)"
+    r"\s*(?P<unit>lakhs?|lacs?|crores?|cr\b|l\b)?\.?\s*(?:/-)?",
+    re.IGNORECASE,
+)
+# What follows a bare integer that is a quantity or a rate, not money: "150 Bags", "18% GST"
+_QUANTITY_SUFFIX = re.compile(
+    r"\s*(?:%|(?:bags?|nos?|pcs?|pieces?|units?|mt|kgs?|tons?|tonnes?|qtls?|quintals?|cum|cft|sqft|sq\.?\s*ft|"
+    r"rft|rmt|ltrs?|litres?|boxes?|bundles?|trucks?|loads?|trips?|items?)\b)",
+    re.IGNORECASE,
+)
+
+# Total labels, strongest first: (pattern, confidence)
+_TOTAL_LABELS: List[Tuple[re.Pattern, float]] = [
+    (re.compile(r"grand\s*total|total\s*amount\s*(?:payable|due)|net\s*(?:amount\s*)?payable|amount\s*payable|invoice\s*total|total\s*invoice\s*value", re.I), 0.95),
+    (re.compile(r"total\s*amount|net\s*total|total\s*\(?incl", re.I), 0.85),
+    (re.compile(r"\btotal\b", re.I), 0.6),
+]
+_NOT_TOTAL = re.compile(r"sub\s*-?\s*total|total\s*(?:qty|quantity|items?|tax|gst|cgst|sgst|igst)|taxable", re.I)
+# Confidence ceiling when a total line holds several amounts and none is marked as money
+_AMBIGUOUS_TOTAL = 0.85
+
+
+def _amount_value(match: re.Match) -> float:
+    unit = (match.group("unit") or "").lower()
+    return float(match.group("num").replace(",", "")) * _UNITS.get(unit, 1.0)
+
+
+def parse_amount(text: str) -> Optional[float]:
+    """First amount in `text`: '₹1,23,456.50', 'Rs. 2,50,000/-', '12.5 lakh', '1.2 Cr'."""
+    match = _AMOUNT.search(text)
+    return _amount_value(match) if match else None
+
+
+def _total_amount(text: str) -> Tuple[Optional[float], bool]:
+    """
+    (amount, ambiguous) for the text after a total label. Numbers followed
+    by a unit or '%' are quantities/rates and skipped; an amount
+    marked as money (currency sign, paise, lakh/crore) wins, else the last
+    one on the line (the amount column comes last).
+    """
+    candidates, marked = [], []
+    for match in _AMOUNT.finditer(text):
+        currency = bool(match.group("cur") or match.group("unit"))
+        if not currency and _QUANTITY_SUFFIX.match(text, match.end("num")):
+            continue
+        is_marked = currency or "." in match.group("num")
+        candidates.append(_amount_value(match))
+        if is_marked:
+            marked.append(candidates[-1])
+    if not candidates:
+        return None, False
+    if marked:
+        return marked[-1], len(marked) > 1
+    return candidates[-1], len(candidates) > 1
+
+
+def find_total(text: str) -> Tuple[Optional[float], float]:
+    """(total, confidence) from the strongest total label; the last such line wins (totals sit at the bottom)."""
+    best: Tuple[Optional[float], float] = (None, 0.0)
+    for line in text.splitlines():
+        if _NOT_TOTAL.search(line):
+            continue
+        for label, confidence in _TOTAL_LABELS:
+            match = label.search(line)
+            if match is None:
+                continue
+            amount, ambiguous = _total_amount(line[match.end():])
+            if ambiguous:
+                confidence = min(confidence, _AMBIGUOUS_TOTAL)
+            if amount is not None and amount > 0 and confidence >= best[1]:
+                best = (amount, confidence)
+            break
+    return best
+
+# =============================================================================
+# Pre-pass & Prompt Trimming
+# =============================================================================
+
+_DOC_TYPES = [
+    (re.compile(r"\btax\s*invoice\b|\binvoice\b|\bbill\s*of\s*supply\b", re.I), "INVOICE"),
+    (re.compile(r"\breceipt\b|\bcash\s*memo\b", re.I), "RECEIPT"),
+]
+
+
+def pre_extract(text: str) -> PreExtraction:
+    result = PreExtraction()
+
+    gstins = find_gstins(text)
+    if gstins:
+        # The supplier's GSTIN comes first on Indian invoices (buyer's is in the bill-to block)
+        result.gstin, result.gstin_valid = gstins[0], True
+
+    pans = find_pans(text)
+    gstin_pan = result.gstin[2:12] if result.gstin else None
+    if gstin_pan and gstin_pan in pans:
+        result.pan, result.pan_source = gstin_pan, "text+gstin"
+    elif pans:
+        result.pan, result.pan_source = pans[0], "text"
+    elif gstin_pan:
+        result.pan, result.pan_source = gstin_pan, "gstin"
+
+    result.total_amount, result.total_confidence = find_total(text)
+
+    head = "\n".join(text.splitlines()[:8])
+    result.document_type = next((kind for pattern, kind in _DOC_TYPES if pattern.search(head)), None)
+    return result
+
+
+_DECORATION = re.compile(r"^[\W_]*$")
+_BOILERPLATE = re.compile(
+    r"computer\s*generated|does\s*not\s*require\s*(?:a\s*)?signature|subject\s*to\s*\w+\s*jurisdiction|"
+    r"e\.?\s*&\s*o\.?\s*e|thank\s*you\s*for\s*your\s*business|authori[sz]ed\s*signatory|"
+    r"^\s*(?:bank|a/?c\s*no|account\s*(?:no|number)|ifsc|branch)\b",
+    re.I,
+)
+_TERMS_HEADING = re.compile(r"^\s*terms\s*(?:&|and)\s*conditions", re.I)
+_PAGE_START = re.compile(r"\bpage\s*\d+|\btax\s*invoice\b", re.I)
+# Lines at the top of a page that may repeat the letterhead of an earlier
+# page; the header also ends at the line-item table's column headings
+HEADER_LINES = 6
+_TABLE_HEADING = re.compile(r"\b(?:description|particulars|item|qty|quantity|hsn|rate|amount)\b", re.I)
+
+
+def trim_ocr_text(text: str) -> str:
+    """
+    Drop lines that carry nothing the extractor needs: separators, blank
+    lines, letterhead repeated at the top of later pages, signatures/
+    disclaimers, bank details and the terms & conditions block (which runs
+    to the end of its page).
+    """
+    kept: List[str] = []
+    letterhead = set()
+    for page in text.split("\f"):
+        # A form feed starts a new page: whatever the last one ended in is over
+        in_terms = False
+        page_line = 0  # lines kept since the page started
+        in_header = True
+        for raw in page.splitlines():
+            line = raw.strip()
+            if _PAGE_START.search(line):
+                in_terms = False  # the next page of a multi-page document
+                page_line, in_header = 0, True
+            if in_terms or _DECORATION.match(line) or _BOILERPLATE.search(line):
+                continue
+            if _TERMS_HEADING.match(line):
+                in_terms = True
+                continue
+            # Only header lines are deduplicated; a description repeated in the
+            # body is a real line item (its figures may be on the next line)
+            if in_header and not any(ch.isdigit() for ch in line):
+                key = re.sub(r"\s+", " ", line.lower())
+                if len(_TABLE_HEADING.findall(line)) >= 2:
+                    in_header = False
+                if key in letterhead:
+                    continue
+                letterhead.add(key)
+            kept.append(re.sub(r"[ \t]{2,}", "  ", line))
+            page_line += 1
+            in_header = in_header and page_line < HEADER_LINES
+    return "\n".join(kept)
@@ -1,10 +1,129 @@
 
+import asyncio
+import hashlib
+import math
+import random
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
 import structlog
-from typing import List, Dict, Any, Optional
-from app.services.price_data_source import PriceDataSource, SimulatedDataSource, APIDataSource
+
+from app.config import settings
+from app.services.price_data_source import PriceDataSource, PriceSeries, SimulatedDataSource, APIDataSource, window_dates
+from app.services.price_store import PriceStore
 
 logger = structlog.get_logger()
 
+# Indian market day: price series roll over at midnight IST, not server-local time
+IST = timezone(timedelta(hours=5, minutes=30))
+
+def ist_today() -> date:
+    return datetime.now(IST).date()
+
+# =============================================================================
+# Price Series Cache
+# =============================================================================
+
+class PriceSeriesCache:
+    """
+    Bounded LRU + TTL cache of price series, keyed by (material, region, as_of).
+
+    Only the longest series fetched for a key is kept; shorter windows are
+    served as slices of it. Because `as_of` is part of the key, yesterday's
+    entries simply stop being requested after the IST midnight rollover and
+    age out through LRU/TTL.
+
+    Concurrent misses for the same key are collapsed into a single fetch
+    (single flight), and TTLs carry a little jitter so entries created
+    together don't all expire in the same instant. Meant to be used from
+    one event loop, so bookkeeping needs no locking.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, ttl_jitter: float = 0.1):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.ttl_jitter = ttl_jitter
+        self._entries: "OrderedDict[Hashable, Tuple[PriceSeries, float]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _lookup(self, key: Hashable, days: int) -> Optional[PriceSeries]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        series, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        if len(series) < days:
+            return None
+        self._entries.move_to_end(key)
+        return series[-days:]
+
+    def _store(self, key: Hashable, series: PriceSeries) -> None:
+        current = self._entries.get(key)
+        if current is not None and len(current[0]) > len(series):
+            return
+        ttl = self.ttl_seconds * (1 + random.uniform(-self.ttl_jitter, self.ttl_jitter))
+        self._entries[key] = (series, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_fetch(
+        self, key: Hashable, days: int, fetch: Callable[[int], Awaitable[PriceSeries]]
+    ) -> PriceSeries:
+        """Return the last `days` points for `key`, awaiting `fetch(days)` at most once per miss."""
+        cached = self._lookup(key, days)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        flight = self._inflight.setdefault(key, asyncio.Lock())
+
+        async with flight:
+            # Another caller may have filled the entry while we waited
+            cached = self._lookup(key, days)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+            try:
+                series = await fetch(days)
+                if len(series):
+                    self._store(key, series)
+            finally:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+        return series[-days:] if len(series) > days else series
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+# =============================================================================
+# Market Data Service
+# =============================================================================
+
 class MarketDataService:
     """
     Service to fetch market data.
@@ -12,23 +131,55 @@ class MarketDataService:
     """
 
     def __init__(self):
-        # In a real app, this would be injected via dependency injection or config
-        # e.g., if settings.USE_REAL_DATA: self.source = APIDataSource()
-        self.source: PriceDataSource = SimulatedDataSource()
-        self._cache: Dict[str, Any] = {}
+        self.source: PriceDataSource = APIDataSource() if settings.PRICE_API_BASE_URL else SimulatedDataSource()
+        self._cache = PriceSeriesCache(
+            max_entries=settings.MARKET_DATA_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.MARKET_DATA_CACHE_TTL_S,
+        )
+        # Optional persistent store; history becomes a range read once populated
+        self.store: Optional[PriceStore] = PriceStore(settings.PRICE_STORE_DIR) if settings.PRICE_STORE_DIR else None
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
 
-    def get_price_history(self, material: str, region: str, days: int = 30) -> Dict[str, Any]:
+    async def aclose(self) -> None:
+        await self.source.aclose()
+
+    async def _load_series(self, material: str, region: str, days: int, as_of: date) -> PriceSeries:
+        if self.store is None:
+            return await self.source.get_price_history(material, region, days, end_date=as_of)
+
+        source_name = self.source.source_name
+        start = as_of - timedelta(days=days - 1)
+        series = self.store.read(material, region, start, as_of, source=source_name)
+        if series is None:
+            # Hand what is already persisted to the source so it only fetches newer days
+            coverage = self.store.coverage(material, region, source=source_name)
+            stored = self.store.read(material, region, *coverage, source=source_name) if coverage else None
+            if stored is not None:
+                self.source.seed(material, region, stored)
+            series = await self.source.get_price_history(material, region, days, end_date=as_of)
+            try:
+                self.store.write(material, region, series)
+            except OSError as e:
+                logger.warning("Price store write failed", material=material, region=region, error=str(e))
+        return series
+
+    async def _cached_series(self, material: str, region: str, days: int, as_of: date) -> PriceSeries:
+        return await self._cache.get_or_fetch(
+            (material, region, as_of),
+            days,
+            lambda n: self._load_series(material, region, n, as_of),
+        )
+
+    async def get_price_history(self, material: str, region: str, days: int = 30) -> Dict[str, Any]:
         """
         Generates deterministic price history based on material and region.
         """
-        from datetime import date
-        cache_key = f"{material}:{region}:{days}:{date.today()}"
-        
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        as_of = ist_today()
 
         try:
-            history = self.source.get_price_history(material, region, days)
+            history = await self._cached_series(material, region, days, as_of)
         except Exception as e:
             logger.error(f"Failed to fetch price history: {e}")
             return {
@@ -48,31 +199,110 @@ class MarketDataService:
                 "change_7d_percent": 0.0
             }
 
-        current_final_price = history[-1].price
-        unit = history[0].unit
+        prices = history.prices
+        current_final_price = float(prices[-1])
+        unit = history.unit
 
         # Determine trend based on last 7 days from the fetched history
         # Ensure we have enough data
-        start_index = -8 if len(history) >= 8 else 0
-        start_7d = history[start_index].price
-        
+        start_index = -8 if len(prices) >= 8 else 0
+        start_7d = float(prices[start_index])
+
         change_7d = 0.0
-        if start_7d != 0:
+        # Precomputed in the store; the window must cover the 7-day lookback
+        stored = self.store.changes(material, region, as_of, source=history.source) if self.store and len(prices) >= 8 else None
+        if stored is not None and not math.isnan(stored[7]):
+            change_7d = stored[7]
+        elif start_7d != 0:
             change_7d = (current_final_price - start_7d) / start_7d
-        
+
         trend_dir = "STABLE"
         if change_7d > 0.02: trend_dir = "UP"
         elif change_7d < -0.02: trend_dir = "DOWN"
 
-        result = {
+        return {
             "current_price": current_final_price,
             "history": history,
             "unit": unit,
             "trend": trend_dir,
             "change_7d_percent": round(change_7d * 100, 2)
         }
-        
-        self._cache[cache_key] = result
-        return result
+
+    async def get_price_histories(
+        self, pairs: List[Tuple[str, str]], days: int = 30
+    ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """`get_price_history` for many (material, region) pairs, fetched concurrently."""
+        semaphore = asyncio.Semaphore(settings.PRICE_API_MAX_CONCURRENCY)
+
+        async def one(pair: Tuple[str, str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.get_price_history(pair[0], pair[1], days)
+
+        results = await asyncio.gather(*(one(pair) for pair in pairs))
+        return dict(zip(pairs, results))
+
+    async def get_price_matrix(self, materials: List[str], regions: List[str]) -> Dict[str, Any]:
+        """
+        Current price, 7-day change and trend for every material x region pair.
+
+        The last 8 days of every series are laid on one (pairs, 8) date grid
+        and reduced together. `etag` is derived from the market day and each
+        series' latest observation date, so it changes exactly when new prices
+        land and repeat dashboard loads can be answered with 304.
+        """
+        as_of = ist_today()
+        pairs = [(m, r) for m in materials for r in regions]
+        semaphore = asyncio.Semaphore(settings.PRICE_API_MAX_CONCURRENCY)
+
+        async def one(pair: Tuple[str, str]) -> PriceSeries:
+            async with semaphore:
+                try:
+                    return await self._cached_series(pair[0], pair[1], 8, as_of)
+                except Exception as e:
+                    logger.error(f"Failed to fetch price history: {e}")
+                    return PriceSeries.empty()
+
+        series = await asyncio.gather(*(one(pair) for pair in pairs))
+
+        grid = window_dates(8, as_of)
+        prices = np.full((len(pairs), len(grid)), np.nan)
+        for i, s in enumerate(series):
+            offsets = (s.dates - grid[0]).astype(np.int64)
+            keep = (offsets >= 0) & (offsets < len(grid))
+            prices[i, offsets[keep]] = s.prices[keep]
+
+        observed = ~np.isnan(prices)
+        has_data = observed.any(axis=1)
+        last = len(grid) - 1 - np.argmax(observed[:, ::-1], axis=1)
+        first = np.argmax(observed, axis=1)
+        rows = np.arange(len(pairs))
+        current = np.where(has_data, prices[rows, last], 0.0)
+        start = np.where(has_data, prices[rows, first], 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = np.where(start != 0, (current - start) / start, 0.0)
+        trend = np.where(change > 0.02, "UP", np.where(change < -0.02, "DOWN", "STABLE"))
+        data_dates = [str(grid[j]) if ok else None for j, ok in zip(last, has_data)]
+
+        key = "|".join([self.source.source_name, str(as_of)] + [d or "-" for d in data_dates])
+        etag = '"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+        return {
+            "as_of": str(as_of),
+            "data_date": max((d for d in data_dates if d), default=None),
+            "etag": etag,
+            "materials": materials,
+            "regions": regions,
+            "prices": [
+                {
+                    "material": m,
+                    "region": r,
+                    "current_price": float(current[i]),
+                    "unit": series[i].unit if has_data[i] else "N/A",
+                    "change_7d_percent": round(float(change[i]) * 100, 2),
+                    "trend": str(trend[i]),
+                    "data_date": data_dates[i],
+                }
+                for i, (m, r) in enumerate(pairs)
+            ],
+        }
 
 market_data_service = MarketDataService()
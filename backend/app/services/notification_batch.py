@@ -0,0 +1,147 @@
+# =============================================================================
+# BuildBidz - Bulk Notification Fan-out
+# =============================================================================
+# Generates notifications for many recipients at once (e.g. every bidder and
+# crew after an award). Requests are grouped by (step, language) so each
+# group's template is translated once; template messages are then filled in
+# locally and only free-form messages make LLM calls, under a concurrency cap
+# sized to the Groq key budget. Results are yielded as they finish.
+# =============================================================================
+
+import asyncio
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+import structlog
+
+from app.config import settings
+from app.services.ai import groq_service
+from app.services.coordination_agent import (
+    coordination_agent, CommunicationStep, INTENT_TEMPLATES, Language, NotificationRequest, NotificationResult,
+)
+
+logger = structlog.get_logger()
+
+# =============================================================================
+# Data Models
+# =============================================================================
+
+class BulkNotificationRequest(BaseModel):
+    notifications: List[NotificationRequest] = Field(min_length=1, max_length=5000)
+    max_concurrency: Optional[int] = Field(None, ge=1)
+
+class BulkNotificationItem(BaseModel):
+    index: int  # position in the request
+    contractor_name: str
+    phone_number: str
+    status: str  # "ok", "failed"
+    via: Optional[str] = None  # "template" (filled locally) or "llm"
+    result: Optional[NotificationResult] = None
+    error: Optional[str] = None
+
+class BulkNotificationSummary(BaseModel):
+    total: int
+    ok: int
+    failed: int
+    llm_messages: int  # messages generated by a per-message LLM call
+    duration_ms: float
+    results: List[BulkNotificationItem]
+
+# Called as every recipient finishes: (completed, total, item)
+ProgressCallback = Callable[[int, int, BulkNotificationItem], None]
+
+# =============================================================================
+# Fan-out
+# =============================================================================
+
+def default_concurrency() -> int:
+    """In-flight LLM calls the configured Groq keys can absorb."""
+    keys = len(groq_service.rotator.keys) if groq_service.rotator.has_keys else 1
+    return max(1, settings.COORDINATION_BULK_CONCURRENCY_PER_KEY * keys)
+
+
+async def iter_notifications(
+    requests: List[NotificationRequest],
+    max_concurrency: Optional[int] = None,
+) -> AsyncIterator[BulkNotificationItem]:
+    """Yield one item per request, in completion order."""
+    semaphore = asyncio.Semaphore(max_concurrency or default_concurrency())
+
+    # 1. One translation per (step, language) group, shared by the whole group
+    templates: Dict[Tuple[CommunicationStep, Language], Optional[str]] = {}
+    if settings.COORDINATION_TEMPLATE_CACHE:
+        groups = list(dict.fromkeys((r.step, r.language) for r in requests if r.step in INTENT_TEMPLATES))
+
+        async def translate(group: Tuple[CommunicationStep, Language]) -> None:
+            async with semaphore:
+                templates[group] = await coordination_agent.get_template(*group)
+
+        await asyncio.gather(*(translate(g) for g in groups))
+
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def _item(index: int, request: NotificationRequest, **fields) -> BulkNotificationItem:
+        return BulkNotificationItem(
+            index=index, contractor_name=request.contractor_name, phone_number=request.phone_number, **fields
+        )
+
+    # 2. Template messages are pure string work; emit them right away
+    pending: List[Tuple[int, NotificationRequest]] = []
+    for i, request in enumerate(requests):
+        template = templates.get((request.step, request.language))
+        if template is None:
+            pending.append((i, request))
+            continue
+        try:
+            queue.put_nowait(_item(i, request, status="ok", via="template",
+                                   result=coordination_agent.fill_template(request, template)))
+        except Exception as e:
+            queue.put_nowait(_item(i, request, status="failed", error=str(e)))
+
+    # 3. The rest go to the LLM under the cap. Their group has no template
+    # (free-form step, or its translation failed above), so don't retry it per
+    # message. LLM errors fail the item rather than yield placeholder text
+    async def generate(index: int, request: NotificationRequest) -> None:
+        try:
+            async with semaphore:
+                result = await coordination_agent.generate_notification(request, use_template=False, raise_errors=True)
+            await queue.put(_item(index, request, status="ok", via="llm", result=result))
+        except Exception as e:
+            logger.error("Bulk notification failed", index=index, error=str(e))
+            await queue.put(_item(index, request, status="failed", error=str(e)))
+
+    tasks = [asyncio.create_task(generate(i, r)) for i, r in pending]
+    try:
+        for _ in range(len(requests)):
+            yield await queue.get()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def run_bulk_notifications(
+    requests: List[NotificationRequest],
+    max_concurrency: Optional[int] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> BulkNotificationSummary:
+    """Collect `iter_notifications` into one summary (request order)."""
+    start = time.monotonic()
+    items: List[BulkNotificationItem] = []
+    async for item in iter_notifications(requests, max_concurrency):
+        items.append(item)
+        if on_progress:
+            on_progress(len(items), len(requests), item)
+    items.sort(key=lambda item: item.index)
+    ok = sum(item.status == "ok" for item in items)
+    summary = BulkNotificationSummary(
+        total=len(items),
+        ok=ok,
+        failed=len(items) - ok,
+        llm_messages=sum(item.via == "llm" for item in items),
+        duration_ms=round((time.monotonic() - start) * 1000, 1),
+        results=items,
+    )
+    logger.info("Bulk notifications complete", total=summary.total, failed=summary.failed,
+                llm_messages=summary.llm_messages, duration_ms=summary.duration_ms)
+    return summary
@@ -0,0 +1,319 @@
+# =============================================================================
+# BuildBidz - OCR Engines
+# =============================================================================
+# OCR engines for the OCR worker.
+#
+# Azure Vision Read is asynchronous: an image is submitted, then its
+# operation is polled until it finishes. Polling starts after a short
+# delay (small images are often done in a few hundred ms), backs off, and
+# honours Retry-After. All calls share one pooled HTTP client. In batch
+# mode many images are submitted at once and polled together in one loop.
+#
+# Tesseract is the fallback. One `image_to_data` pass gives the words with
+# their boxes and confidences; text and lines are rebuilt from it, so the
+# image is only recognised once. Recognition runs in a process pool sized
+# to the cores, off the event loop, so the pages of a document (or several
+# documents) are OCRed in parallel.
+# =============================================================================
+
+import asyncio
+import io
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import httpx
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+TESSERACT_LANG = "eng+hin"
+TESSERACT_CONFIG = "--psm 3"
+
+# =============================================================================
+# Azure Vision Read
+# =============================================================================
+
+_azure_client: Optional[httpx.AsyncClient] = None
+
+
+def get_azure_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for the Read API, created on first use."""
+    global _azure_client
+    if _azure_client is None or _azure_client.is_closed:
+        _azure_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=settings.AZURE_VISION_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AZURE_VISION_MAX_CONNECTIONS,
+            ),
+        )
+    return _azure_client
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Retry-After in seconds (Azure sends delta-seconds), or None."""
+    value = response.headers.get("Retry-After")
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except ValueError:
+        return None
+
+
+class AzureVisionOCR:
+    """Azure Computer Vision OCR client."""
+
+    READ_PATH = "/vision/v3.2/read/analyze"
+    # First poll soon after submit, then back off up to the cap
+    INITIAL_POLL_S = 0.25
+    MAX_POLL_S = 2.0
+    BACKOFF = 1.5
+    TIMEOUT_S = 60.0
+    MAX_SUBMIT_RETRIES = 3
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        endpoint: Optional[str] = None,
+        key: Optional[str] = None,
+    ):
+        self.endpoint = (endpoint or settings.AZURE_VISION_ENDPOINT).rstrip("/")
+        self.key = key or settings.AZURE_VISION_KEY
+        self.client = client
+
+    def _client(self) -> httpx.AsyncClient:
+        return self.client or get_azure_client()
+
+    async def submit(self, image_bytes: bytes) -> str:
+        """Submit one image; returns its Operation-Location. Throttled submits are retried after Retry-After."""
+        for attempt in range(self.MAX_SUBMIT_RETRIES + 1):
+            response = await self._client().post(
+                f"{self.endpoint}{self.READ_PATH}",
+                headers={
+                    "Ocp-Apim-Subscription-Key": self.key,
+                    "Content-Type": "application/octet-stream",
+                },
+                content=image_bytes,
+            )
+            if response.status_code == 202:
+                return response.headers["Operation-Location"]
+            if response.status_code == 429 and attempt < self.MAX_SUBMIT_RETRIES:
+                await asyncio.sleep(retry_after_seconds(response) or self.MAX_POLL_S)
+                continue
+            raise Exception(f"Azure Vision error: {response.status_code}")
+        raise Exception("Azure Vision error: 429")
+
+    async def extract_text(self, image_bytes: bytes) -> dict:
+        """Extract text from image using Azure Vision Read API."""
+        result = (await self.extract_batch([image_bytes]))[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def extract_batch(self, images: List[bytes]) -> List[Union[dict, Exception]]:
+        """
+        Submit every image, then poll all pending operations in one loop.
+        Returns one parsed result per image, or the exception it failed with.
+        """
+        if not self.endpoint or not self.key:
+            raise ValueError("Azure Vision not configured")
+
+        submitted = await asyncio.gather(*(self.submit(image) for image in images), return_exceptions=True)
+        results: List[Union[dict, Exception, None]] = [
+            s if isinstance(s, Exception) else None for s in submitted
+        ]
+
+        now = time.monotonic()
+        deadline = now + self.TIMEOUT_S
+        # index -> (operation url, next poll time, current delay)
+        pending: Dict[int, Tuple[str, float, float]] = {
+            i: (url, now + self.INITIAL_POLL_S, self.INITIAL_POLL_S)
+            for i, url in enumerate(submitted) if not isinstance(url, Exception)
+        }
+
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                for i in pending:
+                    results[i] = Exception("Azure Vision timeout")
+                break
+            due = [i for i, (_, at, _) in pending.items() if at <= now]
+            if not due:
+                await asyncio.sleep(min(at for _, at, _ in pending.values()) - now)
+                continue
+
+            responses = await asyncio.gather(
+                *(self._client().get(pending[i][0], headers={"Ocp-Apim-Subscription-Key": self.key}) for i in due),
+                return_exceptions=True,
+            )
+            now = time.monotonic()
+            for i, response in zip(due, responses):
+                url, _, delay = pending[i]
+                if isinstance(response, Exception):
+                    results[i] = response
+                    del pending[i]
+                    continue
+                try:
+                    body = response.json() if response.status_code == 200 else {}
+                    status = body.get("status")
+                    if status == "succeeded":
+                        results[i] = self._parse_result(body)
+                        del pending[i]
+                        continue
+                except (ValueError, AttributeError, TypeError) as e:
+                    # A garbled body fails this image only, not the batch
+                    results[i] = Exception(f"Azure Vision unreadable response: {e}")
+                    del pending[i]
+                    continue
+                if status == "failed":
+                    results[i] = Exception("Azure Vision analysis failed")
+                    del pending[i]
+                elif response.status_code in (200, 429):
+                    # notStarted / running, or throttled: wait as told, else back off
+                    delay = min(delay * self.BACKOFF, self.MAX_POLL_S)
+                    wait = retry_after_seconds(response)
+                    pending[i] = (url, now + (wait if wait is not None else delay), delay)
+                else:
+                    results[i] = Exception(f"Azure Vision error: {response.status_code}")
+                    del pending[i]
+
+        return results
+
+    def _parse_result(self, result: dict) -> dict:
+        """Parse Azure Vision result into structured format."""
+        lines = []
+        full_text = []
+        confidence_scores = []
+
+        for page in result.get("analyzeResult", {}).get("readResults", []):
+            for line in page.get("lines", []):
+                lines.append({
+                    "text": line.get("text"),
+                    "bounding_box": line.get("boundingBox"),
+                    "confidence": sum(w.get("confidence", 0) for w in line.get("words", [])) / max(len(line.get("words", [])), 1),
+                })
+                full_text.append(line.get("text", ""))
+                for word in line.get("words", []):
+                    confidence_scores.append(word.get("confidence", 0))
+
+        avg_confidence = sum(confidence_scores) / max(len(confidence_scores), 1)
+
+        return {
+            "text": "\n".join(full_text),
+            "lines": lines,
+            "confidence": avg_confidence,
+            "provider": "azure_vision",
+        }
+
+# =============================================================================
+# Tesseract (runs in worker processes)
+# =============================================================================
+
+def lines_from_data(data: Dict[str, List[Any]]) -> Dict[str, Any]:
+    """
+    Text, lines and confidence from `image_to_data` output.
+
+    Words are grouped into lines by (block, paragraph, line); blocks are
+    separated by a blank line, as `image_to_string` does. Boxes use Azure's
+    8-number polygon (clockwise from top-left) so both engines' lines match.
+    """
+    grouped: Dict[Tuple[int, int, int], List[int]] = {}
+    for i, word in enumerate(data.get("text", [])):
+        if not str(word).strip():
+            continue
+        grouped.setdefault((int(data["block_num"][i]), int(data["par_num"][i]), int(data["line_num"][i])), []).append(i)
+
+    lines: List[Dict[str, Any]] = []
+    text_parts: List[str] = []
+    all_conf: List[float] = []
+    previous_block = None
+    for (block, _, _), idx in grouped.items():
+        words = [str(data["text"][i]).strip() for i in idx]
+        # Tesseract reports -1 for boxes it didn't recognise as words
+        conf = [float(data["conf"][i]) / 100 for i in idx if float(data["conf"][i]) >= 0]
+        left = min(int(data["left"][i]) for i in idx)
+        top = min(int(data["top"][i]) for i in idx)
+        right = max(int(data["left"][i]) + int(data["width"][i]) for i in idx)
+        bottom = max(int(data["top"][i]) + int(data["height"][i]) for i in idx)
+        line_text = " ".join(words)
+        lines.append({
+            "text": line_text,
+            "bounding_box": [left, top, right, top, right, bottom, left, bottom],
+            "confidence": sum(conf) / max(len(conf), 1),
+        })
+        if previous_block is not None and block != previous_block:
+            text_parts.append("")
+        text_parts.append(line_text)
+        previous_block = block
+        all_conf.extend(conf)
+
+    return {
+        "text": "\n".join(text_parts),
+        "lines": lines,
+        "confidence": sum(all_conf) / max(len(all_conf), 1),
+        "provider": "tesseract",
+    }
+
+
+def tesseract_page(image_bytes: bytes) -> Dict[str, Any]:
+    """OCR one image in a single `image_to_data` pass."""
+    try:
+        import pytesseract
+        from PIL import Image
+    except ImportError:
+        raise Exception("Tesseract not installed")
+
+    image = Image.open(io.BytesIO(image_bytes))
+    data = pytesseract.image_to_data(
+        image,
+        lang=TESSERACT_LANG,
+        config=TESSERACT_CONFIG,
+        output_type=pytesseract.Output.DICT,
+    )
+    return lines_from_data(data)
+
+# =============================================================================
+# Pool
+# =============================================================================
+
+_pool: Optional[Executor] = None
+
+
+def get_ocr_pool() -> Executor:
+    """
+    Shared OCR executor, created on first use: a process pool of
+    OCR_PROCESSES workers (default one per core). Where the worker can't
+    fork children (daemonic pool workers), threads are used instead;
+    pytesseract runs the tesseract binary as a subprocess, so those still
+    OCR in parallel.
+    """
+    global _pool
+    if _pool is None:
+        workers = settings.OCR_PROCESSES or os.cpu_count() or 1
+        try:
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            # Surface "daemonic processes are not allowed to have children" now, not per page
+            _pool.submit(os.getpid).result()
+        except (AssertionError, OSError, RuntimeError) as e:
+            logger.warning("OCR process pool unavailable, using threads", error=str(e))
+            _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr")
+    return _pool
+
+
+def shutdown_ocr_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+class TesseractOCR:
+    """Fallback OCR using Tesseract."""
+
+    async def extract_text(self, image_bytes: bytes) -> dict:
+        """Extract text, line boxes and confidences in one pass, off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_ocr_pool(), tesseract_page, image_bytes)
@@ -0,0 +1,160 @@
+# =============================================================================
+# BuildBidz - PDF OCR
+# =============================================================================
+# Tenders and invoices mostly arrive as PDFs, and their pages are processed
+# independently. Pages with an embedded text layer (exported from Tally,
+# Excel, e-invoicing portals) are read directly with no OCR. Only image-only
+# pages (scans) are rasterised, at OCR_PDF_DPI, and OCRed concurrently.
+# Results are assembled in page order, with pages separated by form feeds
+# so the extractor's chunker can split on them. Each finished page is
+# reported through a callback for progress. Where the OCR engine has a
+# batch mode (Azure Read), the scanned pages can be OCRed in one batch.
+# =============================================================================
+
+import asyncio
+import io
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+# (page_number (1-based), page_count, page result)
+PageCallback = Callable[[int, int, Dict[str, Any]], Awaitable[None]]
+OCRFunction = Callable[[bytes], Awaitable[Dict[str, Any]]]
+# Several page images in, one result per image out (same order)
+BatchOCRFunction = Callable[[List[bytes]], Awaitable[List[Dict[str, Any]]]]
+
+# =============================================================================
+# Page Access
+# =============================================================================
+
+def is_pdf(data: bytes, mime_type: Optional[str] = None) -> bool:
+    return data[:5] == b"%PDF-" or (mime_type or "").lower() == "application/pdf"
+
+
+def has_text_layer(text: str) -> bool:
+    """Enough real text that the page isn't a scan with a stray header or page number."""
+    return len(re.findall(r"\w", text)) >= settings.OCR_PDF_TEXT_MIN_CHARS
+
+
+def read_text_layer(pdf_bytes: bytes) -> List[str]:
+    """Embedded text per page ("" where a page has none or it can't be read)."""
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    pages = []
+    for number, page in enumerate(reader.pages, start=1):
+        try:
+            pages.append(page.extract_text() or "")
+        except Exception as e:
+            logger.warning("PDF text layer unreadable", page=number, error=str(e))
+            pages.append("")
+    return pages
+
+
+def rasterise_page(pdf_bytes: bytes, page_number: int, dpi: int) -> bytes:
+    """One page as a grayscale PNG (poppler runs as a subprocess)."""
+    from pdf2image import convert_from_bytes
+
+    image = convert_from_bytes(pdf_bytes, dpi=dpi, first_page=page_number, last_page=page_number, grayscale=True)[0]
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+# =============================================================================
+# Pipeline
+# =============================================================================
+
+def assemble_pages(pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One document result from page results in page order."""
+    lines = [{**line, "page": page["page"]} for page in pages for line in page.get("lines", [])]
+    weights = [max(len(page.get("text", "")), 1) for page in pages]
+    confidence = sum(page.get("confidence", 0.0) * w for page, w in zip(pages, weights)) / max(sum(weights), 1)
+    providers = list(dict.fromkeys(page.get("provider") for page in pages if page.get("provider")))
+    return {
+        "text": "\f".join(page.get("text", "") for page in pages),
+        "lines": lines,
+        "confidence": confidence,
+        "provider": "+".join(providers) or "pdf_text",
+        "pages": [
+            {
+                "page": page.get("page"),
+                "provider": page.get("provider"),
+                "chars": len(page.get("text", "")),
+                "confidence": page.get("confidence"),
+                "duration_ms": page.get("duration_ms"),
+                "preprocess": page.get("preprocess"),
+            }
+            for page in pages
+        ],
+    }
+
+
+async def process_pdf(
+    pdf_bytes: bytes,
+    ocr_image: OCRFunction,
+    on_page: Optional[PageCallback] = None,
+    dpi: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    ocr_batch: Optional[BatchOCRFunction] = None,
+) -> Dict[str, Any]:
+    """
+    OCR a PDF page by page: text-layer pages are read directly, the rest are
+    rasterised and passed to `ocr_image` concurrently. With `ocr_batch`, the
+    rasterised pages go to it in one call instead and are reported when it
+    returns.
+    """
+    dpi = dpi or settings.OCR_PDF_DPI
+    semaphore = asyncio.Semaphore(max_concurrency or settings.OCR_PDF_MAX_CONCURRENCY)
+    layer = await asyncio.to_thread(read_text_layer, pdf_bytes)
+    total = len(layer)
+    scanned = [number for number, text in enumerate(layer, start=1) if not has_text_layer(text)]
+
+    async def rasterise(number: int) -> bytes:
+        async with semaphore:
+            return await asyncio.to_thread(rasterise_page, pdf_bytes, number, dpi)
+
+    async def finish(number: int, result: Dict[str, Any], start: float) -> Dict[str, Any]:
+        result = {**result, "page": number, "duration_ms": round((time.monotonic() - start) * 1000, 1)}
+        if on_page:
+            await on_page(number, total, result)
+        return result
+
+    async def page_result(number: int, text: str) -> Dict[str, Any]:
+        start = time.monotonic()
+        if number not in scanned:
+            return await finish(number, {"text": text.strip(), "lines": [], "confidence": 1.0, "provider": "pdf_text"}, start)
+        if ocr_batch is not None:
+            return {}  # filled in from the batch below
+        async with semaphore:
+            image = await asyncio.to_thread(rasterise_page, pdf_bytes, number, dpi)
+            result = await ocr_image(image)
+        return await finish(number, result, start)
+
+    async def batch_results() -> Dict[int, Dict[str, Any]]:
+        if ocr_batch is None or not scanned:
+            return {}
+        start = time.monotonic()
+        images = await asyncio.gather(*(rasterise(number) for number in scanned))
+        results = await ocr_batch(list(images))
+        return {number: await finish(number, result, start) for number, result in zip(scanned, results)}
+
+    pages, batched = await asyncio.gather(
+        asyncio.gather(*(page_result(n, text) for n, text in enumerate(layer, start=1))),
+        batch_results(),
+    )
+    pages = [batched.get(number, page) for number, page in enumerate(pages, start=1)]
+    result = assemble_pages(pages)
+    logger.info(
+        "PDF OCR complete",
+        pages=total,
+        text_layer_pages=total - len(scanned),
+        batched=bool(batched),
+        max_page_ms=max((p["duration_ms"] for p in pages), default=0.0),
+    )
+    return result
@@ -1,11 +1,18 @@
-
-import random
-import math
+import asyncio
+import hashlib
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from datetime import date, datetime
+from typing import Dict, Iterator, Optional, Sequence, Tuple, Union, overload
+
+import httpx
+import numpy as np
+import structlog
 from pydantic import BaseModel
 
+from app.config import settings
+
+logger = structlog.get_logger()
+
 # =============================================================================
 # Data Models
 # =============================================================================
@@ -16,14 +23,161 @@ class MarketPrice(BaseModel):
     unit: str
     source: str = "simulated"  # "simulated" or "api"
 
+class PriceSeries:
+    """
+    Compact, array-backed daily price history for one material/region.
+
+    Behaves like a read-only sequence of MarketPrice (indexing, slicing,
+    iteration) for existing callers, while numeric code can work on the
+    `dates` (datetime64[D]) and `prices` (float64) arrays directly.
+    """
+
+    __slots__ = ("dates", "prices", "unit", "source")
+
+    def __init__(self, dates: np.ndarray, prices: np.ndarray, unit: str, source: str = "simulated"):
+        self.dates = dates
+        self.prices = prices
+        self.unit = unit
+        self.source = source
+
+    @classmethod
+    def empty(cls, unit: str = "N/A", source: str = "api") -> "PriceSeries":
+        return cls(np.empty(0, dtype="datetime64[D]"), np.empty(0, dtype=np.float64), unit, source)
+
+    @classmethod
+    def from_points(cls, points: Sequence[MarketPrice]) -> "PriceSeries":
+        if not points:
+            return cls.empty()
+        return cls(
+            np.array([p.date for p in points], dtype="datetime64[D]"),
+            np.array([p.price for p in points], dtype=np.float64),
+            points[0].unit,
+            points[0].source,
+        )
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def merged(self, newer: "PriceSeries") -> "PriceSeries":
+        """Union of both series by date; `newer` wins where dates overlap."""
+        if not len(self):
+            return newer
+        dates = np.concatenate([self.dates, newer.dates])
+        prices = np.concatenate([self.prices, newer.prices])
+        order = np.argsort(dates, kind="stable")
+        dates, prices = dates[order], prices[order]
+        keep = np.r_[dates[1:] != dates[:-1], True]
+        return PriceSeries(dates[keep], prices[keep], newer.unit, newer.source)
+
+    def window(self, start: np.datetime64, end: np.datetime64) -> "PriceSeries":
+        """Points with start <= date <= end (dates are sorted)."""
+        lo = np.searchsorted(self.dates, start, side="left")
+        hi = np.searchsorted(self.dates, end, side="right")
+        return self[lo:hi]
+
+    @overload
+    def __getitem__(self, index: int) -> MarketPrice: ...
+    @overload
+    def __getitem__(self, index: slice) -> "PriceSeries": ...
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return PriceSeries(self.dates[index], self.prices[index], self.unit, self.source)
+        return MarketPrice(
+            date=str(self.dates[index]),
+            price=float(self.prices[index]),
+            unit=self.unit,
+            source=self.source,
+        )
+
+    def __iter__(self) -> Iterator[MarketPrice]:
+        for d, p in zip(self.dates.astype(str).tolist(), self.prices.tolist()):
+            yield MarketPrice(date=d, price=p, unit=self.unit, source=self.source)
+
+def window_dates(days: int, end_date: Optional[date] = None) -> np.ndarray:
+    """The `days` consecutive dates ending on `end_date` (default: today), oldest first."""
+    end = np.datetime64(end_date or datetime.now().date(), "D")
+    return end - np.arange(days - 1, -1, -1, dtype="timedelta64[D]")
+
 class PriceDataSource(ABC):
     """
     Abstract Base Class for fetching market price history.
+
+    Sources are async so network-backed providers never block the event loop.
     """
+    # Tag stored alongside the series (e.g. in the PriceStore layout)
+    source_name: str = "simulated"
+
     @abstractmethod
-    def get_price_history(self, material: str, region: str, days: int) -> List[MarketPrice]:
+    async def get_price_history(
+        self, material: str, region: str, days: int, end_date: Optional[date] = None
+    ) -> PriceSeries:
+        """Daily prices for the `days` days ending on `end_date` (default: today)."""
         pass
 
+    def seed(self, material: str, region: str, series: PriceSeries) -> None:
+        """Prime the source with already-persisted history (used for incremental fetches)."""
+        pass
+
+    async def aclose(self) -> None:
+        """Release network resources, if any."""
+        pass
+
+# =============================================================================
+# Counter-based RNG (Philox4x32-10)
+# =============================================================================
+# Each draw is a pure function of (key, counter), so any date's noise can be
+# computed directly and whole date ranges in one vectorised call, without
+# seeding a generator per day or replaying a stream.
+
+_PHILOX_M0 = np.uint64(0xD2511F53)
+_PHILOX_M1 = np.uint64(0xCD9E8D57)
+_PHILOX_W0 = np.uint32(0x9E3779B9)
+_PHILOX_W1 = np.uint32(0xBB67AE85)
+_MASK32 = np.uint64(0xFFFFFFFF)
+_SHIFT32 = np.uint64(32)
+
+def philox4x32(counters: np.ndarray, key: Tuple[int, int], rounds: int = 10) -> np.ndarray:
+    """
+    Philox4x32 block function, vectorised over counters.
+
+    `counters` has shape (..., 4) of uint32; returns the same shape of
+    uint32 random words.
+    """
+    c = np.asarray(counters, dtype=np.uint32)
+    c0, c1, c2, c3 = (c[..., i].astype(np.uint64) for i in range(4))
+    k0 = np.uint32(key[0])
+    k1 = np.uint32(key[1])
+    with np.errstate(over="ignore"):
+        for _ in range(rounds):
+            p0 = c0 * _PHILOX_M0
+            p1 = c2 * _PHILOX_M1
+            c0, c1, c2, c3 = (
+                (p1 >> _SHIFT32) ^ c1 ^ np.uint64(k0),
+                p1 & _MASK32,
+                (p0 >> _SHIFT32) ^ c3 ^ np.uint64(k1),
+                p0 & _MASK32,
+            )
+            k0 = np.uint32(k0 + _PHILOX_W0)
+            k1 = np.uint32(k1 + _PHILOX_W1)
+    return np.stack([c0, c1, c2, c3], axis=-1).astype(np.uint32)
+
+def series_key(material: str, region: str) -> Tuple[int, int]:
+    """Stable 64-bit Philox key for a material/region pair."""
+    digest = hashlib.blake2b(f"{material}_{region}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest[:4], "little"), int.from_bytes(digest[4:], "little")
+
+def standard_normal_for_days(key: Tuple[int, int], ordinals: np.ndarray) -> np.ndarray:
+    """One N(0, 1) draw per day ordinal (Box-Muller on a single Philox block)."""
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    counters = np.zeros(ordinals.shape + (4,), dtype=np.uint32)
+    counters[..., 0] = ordinals & 0xFFFFFFFF
+    counters[..., 1] = ordinals >> 32
+    words = philox4x32(counters, key)
+    u1 = (words[..., 0].astype(np.float64) + 1.0) / 4294967296.0  # (0, 1]
+    u2 = words[..., 1].astype(np.float64) / 4294967296.0          # [0, 1)
+    return np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
+
 # =============================================================================
 # Implementations
 # =============================================================================
@@ -37,7 +191,7 @@ class SimulatedDataSource(PriceDataSource):
     - Seasonality (Monsoon, Festival)
     - Market Shocks (Supply Chain Disruptions)
     """
-    
+
     BASE_CONFIG = {
         "steel": {"base": 52000, "unit": "INR/Ton", "volatility": 0.02},
         "cement": {"base": 410, "unit": "INR/Bag", "volatility": 0.015},
@@ -53,69 +207,143 @@ class SimulatedDataSource(PriceDataSource):
         "delhi_ncr": 1.00
     }
 
-    def get_price_history(self, material: str, region: str, days: int = 30) -> List[MarketPrice]:
+    async def get_price_history(
+        self, material: str, region: str, days: int = 30, end_date: Optional[date] = None
+    ) -> PriceSeries:
+        # Pure NumPy and sub-millisecond; no need to leave the event loop
+        return self.get_prices(material, region, window_dates(days, end_date))
+
+    def get_prices(self, material: str, region: str, dates: np.ndarray) -> PriceSeries:
+        """
+        Prices for arbitrary dates (datetime64[D] array).
+        Any date always yields the same price, independent of the window requested.
+        """
         config = self.BASE_CONFIG.get(material, self.BASE_CONFIG["steel"])
         base_price = config["base"] * self.REGION_MULTIPLIERS.get(region, 1.0)
         volatility = config["volatility"]
-        
-        history: List[MarketPrice] = []
-        today = datetime.now()
-        
-        # Seed ensures that querying the SAME date always returns the SAME price
-        # We process day by day
-        
-        for i in range(days):
-            current_date = today - timedelta(days=(days - 1 - i))
-            date_str = current_date.strftime("%Y-%m-%d")
-            
-            # 1. Deterministic Randomness for this Date + Material + Region
-            # Using timestamp of the date at midnight ensures stability
-            seed_val = f"{material}_{region}_{date_str}"
-            rng = random.Random(seed_val)
-            
-            # 2. Seasonality Factor
-            # Monsoon (June-Sept): Demand drops -> Prices drop ~5%
-            month = current_date.month
-            seasonality = 1.0
-            if 6 <= month <= 9:
-                seasonality = 0.95
-            
-            # 3. Market Shocks (Rare events)
-            # 1 in 100 chance of a "Shock" on any given day that lasts for a while?
-            # Keeping it simple: The seed includes the date, so 'shocks' are static to the date.
-            # We'll simulate a random walk from a fixed point (start of year) to ensure continuity?
-            # Actually, true continuity requires P(t) = P(t-1) + delta.
-            # To allow random access WITHOUT storing state, we use a sine wave + noise function
-            # P(t) = Base * (1 + Seasonality + MacroTrend + DailyNoise)
-            
-            day_of_year = current_date.timetuple().tm_yday
-            
-            # 3a. Macro Trend (Sine wave with 1-year period)
-            # Peak in Summer (March-May), Low in Winter
-            macro_trend = math.sin((day_of_year / 365) * 2 * math.pi) * 0.05
-            
-            # 3b. Daily Noise (Random fluctuation)
-            noise = rng.gauss(0, volatility)
-            
-            # Calculate Price
-            # Price = Base * Seasonality * (1 + Macro + Noise)
-            final_price = base_price * seasonality * (1 + macro_trend + noise)
-            
-            history.append(MarketPrice(
-                date=date_str,
-                price=round(final_price, 2),
-                unit=config["unit"],
-                source="simulated"
-            ))
-            
-        return history
+        dates = np.asarray(dates, dtype="datetime64[D]")
+
+        # P(t) = Base * Seasonality * (1 + MacroTrend + DailyNoise)
+        # computed for the whole date range at once; no per-day state, so
+        # random access to any date stays deterministic.
+
+        # 1. Seasonality Factor
+        # Monsoon (June-Sept): Demand drops -> Prices drop ~5%
+        month = dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+        seasonality = np.where((month >= 6) & (month <= 9), 0.95, 1.0)
+
+        # 2. Macro Trend (Sine wave with 1-year period)
+        # Peak in Summer (March-May), Low in Winter
+        day_of_year = (dates - dates.astype("datetime64[Y]")).astype(np.int64) + 1
+        macro_trend = np.sin((day_of_year / 365) * 2 * np.pi) * 0.05
+
+        # 3. Daily Noise, keyed on material/region with the day ordinal as counter
+        ordinals = dates.astype(np.int64)
+        noise = standard_normal_for_days(series_key(material, region), ordinals) * volatility
+
+        prices = np.round(base_price * seasonality * (1 + macro_trend + noise), 2)
+        return PriceSeries(dates, prices, config["unit"], "simulated")
 
 class APIDataSource(PriceDataSource):
     """
-    Placeholder for Real API integration.
+    HTTP price provider on a pooled httpx client.
+
+    Expects `GET {base_url}/prices/{material}/{region}?from=YYYY-MM-DD` to return
+    `{"unit": "...", "prices": [{"date": "YYYY-MM-DD", "price": 123.4}, ...]}`.
+
+    The series already fetched for each pair is kept and only days after its
+    last observation are requested. Those requests are revalidated with
+    ETag / Last-Modified, so polling an unchanged feed costs a 304.
     """
-    def get_price_history(self, material: str, region: str, days: int) -> List[MarketPrice]:
-        # TODO: Implement httpx call to real provider
-        # For now, fallback to simulation or return empty
-        return []
+    source_name = "api"
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.base_url = base_url or settings.PRICE_API_BASE_URL
+        self.api_key = api_key if api_key is not None else settings.PRICE_API_KEY
+        self._client = client
+        self._series: Dict[Tuple[str, str], PriceSeries] = {}
+        # pair -> (from date the validators belong to, ETag, Last-Modified)
+        self._validators: Dict[Tuple[str, str], Tuple[str, Optional[str], Optional[str]]] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                timeout=settings.PRICE_API_TIMEOUT_S,
+                limits=httpx.Limits(
+                    max_connections=settings.PRICE_API_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.PRICE_API_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def seed(self, material: str, region: str, series: PriceSeries) -> None:
+        key = (material, region)
+        self._series[key] = self._series.get(key, PriceSeries.empty()).merged(series)
+
+    async def get_price_history(
+        self, material: str, region: str, days: int, end_date: Optional[date] = None
+    ) -> PriceSeries:
+        dates = window_dates(days, end_date)
+        start, end = dates[0], dates[-1]
+        key = (material, region)
+
+        # One fetch per pair at a time; concurrent callers reuse its result
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            series = self._series.get(key)
+            if series is None or not len(series) or series.dates[0] > start:
+                since = start
+            elif series.dates[-1] < end:
+                since = series.dates[-1] + 1
+            else:
+                since = None
+
+            if since is not None:
+                fetched = await self._fetch(material, region, since)
+                if fetched is not None and len(fetched):
+                    series = fetched if series is None else series.merged(fetched)
+                    self._series[key] = series
+
+        if series is None:
+            return PriceSeries.empty()
+        return series.window(start, end)
+
+    async def _fetch(self, material: str, region: str, since: np.datetime64) -> Optional[PriceSeries]:
+        """New observations from `since` onwards, or None if unchanged (304)."""
+        key = (material, region)
+        since_str = str(since)
+        headers = {}
+        validators = self._validators.get(key)
+        if validators and validators[0] == since_str:
+            if validators[1]:
+                headers["If-None-Match"] = validators[1]
+            if validators[2]:
+                headers["If-Modified-Since"] = validators[2]
+
+        response = await self.client.get(f"/prices/{material}/{region}", params={"from": since_str}, headers=headers)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        self._validators[key] = (since_str, response.headers.get("ETag"), response.headers.get("Last-Modified"))
 
+        body = response.json()
+        rows = body.get("prices") or []
+        logger.debug("Fetched market prices", material=material, region=region, since=since_str, rows=len(rows))
+        dates = np.array([r["date"] for r in rows], dtype="datetime64[D]")
+        prices = np.array([r["price"] for r in rows], dtype=np.float64)
+        order = np.argsort(dates, kind="stable")
+        return PriceSeries(dates[order], prices[order], body.get("unit", "N/A"), self.source_name)
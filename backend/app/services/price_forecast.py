@@ -7,15 +7,22 @@
 # AI Roadmap (2026).
 # =============================================================================
 
-from typing import List, Dict, Optional, Any
+import asyncio
+import time
+from typing import List, Dict, Optional, Any, Tuple
 from enum import Enum
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import numpy as np
 from pydantic import BaseModel, Field
 import structlog
-import random  # For mock data generation until real API source is connected
 
+from app.config import settings
+from app.db.forecasts_repo import forecasts_repo
 from app.services.ai import groq_service
-from app.services.market_data import market_data_service
+from app.services.forecast_engine import BatchForecast, fit_forecast
+from app.services.lock_risk import DEFAULT_SIMULATIONS, LockRiskResult, lock_risk, seed_for
+from app.services.market_data import market_data_service, ist_today
+from app.services.price_data_source import window_dates
 
 logger = structlog.get_logger()
 
@@ -44,18 +51,56 @@ class PricePoint(BaseModel):
 class ForecastRequest(BaseModel):
     material: MaterialType
     region: Region
-    quantity: float
+    quantity: float = Field(gt=0)
     target_margin_percent: float = Field(default=12.0, description="Developer's target margin to protect")
+    lock_premium_percent: float = Field(default=0.0, ge=0, description="Supplier premium for locking today's rate")
+    simulations: int = Field(default=DEFAULT_SIMULATIONS, ge=1_000, le=100_000, description="Monte Carlo price paths")
 
 class ForecastResult(BaseModel):
     material: MaterialType
     region: Region
     current_price: float
     forecast_price_30d: float
+    forecast_lower_30d: Optional[float] = None
+    forecast_upper_30d: Optional[float] = None
+    interval_level: Optional[float] = None
     trend_direction: str  # "UP", "DOWN", "STABLE"
     lock_rate_recommendation: bool
+    confidence_score: float  # Model probability that the price moves in trend_direction
+    ai_analysis: str  # DeepSeek-R1 reasoning on the trend (request-independent)
+    historical_data: List[PricePoint]
+    # Request-specific (computed on demand from the precomputed forecast)
+    projected_cost_change: Optional[float] = None  # quantity x (forecast - current)
+    margin_breach_probability: Optional[float] = None  # P(30d rise > target margin)
+    risk: Optional[LockRiskResult] = None  # Monte Carlo lock vs wait
+    recommendation: Optional[str] = None  # Why lock_rate_recommendation is what it is, from the risk figures
+    as_of: Optional[str] = None  # IST market day the forecast was computed for
+
+# Bump when PrecomputedForecast changes shape: stored payloads of another
+# version are ignored and rebuilt rather than failing validation
+FORECAST_PAYLOAD_VERSION = 3
+
+class PrecomputedForecast(BaseModel):
+    """Everything about a forecast that doesn't depend on the caller's margin or quantity."""
+    payload_version: int = FORECAST_PAYLOAD_VERSION
+    as_of: str
+    material: MaterialType
+    region: Region
+    unit: str
+    current_price: float
+    forecast_price_30d: float
+    forecast_lower_30d: float
+    forecast_upper_30d: float
+    interval_level: float
+    # Fitted model state for simulating paths on demand
+    log_mean_path: List[float]
+    sigma: float
+    alpha: float
+    beta: float
+    phi: float
+    trend_direction: str
     confidence_score: float
-    ai_analysis: str  # DeepSeek-R1 reasoning
+    ai_analysis: str
     historical_data: List[PricePoint]
 
 # =============================================================================
@@ -65,74 +110,132 @@ class ForecastResult(BaseModel):
 class PriceForecastService:
     """
     Core logic for the 'Quantitative Analyst' phase.
-    
+
     1. Market Data Ingestion: Fetches real/simulated data from MarketDataService.
-    2. Trend Analysis: Uses the detected trend from MarketDataService.
-    3. AI Reasoning: Uses DeepSeek-R1 70B to generate "Lock Rate" advice.
+    2. Forecasting: Holt-Winters fit over every material x region series at once
+       (forecast_engine), giving the 30-day projection, interval and confidence.
+    3. AI Reasoning: Uses DeepSeek-R1 70B to explain the model's result.
+
+    Steps 1-3 only change once per market day, so they run nightly for every
+    pair (`precompute`) and are stored in `price_forecasts`. Requests read the
+    stored forecast and only compute the margin/quantity-specific figures.
     """
 
-    async def generate_forecast(self, request: ForecastRequest) -> ForecastResult:
-        """
-        Generate a price forecast and lock-rate recommendation.
-        """
-        # 1. Get Market Data (Deterministic/Real)
-        # Note: We fetch more days (60) to give the chart more context, but AI uses last 30
-        market_data = market_data_service.get_price_history(
-            request.material.value, 
-            request.region.value, 
-            days=30
-        )
-        
-        
+    HISTORY_DAYS = 730      # Two monsoon cycles for the seasonal indices
+    HORIZON_DAYS = 30
+    INTERVAL_LEVEL = 0.9
+    STABLE_BAND = 0.02      # |forecast change| below this is STABLE
+    # Lock when the model gives at least this chance of the rise eating the whole margin
+    MARGIN_BREACH_LOCK_PROBABILITY = 0.1
+
+    def __init__(self):
+        # (as_of date, pair -> row index, batch forecast); refit once per IST day
+        self._batch: Optional[Tuple[date, Dict[Tuple[str, str], int], BatchForecast]] = None
+        self._batch_lock = asyncio.Lock()
+        # Precomputed forecasts loaded from the store, refreshed periodically
+        self._precomputed: Dict[Tuple[str, str], PrecomputedForecast] = {}
+        self._precomputed_loaded_at: Optional[float] = None
+        self._load_lock = asyncio.Lock()
+        self._units: Dict[Tuple[str, str], str] = {}
+
+    async def forecast_all(self) -> Tuple[Dict[Tuple[str, str], int], BatchForecast]:
+        """Batch forecast for every material x region pair as of today (IST)."""
+        as_of = ist_today()
+        if self._batch is not None and self._batch[0] == as_of:
+            return self._batch[1], self._batch[2]
+
+        async with self._batch_lock:
+            if self._batch is not None and self._batch[0] == as_of:
+                return self._batch[1], self._batch[2]
+
+            pairs = [(m.value, r.value) for m in MaterialType for r in Region]
+            histories = await market_data_service.get_price_histories(pairs, days=self.HISTORY_DAYS)
+
+            # Align every series on one daily grid; gaps stay NaN
+            dates = window_dates(self.HISTORY_DAYS, as_of)
+            matrix = np.full((len(pairs), len(dates)), np.nan)
+            for i, pair in enumerate(pairs):
+                series = histories[pair]["history"]
+                if len(series):
+                    matrix[i, (series.dates - dates[0]).astype(np.int64)] = series.prices
+
+            batch = fit_forecast(matrix, dates, horizon=self.HORIZON_DAYS, interval_level=self.INTERVAL_LEVEL)
+            index = {pair: i for i, pair in enumerate(pairs)}
+            self._units = {pair: histories[pair]["unit"] for pair in pairs}
+            self._batch = (as_of, index, batch)
+            logger.info("Fitted price forecasts", series=len(pairs), history_days=self.HISTORY_DAYS)
+            return index, batch
+
+    @property
+    def fitted_as_of(self) -> Optional[date]:
+        """IST market day of the current batch fit, if there is one."""
+        return self._batch[0] if self._batch is not None else None
+
+    def unit_for(self, material: MaterialType, region: Region) -> str:
+        """Price unit of the pair's series in the current batch fit."""
+        return self._units.get((material.value, region.value), "N/A")
+
+    # -------------------------------------------------------------------------
+    # Precomputation (nightly job)
+    # -------------------------------------------------------------------------
+
+    async def build_forecast(self, material: MaterialType, region: Region) -> PrecomputedForecast:
+        """Model forecast plus LLM commentary for one pair."""
+        market_data = await market_data_service.get_price_history(material.value, region.value, days=30)
         current_price = market_data["current_price"]
-        trend = market_data["trend"]
-        
+        momentum_7d = market_data["trend"]
+
         # Convert MarketPrice objects to PricePoint objects
         history = [
-            PricePoint(date=p.date, price=p.price, unit=p.unit) 
+            PricePoint(date=p.date, price=p.price, unit=p.unit)
             for p in market_data["history"]
         ]
-        
-        # 2. Mathematical Projection
-        # Simple projection based on the 7-day trend identified by MarketDataService
-        # If trend is STABLE, we assume minimal drift.
-        if trend == "UP":
-            projected_price = current_price * 1.05  # +5%
-        elif trend == "DOWN":
-            projected_price = current_price * 0.95  # -5%
-        else:
-            projected_price = current_price * 1.01  # +1% inflation bias
-            
-        # 3. AI Analysis (DeepSeek-R1 70B via Router)
-        
+
+        # Statistical Forecast (batched Holt-Winters over all series)
+        index, batch = await self.forecast_all()
+        i = index[(material.value, region.value)]
+        projected_price = float(batch.median[i, -1])
+        lower, upper = float(batch.lower[i, -1]), float(batch.upper[i, -1])
+        confidence = float(batch.direction_confidence()[i])
+
+        change = projected_price / current_price - 1 if current_price else 0.0
+        trend = "STABLE"
+        if change > self.STABLE_BAND: trend = "UP"
+        elif change < -self.STABLE_BAND: trend = "DOWN"
+
+        # AI Analysis (DeepSeek-R1 70B via Router)
         # Take last 7 days for summary
         recent_history = history[-7:] if len(history) >= 7 else history
         history_summary = "\n".join([f"{p.date}: {p.price}" for p in recent_history])
-        
+
         prompt_content = f"""
         Role: Quantitative Supply Chain Analyst for BuildBidz.
-        
-        Task: Analyze price trends for {request.material.value} in {request.region.value}.
-        Target Margin to Protect: {request.target_margin_percent}%
-        
+
+        Task: Analyze price trends for {material.value} in {region.value}.
+
         Current Market Data:
         - Current Price: {current_price} {market_data['unit']}
-        - Trend Direction (7-day): {trend}
+        - 7-day Momentum: {momentum_7d}
         - Recent History (Last 7 Days):
         {history_summary}
-        
+
+        Statistical Forecast (seasonal Holt-Winters, already computed):
+        - 30-day Forecast: {projected_price:.2f} ({change * 100:+.1f}%)
+        - {int(self.INTERVAL_LEVEL * 100)}% Interval: {lower:.2f} to {upper:.2f}
+        - Direction: {trend} (model confidence {confidence:.0%})
+
         Goal:
-        Determine if the developer should "HEGDE/LOCK NOW" or "WAIT".
-        - If prices are rising and threaten the {request.target_margin_percent}% margin, recommend LOCK.
-        - If prices are falling, recommend WAIT.
-        
+        Explain the expected price movement to a developer planning material purchases.
+        Do not change the numbers above. Do not recommend locking or waiting: that
+        depends on each buyer's margin and quantity and is decided separately.
+
         Output:
-        Provide a concise, data-driven analysis (max 3 sentences) explaining your recommendation.
+        Provide a concise, data-driven analysis (max 3 sentences) of the trend.
         Focus on supply chain variables (seasonal demand, logistics) that might explain this trend.
         """
-        
+
         messages = [{"role": "user", "content": prompt_content}]
-        
+
         try:
             # Use the 'forecast' task type which maps to DeepSeek-R1 70B
             response = await groq_service.price_forecast(messages, temperature=0.2)
@@ -141,23 +244,172 @@ class PriceForecastService:
             logger.error("AI Forecast failed", error=str(e))
             ai_analysis = "AI analysis unavailable. Proceed with caution based on mathematical trend."
 
-        # 4. Determine Recommendation
-        # Logic: If trend is UP and AI says Lock -> Lock
-        # If trend is DOWN -> Wait
-        # If STABLE -> Wait (usually)
-        should_lock = (trend == "UP")
-        
-        return ForecastResult(
-            material=request.material,
-            region=request.region,
+        return PrecomputedForecast(
+            as_of=str(self.fitted_as_of),
+            material=material,
+            region=region,
+            unit=market_data["unit"],
             current_price=current_price,
             forecast_price_30d=round(projected_price, 2),
+            forecast_lower_30d=round(lower, 2),
+            forecast_upper_30d=round(upper, 2),
+            interval_level=self.INTERVAL_LEVEL,
+            log_mean_path=batch.log_mean[i].tolist(),
+            sigma=float(batch.sigma[i]),
+            alpha=float(batch.params[i, 0]),
+            beta=float(batch.params[i, 1]),
+            phi=float(batch.params[i, 3]),
             trend_direction=trend,
-            lock_rate_recommendation=should_lock,
-            confidence_score=0.85 if trend != "STABLE" else 0.60,
+            confidence_score=round(confidence, 3),
             ai_analysis=ai_analysis,
-            historical_data=history
+            historical_data=history,
+        )
+
+    async def precompute(self, max_concurrency: Optional[int] = None) -> List[PrecomputedForecast]:
+        """
+        Build and store forecasts for every MaterialType x Region pair.
+        LLM calls are bounded by FORECAST_PRECOMPUTE_MAX_CONCURRENCY.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or settings.FORECAST_PRECOMPUTE_MAX_CONCURRENCY)
+        await self.forecast_all()
+
+        async def one(material: MaterialType, region: Region) -> PrecomputedForecast:
+            async with semaphore:
+                return await self.build_forecast(material, region)
+
+        forecasts = await asyncio.gather(*(one(m, r) for m in MaterialType for r in Region))
+        await forecasts_repo.save_forecasts([f.model_dump(mode="json") for f in forecasts])
+        self._set_precomputed(forecasts)
+        logger.info("Precomputed price forecasts", count=len(forecasts), as_of=forecasts[0].as_of if forecasts else None)
+        return forecasts
+
+    def _set_precomputed(self, forecasts: List[PrecomputedForecast]) -> None:
+        self._precomputed = {(f.material.value, f.region.value): f for f in forecasts}
+        self._precomputed_loaded_at = time.monotonic()
+
+    async def get_precomputed(self, material: MaterialType, region: Region) -> Optional[PrecomputedForecast]:
+        """Latest stored forecast for the pair, from memory, refreshed from the store periodically."""
+        stale = (
+            self._precomputed_loaded_at is None
+            or time.monotonic() - self._precomputed_loaded_at > settings.FORECAST_CACHE_REFRESH_S
         )
+        if stale:
+            async with self._load_lock:
+                if self._precomputed_loaded_at is None or time.monotonic() - self._precomputed_loaded_at > settings.FORECAST_CACHE_REFRESH_S:
+                    try:
+                        rows = await forecasts_repo.get_latest_forecasts()
+                        current = [r for r in rows if r.get("payload_version") == FORECAST_PAYLOAD_VERSION]
+                        if len(current) < len(rows):
+                            logger.info(
+                                "Ignoring outdated precomputed forecasts",
+                                outdated=len(rows) - len(current),
+                                payload_version=FORECAST_PAYLOAD_VERSION,
+                            )
+                        self._set_precomputed([PrecomputedForecast.model_validate(r) for r in current])
+                    except Exception as e:
+                        logger.warning("Could not load precomputed forecasts", error=str(e))
+                        # Don't hammer an unavailable store on every request
+                        self._precomputed_loaded_at = time.monotonic()
+
+        forecast = self._precomputed.get((material.value, region.value))
+        # A forecast older than yesterday means the nightly job hasn't been running
+        if forecast is not None and date.fromisoformat(forecast.as_of) < ist_today() - timedelta(days=1):
+            return None
+        return forecast
+
+    # -------------------------------------------------------------------------
+    # Request path
+    # -------------------------------------------------------------------------
+
+    def should_lock(self, risk: LockRiskResult, quantity: float, current_price: float) -> bool:
+        """
+        The lock rule, shared by /analyze and /boq: lock if waiting is expected
+        to cost materially more than locking (beyond the stable band), or if
+        there's a real chance the rise eats the whole margin.
+        """
+        return (
+            risk.expected_saving_if_wait < -self.STABLE_BAND * quantity * current_price
+            or risk.breach_probability >= self.MARGIN_BREACH_LOCK_PROBABILITY
+        )
+
+    def recommendation_text(self, lock: bool, risk: LockRiskResult, quantity: float, current_price: float,
+                            target_margin_percent: float) -> str:
+        """One-line reason for the lock decision, from the same figures and thresholds as `should_lock`."""
+        saving = risk.expected_saving_if_wait
+        costly_wait = saving < -self.STABLE_BAND * quantity * current_price
+        wait_cost = (
+            f"waiting is expected to save {saving:,.0f}" if saving >= 0
+            else f"waiting is expected to cost {-saving:,.0f} more than locking"
+        )
+        breach = (
+            f"a {risk.breach_probability:.0%} chance the 30-day price rise exceeds your "
+            f"{target_margin_percent:g}% margin"
+        )
+        if not lock:
+            return f"WAIT: {wait_cost}, with {breach}."
+        reasons = [wait_cost] if costly_wait else []
+        if risk.breach_probability >= self.MARGIN_BREACH_LOCK_PROBABILITY:
+            reasons.append(f"there is {breach}")
+        return "LOCK: " + " and ".join(reasons) + "."
+
+    def apply_request(self, forecast: PrecomputedForecast, request: ForecastRequest) -> ForecastResult:
+        """The margin/quantity-specific part of a forecast: Monte Carlo on the stored model, no I/O."""
+        current_price = forecast.current_price
+        risk = lock_risk(
+            current_price=current_price,
+            quantity=request.quantity,
+            target_margin_percent=request.target_margin_percent,
+            log_mean_path=forecast.log_mean_path,
+            sigma=forecast.sigma,
+            alpha=forecast.alpha,
+            beta=forecast.beta,
+            phi=forecast.phi,
+            simulations=request.simulations,
+            lock_premium_percent=request.lock_premium_percent,
+            seed=seed_for(forecast.as_of, forecast.material.value, forecast.region.value),
+        )
+
+        should_lock = self.should_lock(risk, request.quantity, current_price)
+
+        return ForecastResult(
+            material=forecast.material,
+            region=forecast.region,
+            current_price=current_price,
+            forecast_price_30d=forecast.forecast_price_30d,
+            forecast_lower_30d=forecast.forecast_lower_30d,
+            forecast_upper_30d=forecast.forecast_upper_30d,
+            interval_level=forecast.interval_level,
+            trend_direction=forecast.trend_direction,
+            lock_rate_recommendation=should_lock,
+            confidence_score=forecast.confidence_score,
+            ai_analysis=forecast.ai_analysis,
+            historical_data=forecast.historical_data,
+            projected_cost_change=round(request.quantity * (forecast.forecast_price_30d - current_price), 2),
+            margin_breach_probability=risk.breach_probability,
+            risk=risk,
+            recommendation=self.recommendation_text(
+                should_lock, risk, request.quantity, current_price, request.target_margin_percent
+            ),
+            as_of=forecast.as_of,
+        )
+
+    async def generate_forecast(self, request: ForecastRequest) -> ForecastResult:
+        """
+        Generate a price forecast and lock-rate recommendation.
+
+        Served from the nightly precomputed forecast; if there is none yet
+        (or only an outdated payload) for this pair it is built on demand
+        (one LLM call), kept in memory and stored.
+        """
+        forecast = await self.get_precomputed(request.material, request.region)
+        if forecast is None:
+            forecast = await self.build_forecast(request.material, request.region)
+            self._precomputed[(request.material.value, request.region.value)] = forecast
+            try:
+                await forecasts_repo.save_forecasts([forecast.model_dump(mode="json")])
+            except Exception as e:
+                logger.warning("Could not store forecast", error=str(e))
+        return self.apply_request(forecast, request)
 
 # Global Instance
 price_forecast_service = PriceForecastService()
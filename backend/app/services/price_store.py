@@ -0,0 +1,295 @@
+# =============================================================================
+# BuildBidz - Columnar Price Store
+# =============================================================================
+# Local, memory-mapped store of daily price observations per
+# (source, material, region). Each series is a dense day-indexed set of
+# column files, so a date range is an offset computation plus a slice of
+# the mapped arrays instead of regenerating or re-fetching history.
+#
+# Layout under the store root:
+#   {source}/{material}/{region}/meta.json      -> current generation, start day, unit
+#   {source}/{material}/{region}/g{N}/price.npy -> float64, NaN for missing days
+#   .../g{N}/change_7d.npy, change_30d.npy, change_90d.npy  (float32)
+#   .../g{N}/weekly.npy, monthly.npy            -> precomputed OHLC/mean rollups
+#
+# Writers build a new generation directory and then atomically swap
+# meta.json, so readers never see a half-written series.
+# =============================================================================
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Dict, Literal, Optional, Tuple
+
+import numpy as np
+import structlog
+
+from app.services.price_data_source import PriceDataSource, PriceSeries, window_dates
+
+logger = structlog.get_logger()
+
+CHANGE_WINDOWS = (7, 30, 90)
+
+ROLLUP_DTYPE = np.dtype([
+    ("period_start", "datetime64[D]"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("mean", "<f8"),
+    ("days", "<i4"),
+])
+
+RollupPeriod = Literal["week", "month"]
+
+
+def _day(d: date) -> int:
+    return int(np.datetime64(d, "D").astype(np.int64))
+
+
+def compute_changes(prices: np.ndarray, window: int) -> np.ndarray:
+    """Fractional change vs. `window` days earlier; NaN where either side is missing."""
+    out = np.full(len(prices), np.nan, dtype=np.float32)
+    if len(prices) > window:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[window:] = prices[window:] / prices[:-window] - 1.0
+    return out
+
+
+def compute_rollup(days: np.ndarray, prices: np.ndarray, period: RollupPeriod) -> np.ndarray:
+    """Calendar week (Monday start) or month OHLC/mean rollup of a daily series."""
+    valid = ~np.isnan(prices)
+    days, prices = days[valid], prices[valid]
+    if len(days) == 0:
+        return np.empty(0, dtype=ROLLUP_DTYPE)
+
+    dates = days.astype("datetime64[D]")
+    if period == "week":
+        # 1970-01-01 was a Thursday; shift so buckets start on Monday
+        period_start = (days - (days + 3) % 7).astype("datetime64[D]")
+    else:
+        period_start = dates.astype("datetime64[M]").astype("datetime64[D]")
+
+    starts = np.flatnonzero(np.r_[True, period_start[1:] != period_start[:-1]])
+    ends = np.r_[starts[1:], len(prices)] - 1
+    counts = ends - starts + 1
+
+    out = np.empty(len(starts), dtype=ROLLUP_DTYPE)
+    out["period_start"] = period_start[starts]
+    out["open"] = prices[starts]
+    out["close"] = prices[ends]
+    out["high"] = np.maximum.reduceat(prices, starts)
+    out["low"] = np.minimum.reduceat(prices, starts)
+    out["mean"] = np.add.reduceat(prices, starts) / counts
+    out["days"] = counts
+    return out
+
+
+class PriceStore:
+    """Memory-mapped columnar store of daily prices with precomputed rollups."""
+
+    COLUMNS = ("price",) + tuple(f"change_{w}d" for w in CHANGE_WINDOWS)
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._write_lock = threading.Lock()
+        # (series dir, generation) -> mapped arrays
+        self._mapped: Dict[Tuple[Path, int], Dict[str, np.ndarray]] = {}
+
+    # -------------------------------------------------------------------------
+    # Paths & metadata
+    # -------------------------------------------------------------------------
+
+    def _series_dir(self, material: str, region: str, source: str) -> Path:
+        return self.root / source / material / region
+
+    def _meta(self, series_dir: Path) -> Optional[dict]:
+        try:
+            with open(series_dir / "meta.json") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _columns(self, series_dir: Path, meta: dict) -> Dict[str, np.ndarray]:
+        key = (series_dir, meta["generation"])
+        cols = self._mapped.get(key)
+        if cols is None:
+            gen_dir = series_dir / f"g{meta['generation']}"
+            cols = {
+                name: np.load(gen_dir / f"{name}.npy", mmap_mode="r")
+                for name in self.COLUMNS + ("weekly", "monthly")
+            }
+            # Drop handles to older generations of this series
+            for stale in [k for k in self._mapped if k[0] == series_dir]:
+                self._mapped.pop(stale, None)
+            self._mapped[key] = cols
+        return cols
+
+    def coverage(self, material: str, region: str, source: str = "simulated") -> Optional[Tuple[date, date]]:
+        """First and last stored day for a series, or None if nothing is stored."""
+        meta = self._meta(self._series_dir(material, region, source))
+        if meta is None or meta["length"] == 0:
+            return None
+        start = np.datetime64(meta["start"], "D")
+        return start.astype(date), (start + (meta["length"] - 1)).astype(date)
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    def _slice(self, material: str, region: str, start: date, end: date, source: str):
+        series_dir = self._series_dir(material, region, source)
+        meta = self._meta(series_dir)
+        if meta is None:
+            return None, None
+        first = _day(date.fromisoformat(meta["start"]))
+        lo, hi = _day(start) - first, _day(end) - first + 1
+        if lo < 0 or hi > meta["length"] or lo >= hi:
+            return None, None
+        return meta, (self._columns(series_dir, meta), slice(lo, hi))
+
+    def read(
+        self, material: str, region: str, start: date, end: date, source: str = "simulated"
+    ) -> Optional[PriceSeries]:
+        """
+        Daily prices for [start, end] inclusive, or None unless every day in the
+        range is stored (the caller should then fetch and `write` the range).
+        """
+        meta, found = self._slice(material, region, start, end, source)
+        if found is None:
+            return None
+        cols, window = found
+        prices = np.asarray(cols["price"][window])
+        if np.isnan(prices).any():
+            return None
+        dates = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+        return PriceSeries(dates, prices, meta["unit"], source)
+
+    def read_observed(
+        self, material: str, region: str, start: date, end: date, source: str = "simulated"
+    ) -> PriceSeries:
+        """Whatever days of [start, end] are stored (gaps and days outside coverage are skipped)."""
+        series_dir = self._series_dir(material, region, source)
+        meta = self._meta(series_dir)
+        if meta is None or meta["length"] == 0:
+            return PriceSeries.empty(source=source)
+        first = _day(date.fromisoformat(meta["start"]))
+        lo = max(_day(start) - first, 0)
+        hi = min(_day(end) - first + 1, meta["length"])
+        if lo >= hi:
+            return PriceSeries.empty(meta["unit"], source)
+        prices = np.asarray(self._columns(series_dir, meta)["price"][lo:hi])
+        dates = np.datetime64(meta["start"], "D") + np.arange(lo, hi)
+        keep = ~np.isnan(prices)
+        return PriceSeries(dates[keep], prices[keep], meta["unit"], source)
+
+    def changes(self, material: str, region: str, day: date, source: str = "simulated") -> Optional[Dict[int, float]]:
+        """Precomputed 7/30/90-day fractional changes as of `day` (NaN when unavailable)."""
+        _, found = self._slice(material, region, day, day, source)
+        if found is None:
+            return None
+        cols, window = found
+        return {w: float(cols[f"change_{w}d"][window][0]) for w in CHANGE_WINDOWS}
+
+    def rollup(
+        self,
+        material: str,
+        region: str,
+        period: RollupPeriod,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        source: str = "simulated",
+    ) -> np.ndarray:
+        """Weekly or monthly rollup rows whose period starts within [start, end]."""
+        series_dir = self._series_dir(material, region, source)
+        meta = self._meta(series_dir)
+        if meta is None:
+            return np.empty(0, dtype=ROLLUP_DTYPE)
+        rows = self._columns(series_dir, meta)["weekly" if period == "week" else "monthly"]
+        lo = 0 if start is None else np.searchsorted(rows["period_start"], np.datetime64(start, "D"), side="left")
+        hi = len(rows) if end is None else np.searchsorted(rows["period_start"], np.datetime64(end, "D"), side="right")
+        return np.asarray(rows[lo:hi])
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+
+    def write(self, material: str, region: str, series: PriceSeries) -> None:
+        """
+        Merge a fetched series into the store (new values win) and rebuild the
+        change columns and rollups for the series.
+        """
+        if not len(series):
+            return
+        series_dir = self._series_dir(material, region, series.source)
+        new_days = series.dates.astype(np.int64)
+
+        with self._write_lock:
+            meta = self._meta(series_dir)
+            if meta is not None and meta["length"]:
+                old_start = _day(date.fromisoformat(meta["start"]))
+                old_prices = np.asarray(self._columns(series_dir, meta)["price"])
+                start = min(old_start, int(new_days.min()))
+                stop = max(old_start + meta["length"], int(new_days.max()) + 1)
+                prices = np.full(stop - start, np.nan)
+                prices[old_start - start:old_start - start + len(old_prices)] = old_prices
+            else:
+                start = int(new_days.min())
+                prices = np.full(int(new_days.max()) + 1 - start, np.nan)
+            prices[new_days - start] = series.prices
+
+            generation = (meta["generation"] + 1) if meta else 1
+            gen_dir = series_dir / f"g{generation}"
+            if gen_dir.exists():
+                shutil.rmtree(gen_dir)
+            gen_dir.mkdir(parents=True)
+
+            days = np.arange(start, start + len(prices), dtype=np.int64)
+            np.save(gen_dir / "price.npy", prices)
+            for w in CHANGE_WINDOWS:
+                np.save(gen_dir / f"change_{w}d.npy", compute_changes(prices, w))
+            np.save(gen_dir / "weekly.npy", compute_rollup(days, prices, "week"))
+            np.save(gen_dir / "monthly.npy", compute_rollup(days, prices, "month"))
+
+            new_meta = {
+                "generation": generation,
+                "start": str(np.datetime64(start, "D")),
+                "length": len(prices),
+                "unit": series.unit,
+            }
+            fd, tmp = tempfile.mkstemp(dir=series_dir, suffix=".json")
+            with os.fdopen(fd, "w") as f:
+                json.dump(new_meta, f)
+            os.replace(tmp, series_dir / "meta.json")
+
+            # Keep the previous generation for readers that loaded the old
+            # meta.json just before the swap; anything older can go (open
+            # memmaps stay valid after unlink).
+            if meta is not None:
+                shutil.rmtree(series_dir / f"g{meta['generation'] - 1}", ignore_errors=True)
+
+        logger.debug("Price store updated", material=material, region=region, source=series.source, days=len(prices))
+
+
+class StoredDataSource(PriceDataSource):
+    """
+    Serves history straight from a PriceStore, fully offline. Used to replay
+    stored provider data (e.g. backtesting); `stored_source` picks which
+    source's series to read.
+    """
+
+    def __init__(self, store: PriceStore, stored_source: str = "simulated"):
+        self.store = store
+        self.source_name = stored_source
+
+    async def get_price_history(
+        self, material: str, region: str, days: int = 30, end_date: Optional[date] = None
+    ) -> PriceSeries:
+        dates = window_dates(days, end_date)
+        return self.store.read_observed(
+            material, region, dates[0].astype(date), dates[-1].astype(date), self.source_name
+        )
@@ -0,0 +1,90 @@
+# =============================================================================
+# BuildBidz - Supplier Performance Profiles
+# =============================================================================
+# Turns the per-supplier running aggregates kept in `supplier_performance`
+# into the delivery/reputation inputs used by the Compare & Award engine.
+# Everything here is a pure function of the aggregates, so rankings are
+# deterministic and award results can be cached.
+# =============================================================================
+
+from typing import Any, Dict, Optional
+from pydantic import BaseModel
+
+from app.services.award_engine import Bid
+
+# Neutral values for suppliers with no delivery history yet
+DEFAULT_REPUTATION = 5.0
+DEFAULT_DELIVERY_DAYS = 7
+
+# Pseudo-deliveries at a 50% on-time rate blended into every profile, so one
+# early delivery can't take a new supplier straight to 10/10.
+PRIOR_DELIVERIES = 4
+# Reputation points lost per dispute as a fraction of awards
+DISPUTE_PENALTY = 5.0
+
+# =============================================================================
+# Data Models
+# =============================================================================
+
+class SupplierProfile(BaseModel):
+    supplier_name: str
+    awards_count: int = 0
+    deliveries_count: int = 0
+    on_time_count: int = 0
+    total_delivery_days: int = 0
+    dispute_count: int = 0
+
+    @property
+    def on_time_rate(self) -> Optional[float]:
+        if not self.deliveries_count:
+            return None
+        return self.on_time_count / self.deliveries_count
+
+    @property
+    def avg_delivery_days(self) -> Optional[float]:
+        if not self.deliveries_count:
+            return None
+        return self.total_delivery_days / self.deliveries_count
+
+    @property
+    def reputation_score(self) -> float:
+        """0-10 score from the smoothed on-time rate minus a dispute penalty."""
+        if not self.deliveries_count and not self.dispute_count:
+            return DEFAULT_REPUTATION
+        smoothed_on_time = (self.on_time_count + PRIOR_DELIVERIES * 0.5) / (self.deliveries_count + PRIOR_DELIVERIES)
+        dispute_rate = self.dispute_count / max(self.awards_count, self.deliveries_count, 1)
+        score = 10 * smoothed_on_time - DISPUTE_PENALTY * dispute_rate
+        return round(min(10.0, max(0.0, score)), 1)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            **self.model_dump(),
+            "on_time_rate": round(self.on_time_rate, 3) if self.on_time_rate is not None else None,
+            "avg_delivery_days": round(self.avg_delivery_days, 1) if self.avg_delivery_days is not None else None,
+            "reputation_score": self.reputation_score,
+        }
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def to_engine_bid(row: Dict[str, Any], profile: Optional[SupplierProfile] = None) -> Bid:
+    """
+    Map a DB bid row to the award engine's Bid model.
+
+    Delivery uses the supplier's quoted days, falling back to their historical
+    average; reputation comes from the supplier's performance profile.
+    """
+    profile = profile or SupplierProfile(supplier_name=row["contractor_name"])
+    delivery_days = row.get("delivery_days")
+    if delivery_days is None:
+        avg = profile.avg_delivery_days
+        delivery_days = round(avg) if avg is not None else DEFAULT_DELIVERY_DAYS
+    return Bid(
+        id=str(row["id"]),
+        supplier_name=row["contractor_name"],
+        price=float(row["amount"]),
+        delivery_days=int(delivery_days),
+        reputation_score=profile.reputation_score,
+        is_verified=profile.deliveries_count > 0,
+    )
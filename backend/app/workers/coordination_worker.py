@@ -0,0 +1,57 @@
+# =============================================================================
+# BuildBidz - Coordination Worker
+# =============================================================================
+# Background fan-out of contractor notifications (post-award blasts), using
+# the same grouped, rate-limited generation as /coordination/send-bulk.
+# =============================================================================
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from app.workers.celery_app import celery_app
+from app.services.coordination_agent import NotificationRequest
+from app.services.notification_batch import run_bulk_notifications
+
+logger = structlog.get_logger()
+
+PROGRESS_INTERVAL_S = 1.0
+
+
+@celery_app.task(
+    bind=True,
+    name="workers.coordination_worker.send_bulk_notifications",
+    max_retries=1,
+)
+def send_bulk_notifications(
+    self, notifications: List[Dict[str, Any]], max_concurrency: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Generate notifications for many recipients. Per-recipient failures are
+    reported in the result rather than failing the task.
+    """
+    requests = [NotificationRequest.model_validate(n) for n in notifications]
+    logger.info("Starting bulk notifications", task_id=self.request.id, total=len(requests))
+
+    failed = 0
+    last_update = 0.0
+
+    def on_progress(done: int, total: int, item) -> None:
+        # Per-recipient progress for pollers, throttled to spare the result backend
+        nonlocal failed, last_update
+        failed += item.status == "failed"
+        now = time.monotonic()
+        if done == total or now - last_update >= PROGRESS_INTERVAL_S:
+            last_update = now
+            self.update_state(state="PROGRESS", meta={"done": done, "total": total, "failed": failed})
+
+    try:
+        loop = asyncio.get_event_loop()
+        summary = loop.run_until_complete(run_bulk_notifications(requests, max_concurrency, on_progress=on_progress))
+        return summary.model_dump(mode="json")
+
+    except Exception as e:
+        logger.error("Bulk notifications failed", error=str(e))
+        raise self.retry(exc=e)
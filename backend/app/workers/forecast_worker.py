@@ -0,0 +1,53 @@
+# =============================================================================
+# BuildBidz - Forecast Precomputation Worker
+# =============================================================================
+# Nightly job that fits price forecasts and generates the DeepSeek-R1
+# lock-rate commentary for every material x region pair, so
+# /forecast/analyze can serve them from the store.
+# =============================================================================
+
+import asyncio
+from typing import Any, Dict
+
+from celery.schedules import crontab
+import structlog
+
+from app.workers.celery_app import celery_app
+from app.services.price_forecast import price_forecast_service
+
+logger = structlog.get_logger()
+
+# 02:30 IST (21:00 UTC), after the market day has rolled over and off-peak
+celery_app.conf.beat_schedule = {
+    **(celery_app.conf.beat_schedule or {}),
+    "precompute-price-forecasts": {
+        "task": "workers.forecast_worker.precompute_forecasts",
+        "schedule": crontab(hour=21, minute=0),
+    },
+}
+
+
+@celery_app.task(
+    bind=True,
+    name="workers.forecast_worker.precompute_forecasts",
+    max_retries=3,
+    default_retry_delay=300,
+)
+def precompute_forecasts(self) -> Dict[str, Any]:
+    """Compute and store forecasts for every MaterialType x Region pair."""
+    logger.info("Starting forecast precomputation", task_id=self.request.id)
+
+    try:
+        loop = asyncio.get_event_loop()
+        forecasts = loop.run_until_complete(price_forecast_service.precompute())
+
+        result = {
+            "as_of": forecasts[0].as_of if forecasts else None,
+            "count": len(forecasts),
+        }
+        logger.info("Forecast precomputation completed", **result)
+        return result
+
+    except Exception as e:
+        logger.error("Forecast precomputation failed", error=str(e))
+        raise self.retry(exc=e)
@@ -6,17 +6,21 @@
 # =============================================================================
 
 import asyncio
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List, Optional
 
 from celery import shared_task
 import structlog
 
 from app.workers.celery_app import celery_app
 from app.services.extraction_agent import extraction_agent
+from app.services.extraction_batch import BatchDocument, run_batch_extraction
 from app.db.session import get_db_pool
 
 logger = structlog.get_logger()
 
+PROGRESS_INTERVAL_S = 1.0
+
 async def update_document_extraction(document_id: str, data: Dict[str, Any]) -> None:
     """
     Update document with extracted JSON data.
@@ -50,6 +54,9 @@ async def update_document_extraction(document_id: str, data: Dict[str, Any]) ->
 def extract_invoice(self, document_id: str, ocr_text: str) -> Dict[str, Any]:
     """
     Process OCR text to extract structure (Invoice details, GSTIN, Line Items).
+
+    The agent caches results by OCR text, so a retry after a failed DB
+    update (or a duplicate upload) doesn't extract again.
     """
     logger.info("Starting Magic Extraction", document_id=document_id, task_id=self.request.id)
 
@@ -66,7 +73,8 @@ def extract_invoice(self, document_id: str, ocr_text: str) -> Dict[str, Any]:
             document_id=document_id,
             doc_type=result_dict.get("document_type"),
             verification_ready=result_dict.get("verification_ready"),
-            gstin=result_dict.get("gstin")
+            gstin=result_dict.get("gstin"),
+            cached=result_dict.get("cached"),
         )
 
         # Update DB
@@ -77,3 +85,46 @@ def extract_invoice(self, document_id: str, ocr_text: str) -> Dict[str, Any]:
     except Exception as e:
         logger.error("Magic Extraction failed", document_id=document_id, error=str(e))
         raise self.retry(exc=e)
+
+
+@celery_app.task(
+    bind=True,
+    name="workers.magic_extractor.extract_invoices_batch",
+    max_retries=1,
+)
+def extract_invoices_batch(
+    self, documents: List[Dict[str, Any]], max_concurrency: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Extract many short documents (receipts, WhatsApp screenshots), packing
+    several into each model call. Documents with a `document_id` get their
+    extracted data written back; per-document failures are reported in the
+    result rather than failing the task.
+    """
+    batch = [BatchDocument.model_validate(d) for d in documents]
+    logger.info("Starting batch extraction", task_id=self.request.id, total=len(batch))
+
+    failed = 0
+    last_update = 0.0
+
+    def on_progress(done: int, total: int, item) -> None:
+        nonlocal failed, last_update
+        failed += item.status == "failed"
+        now = time.monotonic()
+        if done == total or now - last_update >= PROGRESS_INTERVAL_S:
+            last_update = now
+            self.update_state(state="PROGRESS", meta={"done": done, "total": total, "failed": failed})
+
+    try:
+        loop = asyncio.get_event_loop()
+        summary = loop.run_until_complete(run_batch_extraction(batch, max_concurrency, on_progress=on_progress))
+
+        for item in summary.results:
+            if item.document_id and item.result is not None:
+                loop.run_until_complete(update_document_extraction(item.document_id, item.result.dict()))
+
+        return summary.model_dump(mode="json")
+
+    except Exception as e:
+        logger.error("Batch extraction failed", error=str(e))
+        raise self.retry(exc=e)
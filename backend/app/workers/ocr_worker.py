@@ -4,139 +4,24 @@
 # =============================================================================
 
 import asyncio
-import io
 import time
-from typing import Optional
+from typing import List, Optional
 
-import httpx
 from celery import current_task
 import structlog
 
 from app.config import settings
 from app.workers.celery_app import celery_app
 from app.db.session import get_db_pool
+from app.db.fingerprints_repo import fingerprints_repo
+from app.services.image_dedup import content_hash
+from app.services.image_preprocess import ocr_with_preprocessing, preprocess_image, PreprocessedImage
+from app.services.ocr_engines import AzureVisionOCR, TesseractOCR, get_ocr_pool
+from app.services.pdf_ocr import is_pdf, process_pdf
 
 logger = structlog.get_logger()
 
 
-class AzureVisionOCR:
-    """Azure Computer Vision OCR client."""
-
-    def __init__(self):
-        self.endpoint = settings.AZURE_VISION_ENDPOINT
-        self.key = settings.AZURE_VISION_KEY
-        self.api_version = "2023-04-01-preview"
-
-    async def extract_text(self, image_bytes: bytes) -> dict:
-        """Extract text from image using Azure Vision Read API."""
-        if not self.endpoint or not self.key:
-            raise ValueError("Azure Vision not configured")
-
-        url = f"{self.endpoint}/vision/v3.2/read/analyze"
-
-        async with httpx.AsyncClient() as client:
-            # Submit image for analysis
-            response = await client.post(
-                url,
-                headers={
-                    "Ocp-Apim-Subscription-Key": self.key,
-                    "Content-Type": "application/octet-stream",
-                },
-                content=image_bytes,
-                timeout=30.0,
-            )
-
-            if response.status_code != 202:
-                raise Exception(f"Azure Vision error: {response.status_code}")
-
-            # Get operation location
-            operation_url = response.headers.get("Operation-Location")
-
-            # Poll for results
-            for _ in range(60):  # Max 60 seconds
-                await asyncio.sleep(1)
-
-                result_response = await client.get(
-                    operation_url,
-                    headers={"Ocp-Apim-Subscription-Key": self.key},
-                )
-                result = result_response.json()
-
-                if result.get("status") == "succeeded":
-                    return self._parse_result(result)
-                elif result.get("status") == "failed":
-                    raise Exception("Azure Vision analysis failed")
-
-            raise Exception("Azure Vision timeout")
-
-    def _parse_result(self, result: dict) -> dict:
-        """Parse Azure Vision result into structured format."""
-        lines = []
-        full_text = []
-        confidence_scores = []
-
-        for page in result.get("analyzeResult", {}).get("readResults", []):
-            for line in page.get("lines", []):
-                lines.append({
-                    "text": line.get("text"),
-                    "bounding_box": line.get("boundingBox"),
-                    "confidence": sum(w.get("confidence", 0) for w in line.get("words", [])) / max(len(line.get("words", [])), 1),
-                })
-                full_text.append(line.get("text", ""))
-                for word in line.get("words", []):
-                    confidence_scores.append(word.get("confidence", 0))
-
-        avg_confidence = sum(confidence_scores) / max(len(confidence_scores), 1)
-
-        return {
-            "text": "\n".join(full_text),
-            "lines": lines,
-            "confidence": avg_confidence,
-            "provider": "azure_vision",
-        }
-
-
-class TesseractOCR:
-    """Fallback OCR using Tesseract."""
-
-    async def extract_text(self, image_bytes: bytes) -> dict:
-        """Extract text using Tesseract OCR."""
-        try:
-            import pytesseract
-            from PIL import Image
-
-            image = Image.open(io.BytesIO(image_bytes))
-
-            # Run Tesseract with Hindi and English language support
-            text = pytesseract.image_to_string(
-                image,
-                lang="eng+hin",
-                config="--psm 3"
-            )
-
-            # Get confidence data
-            data = pytesseract.image_to_data(
-                image,
-                lang="eng+hin",
-                output_type=pytesseract.Output.DICT
-            )
-
-            confidences = [
-                int(c) for c in data.get("conf", [])
-                if str(c).isdigit() and int(c) > 0
-            ]
-            avg_confidence = sum(confidences) / max(len(confidences), 1) / 100
-
-            return {
-                "text": text.strip(),
-                "lines": [],
-                "confidence": avg_confidence,
-                "provider": "tesseract",
-            }
-        except ImportError:
-            raise Exception("Tesseract not installed")
-
-
 async def download_file(storage_path: str) -> bytes:
     """Download file from Firebase Storage."""
     from app.firebase import download_firebase_file
@@ -165,6 +50,29 @@ async def update_document_ocr(
         )
 
 
+async def save_ocr_page(document_id: str, page_count: int, page: dict) -> None:
+    """Record one finished PDF page (progress is rows written / page_count)."""
+    pool = await get_db_pool()
+
+    async with pool.acquire() as conn:
+        await conn.execute(
+            """
+            INSERT INTO document_ocr_pages (document_id, page, page_count, provider, text, confidence, duration_ms, created_at)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, NOW())
+            ON CONFLICT (document_id, page) DO UPDATE
+            SET page_count = EXCLUDED.page_count, provider = EXCLUDED.provider, text = EXCLUDED.text,
+                confidence = EXCLUDED.confidence, duration_ms = EXCLUDED.duration_ms, created_at = NOW()
+            """,
+            document_id,
+            page["page"],
+            page_count,
+            page.get("provider"),
+            page.get("text"),
+            page.get("confidence"),
+            page.get("duration_ms"),
+        )
+
+
 # =============================================================================
 # Celery Tasks
 # =============================================================================
@@ -179,7 +87,10 @@ def process_document_ocr(self, document_id: str) -> dict:
     """
     Process document OCR.
     
-    Uses Azure Vision as primary, Tesseract as fallback.
+    Uses Azure Vision as primary, Tesseract as fallback. PDFs are processed
+    page by page (text-layer pages skip OCR), with progress per page. An
+    image that is a copy of one already OCRed in the same org is linked to
+    it instead of being processed again.
     """
     logger.info("Starting OCR", document_id=document_id, task_id=self.request.id)
 
@@ -209,6 +120,108 @@ def process_document_ocr(self, document_id: str) -> dict:
         raise self.retry(exc=e)
 
 
+async def recognise_image(image_bytes: bytes) -> dict:
+    """OCR one image: Azure Vision first, Tesseract as fallback."""
+    try:
+        if settings.AZURE_VISION_ENDPOINT:
+            azure_ocr = AzureVisionOCR()
+            return await azure_ocr.extract_text(image_bytes)
+        raise ValueError("Azure Vision not configured")
+    except Exception as azure_error:
+        logger.warning("Azure Vision failed, trying Tesseract", error=str(azure_error))
+
+        # Fallback to Tesseract
+        tesseract_ocr = TesseractOCR()
+        return await tesseract_ocr.extract_text(image_bytes)
+
+
+async def _preprocess(image_bytes: bytes) -> PreprocessedImage:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_ocr_pool(), preprocess_image, image_bytes)
+
+
+async def ocr_image(image_bytes: bytes) -> dict:
+    """OCR one image (or rasterised PDF page), preprocessed first when OCR_PREPROCESS is on."""
+    if not settings.OCR_PREPROCESS:
+        return await recognise_image(image_bytes)
+    result = await ocr_with_preprocessing(
+        image_bytes, recognise_image, _preprocess, compare=settings.OCR_PREPROCESS_COMPARE
+    )
+    if "preprocess" in result:
+        metrics = result["preprocess"]
+        logger.info(
+            "OCR preprocessing",
+            bytes_saved=metrics["bytes_saved"],
+            original_size=metrics["original_size"],
+            output_size=metrics["output_size"],
+            preprocess_ms=metrics["duration_ms"],
+            ocr_ms=metrics["ocr_ms"],
+        )
+    return result
+
+
+async def ocr_page_batch(images: List[bytes]) -> List[dict]:
+    """
+    OCR a PDF's scanned pages in one Azure Read batch: every page is
+    submitted, then all are polled together. Pages Azure fails on fall back
+    to Tesseract.
+    """
+    prepared: List[Optional[PreprocessedImage]] = [None] * len(images)
+    if settings.OCR_PREPROCESS:
+        outcomes = await asyncio.gather(*(_preprocess(image) for image in images), return_exceptions=True)
+        prepared = [None if isinstance(o, Exception) else o for o in outcomes]
+    inputs = [p.image if p is not None else image for p, image in zip(prepared, images)]
+
+    try:
+        results = await AzureVisionOCR().extract_batch(inputs)
+    except Exception as e:
+        results = [e] * len(inputs)
+
+    async def finish(i: int) -> dict:
+        result = results[i]
+        if isinstance(result, Exception):
+            logger.warning("Azure Vision failed, trying Tesseract", page_index=i, error=str(result))
+            result = await TesseractOCR().extract_text(inputs[i])
+        if prepared[i] is not None:
+            result = {**result, "preprocess": prepared[i].metrics()}
+        return result
+
+    return list(await asyncio.gather(*(finish(i) for i in range(len(inputs)))))
+
+
+async def find_duplicate(document_id: str, org_id: Optional[str], image_bytes: bytes) -> Optional[dict]:
+    """
+    Hash the decoded pixels and look for an exact copy already OCRed in the
+    same org. Returns the original's OCR result, linked as `duplicate_of`,
+    or None (the fingerprint is recorded either way).
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        digest = await loop.run_in_executor(get_ocr_pool(), content_hash, image_bytes)
+    except Exception as e:
+        logger.warning("Could not fingerprint image", document_id=document_id, error=str(e))
+        return None
+
+    try:
+        original = await fingerprints_repo.find_original(org_id, digest, document_id)
+        duplicate_of = str(original["document_id"]) if original else None
+        await fingerprints_repo.save_fingerprint(document_id, org_id, digest, duplicate_of=duplicate_of)
+    except Exception as e:
+        logger.warning("Fingerprint lookup failed", document_id=document_id, error=str(e))
+        return None
+
+    if original is None:
+        return None
+    logger.info("Duplicate image, reusing OCR", document_id=document_id, duplicate_of=duplicate_of)
+    return {
+        "text": original["ocr_text"] or "",
+        "lines": [],
+        "confidence": original["ocr_confidence"],
+        "provider": "duplicate",
+        "duplicate_of": duplicate_of,
+    }
+
+
 async def _process_document_ocr(document_id: str) -> dict:
     """Async implementation of document OCR."""
     pool = await get_db_pool()
@@ -216,7 +229,7 @@ async def _process_document_ocr(document_id: str) -> dict:
     # Get document info
     async with pool.acquire() as conn:
         doc = await conn.fetchrow(
-            "SELECT file_path, mime_type FROM documents WHERE id = $1",
+            "SELECT file_path, mime_type, org_id FROM documents WHERE id = $1",
             document_id,
         )
 
@@ -229,30 +242,44 @@ async def _process_document_ocr(document_id: str) -> dict:
     # Download file
     file_bytes = await download_file(doc["file_path"])
 
-    # Try Azure Vision first
-    try:
-        if settings.AZURE_VISION_ENDPOINT:
-            azure_ocr = AzureVisionOCR()
-            result = await azure_ocr.extract_text(file_bytes)
-        else:
-            raise ValueError("Azure Vision not configured")
-    except Exception as azure_error:
-        logger.warning("Azure Vision failed, trying Tesseract", error=str(azure_error))
-
-        # Fallback to Tesseract
-        tesseract_ocr = TesseractOCR()
-        result = await tesseract_ocr.extract_text(file_bytes)
+    pdf = is_pdf(file_bytes, doc.get("mime_type"))
+
+    # Exact copies of an earlier photo reuse its OCR instead of reprocessing
+    result = None
+    if settings.IMAGE_DEDUP and not pdf:
+        org_id = doc.get("org_id")
+        result = await find_duplicate(document_id, str(org_id) if org_id else None, file_bytes)
+
+    if result is None and pdf:
+        done = 0
+
+        async def on_page(page_number: int, page_count: int, page: dict) -> None:
+            nonlocal done
+            done += 1
+            try:
+                await save_ocr_page(document_id, page_count, page)
+            except Exception as e:
+                logger.warning("Could not record OCR page", document_id=document_id, page=page_number, error=str(e))
+            if current_task:
+                current_task.update_state(state="PROGRESS", meta={"pages_done": done, "pages": page_count})
+
+        # Azure's batch mode submits all scanned pages at once; compare mode needs the per-page path
+        batch = settings.AZURE_VISION_ENDPOINT and not settings.OCR_PREPROCESS_COMPARE
+        result = await process_pdf(file_bytes, ocr_image, on_page=on_page, ocr_batch=ocr_page_batch if batch else None)
+    elif result is None:
+        result = await ocr_image(file_bytes)
 
     # Update document
     await update_document_ocr(document_id, result)
 
-    # Queue embedding generation
-    celery_app.send_task(
-        "workers.embedding_worker.generate_document_embeddings",
-        args=[document_id],
-    )
+    # Queue embedding generation (a duplicate's content is already indexed under the original)
+    if "duplicate_of" not in result:
+        celery_app.send_task(
+            "workers.embedding_worker.generate_document_embeddings",
+            args=[document_id],
+        )
 
-    # Queue Magic Extractor for invoices
+    # Queue Magic Extractor for invoices (a duplicate's text hits the extraction cache)
     if "invoice" in doc.get("mime_type", "").lower() or result.get("text", "").lower().find("invoice") >= 0:
         celery_app.send_task(
             "workers.magic_extractor.extract_invoice",
@@ -62,3 +62,76 @@ CREATE TABLE IF NOT EXISTS award_decisions (
     justification TEXT,
     rankings_json JSONB
 );
+
+-- Batch award runs record which tender each decision belongs to
+ALTER TABLE award_decisions ADD COLUMN IF NOT EXISTS tender_id INTEGER REFERENCES tenders(id);
+CREATE INDEX IF NOT EXISTS idx_bids_tender_id ON bids (tender_id);
+
+-- Supplier Performance (replaces simulated delivery/reputation in the award engine)
+ALTER TABLE bids ADD COLUMN IF NOT EXISTS delivery_days INTEGER;          -- quoted by the supplier
+ALTER TABLE bids ADD COLUMN IF NOT EXISTS actual_delivery_days INTEGER;   -- recorded on delivery
+ALTER TABLE bids ADD COLUMN IF NOT EXISTS delivered_at TIMESTAMP;
+ALTER TABLE bids ADD COLUMN IF NOT EXISTS disputed BOOLEAN DEFAULT FALSE;
+
+-- Running aggregates per supplier, updated incrementally on award/delivery/dispute events
+CREATE TABLE IF NOT EXISTS supplier_performance (
+    supplier_name TEXT PRIMARY KEY,
+    awards_count INTEGER NOT NULL DEFAULT 0,
+    deliveries_count INTEGER NOT NULL DEFAULT 0,
+    on_time_count INTEGER NOT NULL DEFAULT 0,
+    total_delivery_days BIGINT NOT NULL DEFAULT 0,
+    dispute_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Nightly precomputed material price forecasts (model output + LLM commentary)
+CREATE TABLE IF NOT EXISTS price_forecasts (
+    as_of DATE NOT NULL,            -- IST market day
+    material TEXT NOT NULL,
+    region TEXT NOT NULL,
+    payload_json JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (as_of, material, region)
+);
+
+-- Translated notification templates (one per step, language and prompt version)
+CREATE TABLE IF NOT EXISTS message_templates (
+    step TEXT NOT NULL,
+    language TEXT NOT NULL,
+    version TEXT NOT NULL,          -- hash of the source template and prompts
+    template TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (step, language, version)
+);
+
+-- Extraction results keyed by normalised OCR text hash and extraction prompt version
+CREATE TABLE IF NOT EXISTS extraction_results (
+    text_hash TEXT NOT NULL,        -- blake2b of the normalised OCR text
+    version TEXT NOT NULL,          -- hash of the prompts and model; changes invalidate entries
+    payload_json JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (text_hash, version)
+);
+
+-- Per-page OCR results for multi-page PDFs (progress while a document is processing)
+CREATE TABLE IF NOT EXISTS document_ocr_pages (
+    document_id UUID NOT NULL,
+    page INTEGER NOT NULL,          -- 1-based
+    page_count INTEGER NOT NULL,
+    provider TEXT,                  -- pdf_text, azure_vision or tesseract
+    text TEXT,
+    confidence DOUBLE PRECISION,
+    duration_ms DOUBLE PRECISION,
+    created_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (document_id, page)
+);
+
+-- Decoded-pixel hashes of uploaded images, for reusing the OCR of exact copies
+CREATE TABLE IF NOT EXISTS image_fingerprints (
+    document_id UUID PRIMARY KEY,
+    org_id UUID,
+    content_hash BYTEA NOT NULL,    -- SHA-256 of the decoded, upright pixels
+    duplicate_of UUID,              -- original document whose OCR/extraction was reused
+    created_at TIMESTAMP DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_image_fingerprints_content ON image_fingerprints (org_id, content_hash);
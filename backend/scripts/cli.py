@@ -13,13 +13,17 @@ Usage:
     python -m scripts.cli sync tally     # Sync invoices to Tally
     python -m scripts.cli worker ocr     # Process pending OCR
     python -m scripts.cli report daily   # Generate daily report
+    python -m scripts.cli award batch    # Batch Compare & Award for tenders
+    python -m scripts.cli prices backfill # Populate the local price store
+    python -m scripts.cli prices forecast # Precompute forecasts for all pairs
+    python -m scripts.cli prices backtest --start 2024-01-01 --end 2025-12-31  # Offline backtest
 """
 
 import asyncio
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import typer
 import asyncpg
@@ -370,6 +374,196 @@ def groq_test(
     asyncio.run(run_test())
 
 
+# =============================================================================
+# Award Commands
+# =============================================================================
+
+award_app = typer.Typer(help="Compare & Award engine utilities")
+app.add_typer(award_app, name="award")
+
+@award_app.command("batch")
+def award_batch(
+    tender_ids: Optional[List[int]] = typer.Option(None, "--tender-id", "-t", help="Tender to analyze (repeatable)"),
+    status: Optional[str] = typer.Option(None, "--status", help="Analyze every tender with this status (e.g. Closed)"),
+    concurrency: Optional[int] = typer.Option(None, "--concurrency", "-c", help="Max parallel LLM justification calls"),
+):
+    """Run Compare & Award for many tenders in one batch."""
+    async def run():
+        from app.db.session import init_db, close_db
+        from app.db.tenders_repo import tenders_repo
+        from app.services.award_batch import run_batch_analysis
+
+        await init_db()
+        try:
+            ids = list(tender_ids or [])
+            if not ids:
+                ids = await tenders_repo.list_tender_ids(status=status)
+            if not ids:
+                console.print("[yellow]No tenders selected[/yellow]")
+                return
+
+            console.print(f"Analyzing {len(ids)} tenders...")
+            with Progress() as progress:
+                task = progress.add_task("Awarding...", total=len(ids))
+
+                def on_progress(done, total, result):
+                    progress.update(task, completed=done)
+                    if result.status == "failed":
+                        progress.console.print(f"[yellow]⚠ Tender {result.tender_id} failed: {result.error}[/yellow]")
+
+                summary = await run_batch_analysis(ids, max_concurrency=concurrency, on_progress=on_progress)
+
+            table = Table(title="Batch Award Summary")
+            table.add_column("Tender", style="cyan")
+            table.add_column("Status")
+            table.add_column("Winner")
+            table.add_column("Score", justify="right")
+            for r in summary.results:
+                winner = r.decision.rankings[0]["supplier"] if r.decision else (r.error or "")
+                score = f"{r.decision.score:.1f}" if r.decision else "-"
+                table.add_row(str(r.tender_id), r.status, winner, score)
+            console.print(table)
+            console.print(
+                f"[green]✓ {summary.awarded} awarded[/green], {summary.skipped} skipped, "
+                f"{summary.failed} failed, {summary.persisted} persisted in {summary.duration_ms / 1000:.1f}s"
+            )
+        finally:
+            await close_db()
+
+    asyncio.run(run())
+
+
+# =============================================================================
+# Price Store Commands
+# =============================================================================
+
+prices_app = typer.Typer(help="Market price store utilities")
+app.add_typer(prices_app, name="prices")
+
+@prices_app.command("backfill")
+def prices_backfill(
+    days: int = typer.Option(730, "--days", help="Days of history to store per series"),
+    store_dir: Optional[str] = typer.Option(None, "--dir", help="Store directory (default: PRICE_STORE_DIR)"),
+):
+    """Generate and store daily history for every material/region pair."""
+    from app.services.market_data import ist_today
+    from app.services.price_data_source import SimulatedDataSource, window_dates
+    from app.services.price_store import PriceStore
+
+    root = store_dir or settings.PRICE_STORE_DIR
+    if not root:
+        console.print("[red]✗ No store directory: pass --dir or set PRICE_STORE_DIR[/red]")
+        raise typer.Exit(1)
+
+    store = PriceStore(root)
+    source = SimulatedDataSource()
+    as_of = ist_today()
+    pairs = [(m, r) for m in source.BASE_CONFIG for r in source.REGION_MULTIPLIERS]
+    with Progress() as progress:
+        task = progress.add_task("Backfilling...", total=len(pairs))
+        for material, region in pairs:
+            store.write(material, region, source.get_prices(material, region, window_dates(days, as_of)))
+            progress.advance(task)
+    console.print(f"[green]✓ Stored {days} days for {len(pairs)} series in {root}[/green]")
+
+
+@prices_app.command("forecast")
+def prices_forecast(
+    concurrency: Optional[int] = typer.Option(None, "--concurrency", "-c", help="Max parallel LLM commentary calls"),
+):
+    """Precompute and store forecasts for every material/region pair (the nightly job)."""
+    async def run():
+        from app.db.session import init_db, close_db
+        from app.services.price_forecast import price_forecast_service
+
+        await init_db()
+        try:
+            with console.status("Forecasting..."):
+                forecasts = await price_forecast_service.precompute(max_concurrency=concurrency)
+
+            table = Table(title=f"Price Forecasts ({forecasts[0].as_of if forecasts else '-'})")
+            table.add_column("Material", style="cyan")
+            table.add_column("Region")
+            table.add_column("Current", justify="right")
+            table.add_column("30d", justify="right")
+            table.add_column("Trend")
+            table.add_column("Confidence", justify="right")
+            for f in forecasts:
+                table.add_row(
+                    f.material.value, f.region.value, f"{f.current_price:,.2f}",
+                    f"{f.forecast_price_30d:,.2f}", f.trend_direction, f"{f.confidence_score:.0%}",
+                )
+            console.print(table)
+            console.print(f"[green]✓ Stored {len(forecasts)} forecasts[/green]")
+        finally:
+            await close_db()
+
+    asyncio.run(run())
+
+
+@prices_app.command("backtest")
+def prices_backtest(
+    start: str = typer.Option(..., "--start", help="First day of history (YYYY-MM-DD)"),
+    end: str = typer.Option(..., "--end", help="Last day of history (YYYY-MM-DD)"),
+    source_name: str = typer.Option("simulated", "--source", help="'simulated' or 'store'"),
+    store_dir: Optional[str] = typer.Option(None, "--dir", help="Store directory for --source store (default: PRICE_STORE_DIR)"),
+    stored_source: str = typer.Option("simulated", "--stored-source", help="Which stored source's series to replay"),
+    history_days: int = typer.Option(730, "--history", help="Days of history each forecast sees"),
+    step_days: int = typer.Option(7, "--step", help="Days between forecast origins"),
+    margin: float = typer.Option(12.0, "--margin", help="Target margin percent for the lock decision"),
+    premium: float = typer.Option(0.0, "--premium", help="Lock premium percent"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", help="Worker processes (default: CPU count)"),
+):
+    """Rolling-origin backtest of the forecast and lock/wait advice, fully offline."""
+    from datetime import date
+    from app.services.forecast_backtest import run_backtest
+    from app.services.price_data_source import SimulatedDataSource
+    from app.services.price_forecast import MaterialType, Region
+    from app.services.price_store import PriceStore, StoredDataSource
+
+    if source_name == "store":
+        root = store_dir or settings.PRICE_STORE_DIR
+        if not root:
+            console.print("[red]✗ No store directory: pass --dir or set PRICE_STORE_DIR[/red]")
+            raise typer.Exit(1)
+        source = StoredDataSource(PriceStore(root), stored_source)
+    elif source_name == "simulated":
+        source = SimulatedDataSource()
+    else:
+        console.print(f"[red]✗ Unknown source '{source_name}'[/red]")
+        raise typer.Exit(1)
+
+    pairs = [(m.value, r.value) for m in MaterialType for r in Region]
+    with console.status("Backtesting..."):
+        report = asyncio.run(run_backtest(
+            source, pairs, date.fromisoformat(start), date.fromisoformat(end),
+            history_days=history_days, step_days=step_days,
+            target_margin_percent=margin, lock_premium_percent=premium, workers=workers,
+        ))
+
+    table = Table(title=f"Backtest {report.start} → {report.end} ({report.origins} origins)")
+    table.add_column("Material", style="cyan")
+    table.add_column("Region")
+    table.add_column("MAPE", justify="right")
+    table.add_column("MAPE 30d", justify="right")
+    table.add_column("Coverage", justify="right")
+    table.add_column("Locks", justify="right")
+    table.add_column("Hit rate", justify="right")
+    table.add_column("Lock P&L", justify="right")
+    for s in report.by_series:
+        table.add_row(
+            s.material, s.region, f"{s.mape:.2%}", f"{s.mape_at_horizon:.2%}", f"{s.coverage:.0%}",
+            str(s.lock_decisions), "-" if s.lock_hit_rate is None else f"{s.lock_hit_rate:.0%}",
+            f"{s.pnl_percent:+.1f}%",
+        )
+    console.print(table)
+    console.print(
+        f"MAPE {report.mape:.2%} | {int(report.interval_level * 100)}% interval coverage {report.coverage:.0%} | "
+        f"{report.lock_decisions} locks, P&L {report.pnl_percent_per_decision:+.3f}% per decision "
+        f"in {report.duration_ms / 1000:.1f}s"
+    )
+
+
 # =============================================================================
 # Main
 # =============================================================================
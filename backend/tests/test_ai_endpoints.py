@@ -2,6 +2,8 @@
 Phase 8: Smoke tests for AI endpoints.
 Run with: pytest backend/tests/test_ai_endpoints.py -v
 """
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -65,3 +67,67 @@ def test_coordination_send_requires_auth():
         },
     )
     assert response.status_code == 401
+
+
+def test_score_only_ndjson_stream_pages_with_cursor():
+    """POST /api/v1/awards/score-only?format=ndjson streams compact rows and pages via cursor."""
+    from app.core.auth import get_current_user
+
+    body = {
+        "requirement_description": "Cement supply",
+        "bids": [
+            {"id": str(i), "supplier_name": f"S{i}", "price": 100 + i, "delivery_days": 5, "reputation_score": 5}
+            for i in range(5)
+        ],
+    }
+    app.dependency_overrides[get_current_user] = lambda: {"uid": "test"}
+    try:
+        first = client.post("/api/v1/awards/score-only?format=ndjson&top_k=4&limit=3", json=body)
+        assert first.status_code == 200
+        assert first.headers["content-type"].startswith("application/x-ndjson")
+        assert first.headers["x-total-count"] == "4"
+        rows = [json.loads(line) for line in first.text.splitlines()]
+        assert [r["id"] for r in rows] == ["0", "1", "2"]
+        assert "supplier_name" not in rows[0]
+
+        cursor = first.headers["x-next-cursor"]
+        second = client.post(f"/api/v1/awards/score-only?format=ndjson&top_k=4&limit=3&cursor={cursor}", json=body)
+        assert [json.loads(line)["rank"] for line in second.text.splitlines()] == [4]
+        assert "x-next-cursor" not in second.headers
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+def test_award_on_closed_tender_is_a_conflict(monkeypatch):
+    """POST /api/v1/bids/{id}/award returns 409 and records no award when the tender is already awarded."""
+    from app.core.exceptions import ConflictError
+    from app.db.suppliers_repo import suppliers_repo
+    from app.db.tenders_repo import tenders_repo
+
+    recorded = []
+
+    async def closed(tender_id, bid_id):
+        raise ConflictError("Tender is already closed")
+
+    async def record_award(name):
+        recorded.append(name)
+
+    monkeypatch.setattr(tenders_repo, "award_bid", closed)
+    monkeypatch.setattr(suppliers_repo, "record_award", record_award)
+    response = client.post("/api/v1/bids/1/award", json={"bid_id": 2})
+    assert response.status_code == 409
+    assert recorded == []
+
+
+def test_delivery_or_dispute_on_unawarded_bid_is_a_conflict(monkeypatch):
+    """Only awarded bids feed supplier performance; others get 409."""
+    from app.core.exceptions import ConflictError
+    from app.db.suppliers_repo import suppliers_repo
+
+    async def not_awarded(*args):
+        raise ConflictError("Bid was not awarded")
+
+    monkeypatch.setattr(suppliers_repo, "record_delivery", not_awarded)
+    monkeypatch.setattr(suppliers_repo, "record_dispute", not_awarded)
+    assert client.post("/api/v1/suppliers/deliveries", json={"bid_id": 3, "actual_delivery_days": 9}).status_code == 409
+    assert client.post("/api/v1/suppliers/disputes", json={"bid_id": 3}).status_code == 409
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app.services.market_data import MarketDataService, ist_today
+from app.services.price_data_source import APIDataSource
+
+
+class StubPriceAPI:
+    """Minimal local price provider: one row per day up to `latest`, with ETags."""
+
+    def __init__(self, latest: date, delay: float = 0.0):
+        self.latest = latest
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                _, _, material, region = url.path.split("/")
+                since = date.fromisoformat(parse_qs(url.query)["from"][0])
+                etag = f'"{material}-{region}-{since}-{stub.latest}"'
+                with stub._lock:
+                    stub.requests.append((material, region, str(since), self.headers.get("If-None-Match")))
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    time.sleep(stub.delay)
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.end_headers()
+                        return
+                    days = (stub.latest - since).days + 1
+                    rows = [
+                        {"date": str(since + timedelta(days=i)), "price": 100.0 + (since + timedelta(days=i)).toordinal() % 50}
+                        for i in range(max(days, 0))
+                    ]
+                    body = json.dumps({"unit": "INR/Ton", "prices": rows}).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_api():
+    with StubPriceAPI(latest=date(2025, 5, 10)) as stub:
+        yield stub
+
+
+def test_incremental_and_conditional_fetches(stub_api):
+    day = date(2025, 5, 10)
+
+    async def run():
+        source = APIDataSource(base_url=stub_api.url)
+        try:
+            first = await source.get_price_history("steel", "patna", 10, end_date=day)
+            assert len(first) == 10 and str(first.dates[-1]) == "2025-05-10"
+            assert stub_api.requests[-1][:3] == ("steel", "patna", "2025-05-01")
+
+            # Fully covered window: no request at all
+            await source.get_price_history("steel", "patna", 5, end_date=day)
+            assert len(stub_api.requests) == 1
+
+            # Next day not published yet: ask only for it, then revalidate -> 304
+            nxt = day + timedelta(days=1)
+            await source.get_price_history("steel", "patna", 10, end_date=nxt)
+            await source.get_price_history("steel", "patna", 10, end_date=nxt)
+            assert [r[2] for r in stub_api.requests[1:]] == ["2025-05-11", "2025-05-11"]
+            assert stub_api.requests[1][3] is None and stub_api.requests[2][3] is not None
+
+            # Provider publishes the day: same conditional request now returns the new row
+            stub_api.latest = nxt
+            series = await source.get_price_history("steel", "patna", 10, end_date=nxt)
+            assert len(series) == 10 and str(series.dates[-1]) == "2025-05-11"
+            assert series.unit == "INR/Ton" and series.source == "api"
+        finally:
+            await source.aclose()
+
+    asyncio.run(run())
+
+
+def test_fan_out_is_concurrent():
+    pairs = [(m, r) for m in ("steel", "cement") for r in ("patna", "indore", "lucknow")]
+
+    async def run(url):
+        service = MarketDataService()
+        service.source = APIDataSource(base_url=url)
+        try:
+            return await service.get_price_histories(pairs, days=30)
+        finally:
+            await service.aclose()
+
+    with StubPriceAPI(latest=ist_today(), delay=0.05) as stub:
+        results = asyncio.run(run(stub.url))
+
+    assert set(results) == set(pairs)
+    assert all(len(r["history"]) == 30 for r in results.values())
+    assert len(stub.requests) == len(pairs)
+    assert stub.max_in_flight > 1
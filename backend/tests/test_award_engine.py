@@ -0,0 +1,76 @@
+"""
+Scoring tests for the Compare & Award engine.
+Run with: pytest backend/tests/test_award_engine.py -v
+"""
+import pytest
+from pydantic import ValidationError
+
+from app.services.award_engine import award_engine, load_bid_table, Bid, AwardCriteria
+
+
+def _bids(prefix: str, rows):
+    return [
+        Bid(id=f"{prefix}{i}", supplier_name=f"{prefix}-S{i}", price=p, delivery_days=d, reputation_score=r)
+        for i, (p, d, r) in enumerate(rows)
+    ]
+
+
+def test_calculate_scores_ranks_by_weighted_total():
+    """Cheapest + fastest bid wins; scores are normalised 0-100."""
+    bids = _bids("a", [(120000, 2, 9.0), (100000, 10, 7.0), (100000, 2, 8.0)])
+    ranked = award_engine.calculate_scores(bids, AwardCriteria())
+
+    assert [r["bid"].id for r in ranked] == ["a2", "a1", "a0"]
+    top = ranked[0]["scores"]
+    assert top["price_score"] == 100.0
+    assert top["delivery_score"] == 100.0
+    assert top["reputation_score"] == 80.0
+    assert top["total"] == 96.0
+
+
+def test_score_tenders_matches_per_tender_scoring():
+    """Batch scoring normalises within each tender, never across tenders."""
+    criteria = AwardCriteria(weight_price=0.6, weight_delivery=0.2, weight_reputation=0.2)
+    groups = {
+        1: _bids("x", [(500, 5, 6.0), (450, 9, 8.5), (520, 3, 7.0)]),
+        2: _bids("y", [(90000, 14, 4.0), (95000, 7, 9.5)]),
+        3: [],
+    }
+
+    batched = award_engine.score_tenders(groups, criteria)
+
+    assert batched[3] == []
+    for tid in (1, 2):
+        single = award_engine.calculate_scores(groups[tid], criteria)
+        assert [r["bid"].id for r in batched[tid]] == [r["bid"].id for r in single]
+        assert [r["scores"] for r in batched[tid]] == [r["scores"] for r in single]
+
+
+def test_identical_bids_keep_submission_order():
+    """Ties fall back to input order (zero ranges must not divide by zero)."""
+    bids = _bids("t", [(100, 5, 5.0), (100, 5, 5.0)])
+    ranked = award_engine.calculate_scores(bids, AwardCriteria())
+    assert [r["bid"].id for r in ranked] == ["t0", "t1"]
+    assert ranked[0]["scores"]["price_score"] == 100.0
+
+
+def test_load_bid_table_fast_path_matches_pydantic():
+    """Raw JSON bids decoded into a BidTable score exactly like validated Bid models."""
+    raw = [
+        {"id": "1", "supplier_name": "A", "price": 100, "delivery_days": 10, "reputation_score": 8},
+        {"id": "2", "supplier_name": "B", "price": 110.5, "delivery_days": 4, "reputation_score": 9.5, "is_verified": True},
+        # Needs pydantic coercion -> whole payload takes the fallback path
+    ]
+    coerced = raw + [{"id": "3", "supplier_name": "C", "price": "95", "delivery_days": 12.0, "reputation_score": 6}]
+
+    for items in (raw, coerced):
+        table = load_bid_table(items)
+        scored = award_engine.score_table(table, AwardCriteria())
+        expected = award_engine.calculate_scores([Bid(**b) for b in items], AwardCriteria())
+        assert [r["scores"] for r in scored.iter_rows()] == [r["scores"] for r in expected]
+        assert scored.rankings()[0]["supplier"] == expected[0]["bid"].supplier_name
+
+
+def test_load_bid_table_rejects_invalid_bids():
+    with pytest.raises(ValidationError):
+        load_bid_table([{"id": "1", "supplier_name": "A", "price": 100, "delivery_days": 10, "reputation_score": 11}])
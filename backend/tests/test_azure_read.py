@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import httpx
+
+from app.services.ocr_engines import AzureVisionOCR
+
+ENDPOINT = "https://stub.cognitiveservices.test"
+
+
+class ReadStub:
+    """Local stand-in for the Read API: each image needs `polls[image]` polls
+    before it succeeds; running responses carry Retry-After when set."""
+
+    def __init__(self, polls, retry_after=None, throttle_submits=0):
+        self.polls = polls
+        self.retry_after = retry_after
+        self.throttle_submits = throttle_submits
+        self.seen = {}
+        self.poll_times = {}
+        self.submitted_at = {}
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        assert request.headers["Ocp-Apim-Subscription-Key"] == "key"
+        if request.method == "POST":
+            if self.throttle_submits:
+                self.throttle_submits -= 1
+                return httpx.Response(429, headers={"Retry-After": "0.01"})
+            image = request.content.decode()
+            self.submitted_at[image] = time.monotonic()
+            return httpx.Response(202, headers={"Operation-Location": f"{ENDPOINT}/vision/v3.2/read/analyzeResults/{image}"})
+
+        image = request.url.path.rsplit("/", 1)[-1]
+        self.poll_times.setdefault(image, []).append(time.monotonic())
+        self.seen[image] = self.seen.get(image, 0) + 1
+        if image == "broken":
+            return httpx.Response(200, json={"status": "failed"})
+        if self.seen[image] < self.polls[image]:
+            headers = {"Retry-After": self.retry_after} if self.retry_after else {}
+            return httpx.Response(200, json={"status": "running"}, headers=headers)
+        words = [{"text": image, "confidence": 0.9}]
+        return httpx.Response(200, json={
+            "status": "succeeded",
+            "analyzeResult": {"readResults": [{"lines": [{"text": image, "boundingBox": [0] * 8, "words": words}]}]},
+        })
+
+
+def _ocr(stub: ReadStub) -> AzureVisionOCR:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(stub.handler))
+    ocr = AzureVisionOCR(client=client, endpoint=ENDPOINT, key="key")
+    ocr.INITIAL_POLL_S, ocr.MAX_POLL_S = 0.01, 0.04
+    return ocr
+
+
+def test_small_image_is_polled_early_and_backs_off():
+    stub = ReadStub({"receipt": 4})
+    result = asyncio.run(_ocr(stub).extract_text(b"receipt"))
+
+    assert result["text"] == "receipt" and result["provider"] == "azure_vision"
+    times = [stub.submitted_at["receipt"]] + stub.poll_times["receipt"]
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert gaps[0] < 0.5  # no fixed one-second first wait
+    assert gaps[-1] >= gaps[0]
+
+
+def test_retry_after_is_honoured_and_throttled_submits_retry():
+    stub = ReadStub({"invoice": 3}, retry_after="0.05", throttle_submits=2)
+    asyncio.run(_ocr(stub).extract_text(b"invoice"))
+    polls = stub.poll_times["invoice"]
+    assert all(b - a >= 0.045 for a, b in zip(polls, polls[1:]))
+
+
+def test_batch_submits_together_and_reports_failures_per_image():
+    stub = ReadStub({"a": 1, "b": 3, "c": 5, "broken": 1})
+    results = asyncio.run(_ocr(stub).extract_batch([b"a", b"b", b"c", b"broken"]))
+
+    assert [r["text"] for r in results[:3]] == ["a", "b", "c"]
+    assert isinstance(results[3], Exception)
+    assert max(stub.submitted_at.values()) < min(t[0] for t in stub.poll_times.values())
+
+
+def test_unreadable_poll_body_fails_only_that_image():
+    stub = ReadStub({"a": 1, "garbled": 1})
+    handler = stub.handler
+
+    def garbling(request: httpx.Request) -> httpx.Response:
+        if request.method == "GET" and request.url.path.endswith("/garbled"):
+            return httpx.Response(200, content=b"<html>gateway</html>")
+        return handler(request)
+
+    stub.handler = garbling
+    results = asyncio.run(_ocr(stub).extract_batch([b"a", b"garbled"]))
+    assert results[0]["text"] == "a"
+    assert isinstance(results[1], Exception)
@@ -0,0 +1,73 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services import boq_pricing
+from app.services.boq_pricing import BOQRequest, comonotonic_exceedance, price_boq
+from app.services.forecast_engine import normal_cdf
+
+
+def test_boq_is_priced_in_one_pass_with_one_llm_call(monkeypatch):
+    prompts = []
+
+    async def fake_llm(messages, temperature=0.2):
+        prompts.append(messages[0]["content"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Lock steel."))])
+
+    monkeypatch.setattr(boq_pricing.groq_service, "price_forecast", fake_llm)
+
+    lines = [
+        {"material": m, "region": r, "quantity": q}
+        for (m, q) in (("steel", 40), ("cement", 2500), ("sand", 900), ("tiles", 12000))
+        for r in ("patna", "indore", "delhi_ncr")
+    ]
+    result = asyncio.run(price_boq(BOQRequest(lines=lines, target_margin_percent=8)))
+
+    assert len(prompts) == 1 and result.ai_analysis == "Lock steel."
+    assert len(result.lines) == len(lines)
+    assert abs(result.total_current_cost - sum(line.current_cost for line in result.lines)) < 0.1
+    assert result.total_forecast_cost_lower_30d < result.total_forecast_cost_30d < result.total_forecast_cost_upper_30d
+    for line in result.lines:
+        assert line.current_cost == round(line.quantity * line.current_price, 2)
+        assert line.forecast_cost_lower_30d <= line.forecast_cost_30d <= line.forecast_cost_upper_30d
+        assert line.unit.startswith("INR/")
+    assert 0.0 <= result.margin_breach_probability <= 1.0
+
+    asyncio.run(price_boq(BOQRequest(lines=lines, include_analysis=False)))
+    assert len(prompts) == 1
+
+
+def test_single_line_exceedance_is_the_normal_tail():
+    qty, log_mean, log_sd = np.array([3.0]), np.array([np.log(100.0)]), np.array([0.05])
+    p = comonotonic_exceedance(qty, log_mean, log_sd, 3 * 105.0)
+    assert abs(p - (1 - normal_cdf(np.log(1.05) / 0.05))) < 1e-3
+    # Doubling every line doubles the total: same probability for a doubled threshold
+    both = comonotonic_exceedance(np.r_[qty, qty], np.r_[log_mean, log_mean], np.r_[log_sd, log_sd], 6 * 105.0)
+    assert abs(both - p) < 1e-3
+
+
+def test_boq_lock_matches_forecast_analyze(monkeypatch):
+    from app.services.price_forecast import ForecastRequest, price_forecast_service
+
+    async def fake_llm(messages, temperature=0.2):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="-"))])
+
+    monkeypatch.setattr(boq_pricing.groq_service, "price_forecast", fake_llm)
+
+    async def run():
+        pairs = [(m, r) for m in ("steel", "cement", "sand") for r in ("patna", "delhi_ncr")]
+        boq = await price_boq(BOQRequest(
+            lines=[{"material": m, "region": r, "quantity": 50} for m, r in pairs],
+            target_margin_percent=3, include_analysis=False,
+        ))
+        assert boq.as_of == str(price_forecast_service.fitted_as_of)
+        for line in boq.lines:
+            forecast = await price_forecast_service.build_forecast(line.material, line.region)
+            analyzed = price_forecast_service.apply_request(forecast, ForecastRequest(
+                material=line.material, region=line.region, quantity=line.quantity, target_margin_percent=3,
+            ))
+            assert line.lock_rate_recommendation == analyzed.lock_rate_recommendation
+            assert line.margin_breach_probability == round(analyzed.margin_breach_probability, 4)
+
+    asyncio.run(run())
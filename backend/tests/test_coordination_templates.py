@@ -0,0 +1,86 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services import coordination_agent as agent_module
+from app.services.coordination_agent import CoordinationAgent, NotificationRequest
+
+TEMPLATE = "🏗️ {contractor_name} ji, *{project_name}* ka bid aapka! Amount *{amount}*, start *{start_date}*. 'YES' bhejiye."
+
+
+def _patch(monkeypatch, template_reply):
+    calls, store = [], {}
+
+    async def fake_llm(messages, temperature=0.4):
+        content = messages[-1]["content"]
+        calls.append(content)
+        await asyncio.sleep(0.01)
+        reply = template_reply if "TEMPLATE RULES" in content else "free-form"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+    async def get_template(step, language, version):
+        return store.get((step, language, version))
+
+    async def save_template(step, language, version, template):
+        store[(step, language, version)] = template
+
+    monkeypatch.setattr(agent_module.groq_service, "coordinate", fake_llm)
+    monkeypatch.setattr(agent_module.templates_repo, "get_template", get_template)
+    monkeypatch.setattr(agent_module.templates_repo, "save_template", save_template)
+    return calls, store
+
+
+def _award(name, amount):
+    return NotificationRequest(
+        contractor_name=name, phone_number="+91", language="hinglish", step="award_notification",
+        project_name="Tower A", details={"amount": amount, "start_date": "1 Dec"},
+    )
+
+
+def test_template_is_translated_once_and_filled_locally(monkeypatch):
+    calls, store = _patch(monkeypatch, TEMPLATE)
+
+    async def run():
+        agent = CoordinationAgent()
+        results = await asyncio.gather(*(
+            agent.generate_notification(_award(f"Ramesh {i}", f"₹{i},00,000")) for i in range(10)
+        ))
+        assert len(calls) == 1 and len(store) == 1
+        assert results[3].translated_message == (
+            "🏗️ Ramesh 3 ji, *Tower A* ka bid aapka! Amount *₹3,00,000*, start *1 Dec*. 'YES' bhejiye."
+        )
+
+        # Another process picks up the persisted template; braces in values aren't re-filled
+        other = await CoordinationAgent().generate_notification(_award("Suresh {amount}", "₹1"))
+        assert len(calls) == 1 and other.translated_message.startswith("🏗️ Suresh {amount} ji")
+
+        # Free-form steps still go to the LLM every time
+        defect = NotificationRequest(
+            contractor_name="Ramesh", phone_number="+91", language="hindi", step="defect_notice",
+            project_name="Tower A", details={"issue": "honeycombing in column C4"},
+        )
+        assert (await agent.generate_notification(defect)).translated_message == "free-form"
+        assert len(calls) == 2
+
+    asyncio.run(run())
+
+
+def test_template_that_drops_a_placeholder_falls_back_to_llm(monkeypatch):
+    calls, store = _patch(monkeypatch, "🏗️ {contractor_name} ji, bid aapka! Amount *{amount}*.")
+
+    async def run():
+        agent = CoordinationAgent()
+        result = await agent.generate_notification(_award("Ramesh", "₹5,00,000"))
+        assert result.translated_message == "free-form"
+        assert not store and len(calls) == 2
+        assert "Ramesh" in calls[-1] and "₹5,00,000" in calls[-1]
+
+        # The failure is remembered: later messages make only their own call
+        await agent.generate_notification(_award("Suresh", "₹1,00,000"))
+        assert len(calls) == 3 and "Suresh" in calls[-1]
+
+        # Once the retry window has passed the translation is tried again
+        agent._template_failures = {key: t - agent.TEMPLATE_RETRY_S for key, t in agent._template_failures.items()}
+        await agent.generate_notification(_award("Mahesh", "₹2,00,000"))
+        assert len(calls) == 5
+
+    asyncio.run(run())
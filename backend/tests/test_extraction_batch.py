@@ -0,0 +1,61 @@
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+from app.services import extraction_agent as agent_module
+from app.services import extraction_batch as batch_module
+from app.services import extraction_cache as cache_module
+from app.services.extraction_batch import BatchDocument, pack_documents, run_batch_extraction
+from app.services.extraction_cache import ExtractionCache
+
+
+def _receipt(n: int) -> str:
+    return f"CASH MEMO\nHardware Store {n}\nBinding wire  {n} kg  {90 * n}\nTotal Rs. {90 * n}"
+
+
+def test_pack_documents_respects_count_and_size():
+    assert pack_documents([100] * 5, max_docs=2, max_chars=1000) == [[0, 1], [2, 3], [4]]
+    assert pack_documents([600, 600, 100], max_docs=8, max_chars=1000) == [[0], [1, 2]]
+
+
+def test_packed_call_splits_results_and_falls_back_per_document(monkeypatch):
+    prompts = []
+
+    async def fake_extract(messages, **kwargs):
+        prompt = messages[-1]["content"]
+        prompts.append(prompt)
+        docs = re.findall(r"### DOCUMENT (d\d+)\nCASH MEMO\nHardware Store (\d+)", prompt)
+        if not docs:  # single-document call
+            n = int(re.search(r"Hardware Store (\d+)", prompt).group(1))
+            body = {"document_type": "RECEIPT", "vendor_name": f"Hardware Store {n}", "line_items": []}
+        else:
+            # Store 3's entry is missing and store 4's is invalid; both are retried alone
+            body = {"documents": {
+                key: {"document_type": "RECEIPT", "vendor_name": f"Hardware Store {n}", "line_items": []}
+                for key, n in docs if n not in ("3", "4")
+            }}
+            body["documents"].update({key: {"line_items": "none"} for key, n in docs if n == "4"})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(body)))])
+
+    async def no_store(*args):
+        return None
+
+    monkeypatch.setattr(agent_module.groq_service, "extract", fake_extract)
+    monkeypatch.setattr(cache_module.extractions_repo, "get_result", no_store)
+    monkeypatch.setattr(cache_module.extractions_repo, "save_result", no_store)
+    monkeypatch.setattr(batch_module.extraction_agent, "cache", ExtractionCache(100))
+
+    documents = [BatchDocument(ocr_text=_receipt(n), document_id=f"doc-{n}") for n in range(1, 7)]
+    documents.append(BatchDocument(ocr_text=_receipt(1) + "\n\n"))  # duplicate of the first
+    summary = asyncio.run(run_batch_extraction(documents))
+
+    assert summary.ok == 7 and summary.failed == 0
+    assert [item.index for item in summary.results] == list(range(7))
+    assert [item.result.vendor_name for item in summary.results] == [f"Hardware Store {n}" for n in (1, 2, 3, 4, 5, 6, 1)]
+    assert [item.via for item in summary.results] == ["batch", "batch", "single", "single", "batch", "batch", "batch"]
+    assert summary.results[0].document_id == "doc-1" and summary.results[6].document_id is None
+    assert len(prompts) == 3  # one packed call for six distinct documents, two single retries
+
+    again = asyncio.run(run_batch_extraction(documents[:2]))
+    assert again.cached == 2 and len(prompts) == 3
@@ -0,0 +1,68 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.services import extraction_agent as agent_module
+from app.services import extraction_cache as cache_module
+from app.services.extraction_agent import ExtractionAgent
+from app.services.extraction_cache import ocr_text_key
+
+TEXT = "TAX INVOICE\nShree Ganesh Steel Traders\nTMT Bar 12mm  5 MT  52,000  2,60,000\nGrand Total: Rs. 2,60,000/-"
+
+
+def _patch(monkeypatch, reply):
+    calls, store = [], {}
+
+    async def fake_extract(messages, **kwargs):
+        calls.append(messages)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+    async def get_result(text_hash, version):
+        return store.get((text_hash, version))
+
+    async def save_result(text_hash, version, payload):
+        store[(text_hash, version)] = json.loads(json.dumps(payload))
+
+    monkeypatch.setattr(agent_module.groq_service, "extract", fake_extract)
+    monkeypatch.setattr(cache_module.extractions_repo, "get_result", get_result)
+    monkeypatch.setattr(cache_module.extractions_repo, "save_result", save_result)
+    return calls, store
+
+
+def test_key_ignores_layout_noise():
+    noisy = "  TAX INVOICE \r\n\n-----\nShree Ganesh   Steel Traders\nTMT Bar 12mm 5 MT 52,000 2,60,000\nGrand Total: Rs. 2,60,000/-\n"
+    assert ocr_text_key(noisy) == ocr_text_key(TEXT)
+    assert ocr_text_key(TEXT.replace("5 MT", "6 MT")) != ocr_text_key(TEXT)
+
+
+def test_repeat_extractions_are_served_from_cache(monkeypatch):
+    body = {"document_type": "INVOICE", "vendor_name": "Shree Ganesh Steel Traders", "total_amount": 260000,
+            "line_items": [{"description": "TMT Bar 12mm", "quantity": 5}]}
+    calls, store = _patch(monkeypatch, json.dumps(body))
+    agent = ExtractionAgent()
+
+    async def run():
+        # Concurrent duplicates share one model call
+        first = await asyncio.gather(*(agent.extract_invoice_data(TEXT) for _ in range(3)))
+        again = await agent.extract_invoice_data(TEXT + "\n\n")
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert len(calls) == 1 and len(store) == 1
+    assert again.cached and again.vendor_name == "Shree Ganesh Steel Traders" and len(again.line_items) == 1
+
+    # A fresh process finds the result in Postgres
+    restarted = asyncio.run(ExtractionAgent().extract_invoice_data(TEXT))
+    assert restarted.cached and len(calls) == 1
+
+    # A prompt change is a new version
+    monkeypatch.setattr(ExtractionAgent, "SYSTEM_PROMPT", ExtractionAgent.SYSTEM_PROMPT + " Be terse.")
+    assert not asyncio.run(agent.extract_invoice_data(TEXT)).cached and len(calls) == 2
+
+
+def test_fallback_results_are_not_cached(monkeypatch):
+    calls, store = _patch(monkeypatch, "not json")
+    agent = ExtractionAgent()
+    asyncio.run(agent.extract_invoice_data(TEXT))
+    result = asyncio.run(agent.extract_invoice_data(TEXT))
+    assert len(calls) == 2 and not store and not result.cached
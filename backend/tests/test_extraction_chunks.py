@@ -0,0 +1,73 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.services import extraction_agent as agent_module
+from app.services.extraction_agent import ExtractionAgent
+from app.services.extraction_chunks import merge_chunk_results, split_chunks, split_pages
+
+HEADER = "Description  Qty  Unit  Rate  Amount"
+
+
+def _page(n: int, rows: int) -> str:
+    lines = [f"Shree Ganesh Steel Traders  Page {n} of 3" if n > 1 else "TAX INVOICE", HEADER]
+    lines += [f"Cement OPC 53 batch {n}-{i}  {i + 1}  bag  380  {380 * (i + 1)}" for i in range(rows)]
+    return "\n".join(lines)
+
+
+def test_split_pages_on_form_feeds_and_page_lines():
+    assert split_pages("a\fb\n\fc") == ["a", "b\n", "c"]
+    assert split_pages("head\nPage 1 of 2\nrow 1\n-- Page 2 of 2 --\nrow 2") == ["head", "row 1", "row 2"]
+
+
+def test_split_chunks_packs_pages_and_repeats_table_header():
+    text = "\f".join(_page(n, 3) for n in (1, 2, 3))
+    assert split_chunks(text, 10_000) == [text.replace("\f", "\n")]
+
+    chunks = split_chunks(_page(1, 200), 1500)
+    assert len(chunks) > 1 and all(len(c) <= 1500 for c in chunks)
+    assert all(HEADER in c for c in chunks)
+    rows = [l for c in chunks for l in c.split("\n") if l.startswith("Cement")]
+    assert len(rows) == 200  # every row exactly once
+
+
+def test_merge_is_deterministic_and_dedupes_only_across_boundaries():
+    row = {"description": "TMT Bar 12mm", "quantity": 5, "unit_price": 52000, "total_price": 260000}
+    merged = merge_chunk_results([
+        {"document_type": "INVOICE", "vendor_name": "Shree Ganesh", "gstin": "27AAPFU0939F1ZV",
+         "total_amount": None, "line_items": [row, row]},
+        None,  # failed chunk
+        {"document_type": "UNKNOWN", "vendor_name": "Other", "total_amount": 613600,
+         "line_items": [{"description": "Brought Forward", "total_price": 520000}, row,
+                        {"description": "Sand", "quantity": 2, "total_price": 4000}]},
+    ])
+    assert merged["vendor_name"] == "Shree Ganesh" and merged["document_type"] == "INVOICE"
+    assert merged["total_amount"] == 613600
+    assert [i["description"] for i in merged["line_items"]] == ["TMT Bar 12mm", "TMT Bar 12mm", "Sand"]
+
+
+def test_agent_extracts_chunks_in_parallel(monkeypatch):
+    monkeypatch.setattr(agent_module.settings, "EXTRACTION_CHUNK_CHARS", 1500)
+    active, peak, prompts = 0, 0, []
+
+    async def fake_extract(messages, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        prompt = messages[-1]["content"]
+        prompts.append(prompt)
+        items = [{"description": l.split("  ")[0], "quantity": 1} for l in prompt.split("\n") if l.startswith("Cement")]
+        body = {"document_type": "INVOICE", "line_items": items}
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(body)))])
+
+    monkeypatch.setattr(agent_module.groq_service, "extract", fake_extract)
+    text = "\f".join(_page(n, 30) for n in (1, 2, 3)) + "\nGrand Total: Rs. 1,00,000/-"
+    result = asyncio.run(ExtractionAgent().extract_invoice_data(text))
+
+    assert len(prompts) == len(result.chunks) > 1 and peak > 1
+    assert "part 1 of" in prompts[0] and all("total_amount: 100000.00" in p for p in prompts)
+    assert [m.index for m in result.chunks] == list(range(len(prompts)))
+    assert all(m.status == "ok" and m.duration_ms >= 0 for m in result.chunks)
+    assert len(result.line_items) == 90 and result.total_amount == 100000.0
@@ -0,0 +1,46 @@
+import asyncio
+from datetime import date
+
+from app.services.forecast_backtest import run_backtest
+from app.services.price_data_source import SimulatedDataSource
+from app.services.price_store import PriceStore, StoredDataSource
+
+PAIRS = [("steel", "patna"), ("cement", "indore"), ("sand", "lucknow")]
+WINDOW = dict(start=date(2023, 1, 1), end=date(2024, 6, 30), history_days=400, horizon=30, step_days=30)
+
+
+def test_parallel_backtest_matches_serial_and_scores_sanely():
+    source = SimulatedDataSource()
+    serial = asyncio.run(run_backtest(source, PAIRS, workers=1, **WINDOW))
+    parallel = asyncio.run(run_backtest(source, PAIRS, workers=2, **WINDOW))
+
+    assert serial.origins == 4 and serial.series == 3
+    assert serial.model_dump(exclude={"duration_ms"}) == parallel.model_dump(exclude={"duration_ms"})
+    assert 0 < serial.mape < 0.1
+    assert 0.5 < serial.coverage <= 1.0
+    assert sorted(serial.mape_by_horizon) == [1, 7, 14, 30]
+    assert serial.lock_decisions == sum(s.lock_decisions for s in serial.by_series)
+
+
+def test_backtest_runs_offline_from_the_price_store(tmp_path):
+    simulated = SimulatedDataSource()
+    store = PriceStore(str(tmp_path))
+    for material, region in PAIRS:
+        store.write(material, region, asyncio.run(simulated.get_price_history(material, region, 600, date(2024, 6, 30))))
+
+    stored = asyncio.run(run_backtest(StoredDataSource(store), PAIRS, workers=1, **WINDOW))
+    direct = asyncio.run(run_backtest(simulated, PAIRS, workers=1, **WINDOW))
+    assert stored.model_dump(exclude={"duration_ms"}) == direct.model_dump(exclude={"duration_ms"})
+
+
+def test_cli_prices_backtest_runs():
+    from typer.testing import CliRunner
+
+    from scripts.cli import app
+
+    result = CliRunner().invoke(app, [
+        "prices", "backtest", "--start", "2023-01-01", "--end", "2023-09-30",
+        "--history", "120", "--step", "60", "--workers", "1",
+    ])
+    assert result.exit_code == 0, result.output
+    assert "MAPE" in result.output and "steel" in result.output
@@ -0,0 +1,52 @@
+import numpy as np
+
+from app.services.forecast_engine import fit_forecast
+
+
+def _synthetic(n_days: int, slope: float, monsoon: float, noise: float, seed: int):
+    dates = np.arange(np.datetime64("2023-01-01"), np.datetime64("2023-01-01") + n_days)
+    month = dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    rng = np.random.default_rng(seed)
+    log_price = np.log(1000.0) + slope * np.arange(n_days) + np.where((month >= 6) & (month <= 9), np.log(monsoon), 0.0)
+    return dates, np.exp(log_price + rng.normal(0, noise, n_days))
+
+
+def test_batched_fit_tracks_trend_and_monsoon_seasonality():
+    dates, rising = _synthetic(790, 0.001, 0.93, 0.01, seed=1)
+    _, flat = _synthetic(790, 0.0, 1.0, 0.01, seed=2)
+    history = np.stack([rising[:760], flat[:760]])
+    future = np.stack([rising[760:], flat[760:]])
+
+    # History ends 2025-01-30: the next 30 days are outside the monsoon
+    forecast = fit_forecast(history, dates[:760], horizon=30, interval_level=0.9)
+
+    assert forecast.median.shape == (2, 30) and forecast.dates[0] == dates[760]
+    assert np.all(forecast.lower < forecast.median) and np.all(forecast.median < forecast.upper)
+    mape = np.abs(forecast.median - future) / future
+    assert mape.mean() < 0.03
+    coverage = ((future >= forecast.lower) & (future <= forecast.upper)).mean()
+    assert coverage > 0.75
+
+    # Interval widens with the horizon; the rising series is called up with confidence
+    assert np.all(np.diff(forecast.upper - forecast.lower, axis=1) >= 0)
+    assert forecast.median[0, -1] > forecast.last_price[0]
+    assert forecast.direction_confidence()[0] > 0.7
+
+
+def test_missing_days_are_skipped():
+    dates, prices = _synthetic(400, 0.0002, 0.95, 0.01, seed=3)
+    gappy = prices.copy()
+    gappy[100:130] = np.nan
+    gappy[-3:] = np.nan
+
+    forecast = fit_forecast(gappy[None, :], dates, horizon=7)
+    assert np.all(np.isfinite(forecast.median))
+    assert forecast.last_price[0] == prices[-4]
+
+
+def test_forecast_into_monsoon_dips():
+    dates, prices = _synthetic(870, 0.0, 0.93, 0.01, seed=4)
+    # History ends 2025-05-19; the horizon crosses into June
+    forecast = fit_forecast(prices[None, :], dates, horizon=30)
+    june = forecast.dates.astype("datetime64[M]") == np.datetime64("2025-06")
+    assert forecast.median[0, june].mean() < 0.96 * forecast.median[0, ~june].mean()
@@ -0,0 +1,36 @@
+import io
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.services.image_dedup import content_hash
+
+
+def _printed_receipt(total: str) -> Image.Image:
+    font = ImageFont.load_default(size=36)
+    image = Image.new("RGB", (1200, 1600), (240, 238, 230))
+    draw = ImageDraw.Draw(image)
+    for row, (item, amount) in enumerate([("Cement OPC 53", "3,800"), ("Sand per truck", "4,500"), ("TMT 12mm", "52,000")]):
+        draw.text((80, 260 + row * 70), item, fill=(20, 20, 20), font=font)
+        draw.text((900, 260 + row * 70), amount, fill=(20, 20, 20), font=font)
+    draw.text((80, 600), "TOTAL", fill=(20, 20, 20), font=font)
+    draw.text((900, 600), total, fill=(20, 20, 20), font=font)
+    return image
+
+
+def _encode(image: Image.Image, fmt: str, **options) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **options)
+    return buffer.getvalue()
+
+
+def test_only_pixel_identical_images_share_a_content_hash():
+    original = _encode(_printed_receipt("60,300"), "JPEG", quality=90)
+
+    # Re-uploaded, or re-saved losslessly in another format: same pixels
+    assert content_hash(original) == content_hash(original)
+    assert content_hash(_encode(Image.open(io.BytesIO(original)), "PNG")) == content_hash(original)
+
+    # Same template with a different total is a different document
+    assert content_hash(_encode(_printed_receipt("61,300"), "JPEG", quality=90)) != content_hash(original)
+    # Recompressed forwards are out of scope and get OCRed again
+    assert content_hash(_encode(Image.open(io.BytesIO(original)), "JPEG", quality=40)) != content_hash(original)
@@ -0,0 +1,73 @@
+import asyncio
+import io
+import random
+
+from PIL import Image, ImageDraw
+
+from app.services.image_preprocess import A4_LONG_INCHES, ocr_with_preprocessing, otsu_threshold, preprocess_image
+
+
+def _phone_photo() -> bytes:
+    """Landscape-stored 12 MP JPEG of a page with 'text', EXIF says rotate 90° clockwise to view."""
+    rng = random.Random(7)
+    image = Image.new("RGB", (4000, 3000), (60, 50, 40))  # table top around the page
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((500, 300, 3500, 2700), fill=(235, 232, 225))
+    for row in range(20):
+        y = 400 + row * 110
+        x = 600
+        while x < 3300:
+            width = rng.randint(40, 160)
+            draw.rectangle((x, y, x + width, y + 40), fill=(20, 20, 20))
+            x += width + 30
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=92, exif=exif)
+    return buffer.getvalue()
+
+
+def test_otsu_splits_ink_from_paper():
+    histogram = [0] * 256
+    histogram[30], histogram[220] = 100, 900
+    assert 30 <= otsu_threshold(histogram) < 220
+
+
+def test_preprocess_rotates_downscales_crops_and_binarises():
+    photo = _phone_photo()
+    prepared = preprocess_image(photo, dpi=200)
+
+    assert prepared.rotated and prepared.original_size == (4000, 3000)
+    width, height = prepared.output_size
+    assert height > width  # upright portrait page
+    assert max(prepared.output_size) <= round(A4_LONG_INCHES * 200)
+    assert prepared.bytes_saved > 0 and prepared.output_bytes < prepared.original_bytes / 4
+
+    image = Image.open(io.BytesIO(prepared.image))
+    assert image.mode == "1"
+
+
+def test_compare_mode_keeps_the_more_confident_result():
+    calls = []
+
+    async def fake_ocr(image: bytes) -> dict:
+        calls.append(image)
+        return {"text": "x", "confidence": 0.9 if image == b"original" else 0.7, "provider": "tesseract"}
+
+    async def fake_preprocess(image: bytes):
+        from app.services.image_preprocess import PreprocessedImage
+        return PreprocessedImage(image=b"small", original_bytes=8, output_bytes=5, original_size=(4, 2),
+                                 output_size=(2, 1), rotated=False, duration_ms=1.0)
+
+    plain = asyncio.run(ocr_with_preprocessing(b"original", fake_ocr, fake_preprocess))
+    assert calls == [b"small"] and plain["preprocess"]["bytes_saved"] == 3 and "ocr_ms" in plain["preprocess"]
+
+    compared = asyncio.run(ocr_with_preprocessing(b"original", fake_ocr, fake_preprocess, compare=True))
+    assert compared["confidence"] == 0.9 and compared["preprocess"]["used"] == "original"
+    assert compared["preprocess"]["compare"]["preprocessed"]["confidence"] == 0.7
+
+    async def broken(image: bytes):
+        raise OSError("cannot identify image file")
+
+    fallback = asyncio.run(ocr_with_preprocessing(b"original", fake_ocr, broken))
+    assert fallback["confidence"] == 0.9 and "preprocess" not in fallback
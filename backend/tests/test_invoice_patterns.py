@@ -0,0 +1,99 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.services import extraction_agent as agent_module
+from app.services.extraction_agent import ExtractionAgent
+from app.services.invoice_patterns import find_gstins, find_total, gstin_check_char, parse_amount, pre_extract, trim_ocr_text
+
+INVOICE = """TAX INVOICE
+Shree Ganesh Steel Traders
+GSTIN: 27AAPFU0939FIZV   PAN: AAPFU0939F
+Bill To: Sharma Builders GSTIN 29AAGCB7383J1Z4
+------------------------------
+TMT Bar 12mm  5 MT  52,000  2,60,000
+TMT Bar 12mm  5 MT  52,000  2,60,000
+Sub Total 5,20,000
+Total Tax 93,600
+Grand Total: Rs. 6,13,600/-
+Bank: HDFC  A/c No 1234567890  IFSC HDFC0001
+Terms & Conditions
+1. Goods once sold will not be taken back
+This is a computer generated invoice"""
+
+
+def test_gstin_checksum_and_ocr_repair():
+    assert gstin_check_char("27AAPFU0939F1Z") == "V"
+    # 'I' for '1' in the entity number is repaired; the supplier's GSTIN comes first
+    assert find_gstins(INVOICE) == ["27AAPFU0939F1ZV", "29AAGCB7383J1Z4"]
+    assert find_gstins("GST No. 27 AAPFU 0939 F1ZV") == ["27AAPFU0939F1ZV"]
+    assert find_gstins("ref 27AAPFU0939F1ZX") == []
+
+
+def test_amounts_and_totals():
+    assert parse_amount("₹1,23,456.50") == 123456.5
+    assert parse_amount("Rs. 2,50,000/-") == 250000.0
+    assert parse_amount("12.5 lakh") == 1250000.0
+    assert parse_amount("1.2 Cr") == 12000000.0
+    assert find_total(INVOICE) == (613600.0, 0.95)
+    assert find_total("Sub Total 500\nTotal 590") == (590.0, 0.6)
+    # Quantity and rate columns on the total line are not the total
+    assert find_total("Grand Total 150 Bags 1,18,000.00") == (118000.0, 0.95)
+    assert find_total("Grand Total 18% GST 1,18,000") == (118000.0, 0.95)
+    # Two unmarked amounts: the last is taken, but not with enough confidence to skip the model
+    assert find_total("Grand Total 150 118000") == (118000.0, 0.85)
+
+
+def test_prepass_and_trimming():
+    pre = pre_extract(INVOICE)
+    assert pre.gstin == "27AAPFU0939F1ZV" and pre.pan == "AAPFU0939F" and pre.pan_source == "text+gstin"
+    assert pre.document_type == "INVOICE" and pre.confident
+
+    trimmed = trim_ocr_text(INVOICE)
+    assert "IFSC" not in trimmed and "Goods once sold" not in trimmed and "-----" not in trimmed
+    assert trimmed.count("TMT Bar 12mm") == 2  # identical rows are real line items
+
+
+def test_agent_uses_hints_and_skips_model_when_confident(monkeypatch):
+    prompts = []
+
+    async def fake_extract(messages, **kwargs):
+        prompts.append(messages[-1]["content"])
+        body = {"document_type": "INVOICE", "vendor_name": "Shree Ganesh Steel Traders",
+                "gstin": "27AAPFU0939FIZV", "pan": None, "total_amount": 613600, "line_items": []}
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(body)))])
+
+    monkeypatch.setattr(agent_module.groq_service, "extract", fake_extract)
+    agent = ExtractionAgent()
+
+    result = asyncio.run(agent.extract_invoice_data(INVOICE))
+    assert "PRE-EXTRACTED" in prompts[0] and "Goods once sold" not in prompts[0]
+    assert result.gstin == "27AAPFU0939F1ZV" and result.pan == "AAPFU0939F" and result.verification_ready
+
+    quick = asyncio.run(agent.extract_invoice_data(INVOICE, verification_only=True))
+    assert len(prompts) == 1
+    assert quick.gstin == "27AAPFU0939F1ZV" and quick.total_amount == 613600.0 and quick.verification_ready
+
+
+def test_gstin_found_mid_line_and_after_uin_label():
+    assert find_gstins("GSTIN/UIN: 27AAPFU0939F1ZV") == ["27AAPFU0939F1ZV"]
+    assert find_gstins("Supplier 27AAPFU0939F1ZV") == ["27AAPFU0939F1ZV"]
+    assert find_gstins("Supplier 27 AAPFU 0939 F1ZV, Pune") == ["27AAPFU0939F1ZV"]
+
+
+def test_trimming_drops_repeated_letterhead_but_keeps_repeated_items():
+    page = "Shree Ganesh Steel Traders\nStation Road, Patna\nTAX INVOICE\nDescription  Qty  Rate  Amount\n"
+    text = (
+        page + "Sand / per truck\n2  4,500  9,000\nCement OPC 53\n100  380  38,000\n"
+        "\f" + page + "Sand / per truck\n1  4,500  4,500\nGrand Total: 51,500"
+    )
+    trimmed = trim_ocr_text(text)
+    assert trimmed.count("Shree Ganesh Steel Traders") == 1 and trimmed.count("Station Road") == 1
+    assert trimmed.count("Sand / per truck") == 2
+
+
+def test_terms_block_ends_at_the_page_break():
+    text = "TAX INVOICE\nTerms & Conditions\n1. Goods once sold\fSteel TMT 2 55000 110000\nGrand Total 119500"
+    trimmed = trim_ocr_text(text)
+    assert "Goods once sold" not in trimmed
+    assert "Steel TMT 2 55000 110000" in trimmed and "Grand Total 119500" in trimmed
@@ -0,0 +1,41 @@
+import time
+
+import numpy as np
+
+from app.services.forecast_engine import normal_cdf
+from app.services.lock_risk import innovation_matrix, lock_risk, simulate_log_paths
+
+
+def test_simulated_paths_match_model_variance():
+    alpha, beta, phi, sigma = 0.2, 0.02, 0.9, 0.01
+    paths = simulate_log_paths(np.zeros(30), sigma, alpha, beta, phi, simulations=100_000, rng=np.random.default_rng(0))
+
+    # ETS(A,Ad,N): var_h = sigma^2 (1 + sum_{j<h} c_j^2), the same formula fit_forecast uses
+    c = alpha + beta * np.cumsum(phi ** np.arange(1, 30))
+    expected_sd = sigma * np.sqrt(1.0 + np.r_[0.0, np.cumsum(c ** 2)])
+    assert paths.shape == (30, 100_000)
+    assert np.allclose(paths.std(axis=1), expected_sd, rtol=0.02)
+    assert np.allclose(innovation_matrix(alpha, beta, phi, 30).diagonal(), 1.0)
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def test_breach_probability_matches_analytic_and_is_fast():
+    log_mean = np.full(30, np.log(100.0))
+    kwargs = dict(current_price=100.0, quantity=5, target_margin_percent=4, log_mean_path=log_mean,
+                  sigma=0.01, alpha=0.2, beta=0.0, phi=0.98, simulations=100_000, seed=7)
+
+    risk = lock_risk(**kwargs)  # warm-up
+    # Best of a few runs, so a busy machine doesn't fail the 50 ms bound (about 30 ms measured)
+    elapsed = min(_timed(lambda: lock_risk(**kwargs)) for _ in range(3))
+
+    sd = 0.01 * np.sqrt(1.0 + 29 * 0.2 ** 2)
+    analytic = 1.0 - normal_cdf(np.log(1.04) / sd)
+    assert abs(risk.breach_probability - analytic) < 0.01
+    assert risk.price_percentiles["p50"] == 100.0
+    assert lock_risk(**kwargs) == risk
+    assert elapsed < 0.05
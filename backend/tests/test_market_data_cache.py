@@ -0,0 +1,64 @@
+import asyncio
+from datetime import date
+
+from app.services.market_data import MarketDataService, PriceSeriesCache
+from app.services.price_data_source import SimulatedDataSource
+
+
+class CountingSource(SimulatedDataSource):
+    def __init__(self, delay: float = 0.0):
+        self.calls = []
+        self.delay = delay
+
+    async def get_price_history(self, material, region, days=30, end_date=None):
+        self.calls.append(days)
+        await asyncio.sleep(self.delay)
+        return await super().get_price_history(material, region, days, end_date=end_date or date(2025, 1, 31))
+
+
+def test_shorter_window_is_sliced_from_longest_series():
+    service = MarketDataService()
+    service.source = CountingSource()
+
+    async def run():
+        month = await service.get_price_history("steel", "patna", days=30)
+        week = await service.get_price_history("steel", "patna", days=7)
+
+        assert service.source.calls == [30]
+        assert len(week["history"]) == 7
+        assert list(week["history"].prices) == list(month["history"].prices[-7:])
+        assert service.cache_stats()["hits"] == 1
+
+        # A longer window refetches once and replaces the stored series
+        await service.get_price_history("steel", "patna", days=90)
+        await service.get_price_history("steel", "patna", days=30)
+        assert service.source.calls == [30, 90]
+
+    asyncio.run(run())
+
+
+def test_lru_ttl_and_single_flight():
+    source = CountingSource()
+    fetch = lambda key: (lambda n: source.get_price_history(key, "patna", n))
+
+    async def run():
+        cache = PriceSeriesCache(max_entries=2, ttl_seconds=60, ttl_jitter=0)
+        for material in ("steel", "cement", "sand"):
+            await cache.get_or_fetch(material, 7, fetch(material))
+        assert cache.stats()["size"] == 2 and cache.stats()["evictions"] == 1
+
+        expired = PriceSeriesCache(max_entries=2, ttl_seconds=0, ttl_jitter=0)
+        await expired.get_or_fetch("steel", 7, fetch("steel"))
+        await expired.get_or_fetch("steel", 7, fetch("steel"))
+        assert expired.stats()["misses"] == 2 and expired.stats()["expirations"] == 1
+
+        slow = CountingSource(delay=0.05)
+        herd = PriceSeriesCache(max_entries=8, ttl_seconds=60)
+        await asyncio.gather(*(
+            herd.get_or_fetch("tiles", 30, lambda n: slow.get_price_history("tiles", "indore", n))
+            for _ in range(8)
+        ))
+        assert slow.calls == [30]
+        assert herd.stats()["hits"] == 7
+
+    asyncio.run(run())
@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services import coordination_agent as agent_module
+from app.services import notification_batch
+from app.services.coordination_agent import NotificationRequest
+from app.services.notification_batch import iter_notifications, run_bulk_notifications
+
+
+def _patch(monkeypatch):
+    stats = {"calls": 0, "in_flight": 0, "max_in_flight": 0}
+
+    async def fake_llm(messages, temperature=0.4):
+        stats["calls"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        await asyncio.sleep(0.02)
+        stats["in_flight"] -= 1
+        content = messages[-1]["content"]
+        reply = "Namaste {contractor_name}, {project_name} ka site ready hai." if "TEMPLATE RULES" in content else "free-form"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+    async def no_store(*args):
+        return None
+
+    monkeypatch.setattr(agent_module.groq_service, "coordinate", fake_llm)
+    monkeypatch.setattr(agent_module.templates_repo, "get_template", no_store)
+    monkeypatch.setattr(agent_module.templates_repo, "save_template", no_store)
+    # Fresh agent so no template is cached from other tests
+    monkeypatch.setattr(notification_batch, "coordination_agent", agent_module.CoordinationAgent())
+    return stats
+
+
+def _request(i, step, language="hinglish"):
+    return NotificationRequest(
+        contractor_name=f"Crew {i}", phone_number=f"+91{i:010d}", language=language, step=step,
+        project_name="Tower B", details={"issue": "curing"},
+    )
+
+
+def test_bulk_shares_templates_and_bounds_llm_calls(monkeypatch):
+    stats = _patch(monkeypatch)
+    requests = [_request(i, "site_ready", "hinglish" if i % 2 else "hindi") for i in range(40)]
+    requests += [_request(40 + i, "defect_notice") for i in range(6)]
+
+    progress = []
+    summary = asyncio.run(run_bulk_notifications(
+        requests, max_concurrency=3, on_progress=lambda done, total, item: progress.append(done)
+    ))
+
+    # 2 template translations + 6 free-form messages, never more than 3 in flight
+    assert stats["calls"] == 8 and stats["max_in_flight"] <= 3
+    assert summary.total == 46 and summary.ok == 46 and summary.llm_messages == 6
+    assert [item.index for item in summary.results] == list(range(46))
+    assert summary.results[7].result.translated_message == "Namaste Crew 7, Tower B ka site ready hai."
+    assert summary.results[45].via == "llm" and progress[-1] == 46
+
+
+def test_results_stream_in_completion_order(monkeypatch):
+    _patch(monkeypatch)
+    requests = [_request(0, "defect_notice"), _request(1, "site_ready")]
+
+    async def run():
+        return [item.index async for item in iter_notifications(requests, max_concurrency=1)]
+
+    # The template message is ready before the free-form LLM call finishes
+    assert asyncio.run(run()) == [1, 0]
+
+
+def test_failed_group_translation_is_not_retried_per_message(monkeypatch):
+    _patch(monkeypatch)
+    calls = []
+
+    async def broken_template(messages, temperature=0.4):
+        content = messages[-1]["content"]
+        calls.append("template" if "TEMPLATE RULES" in content else "message")
+        reply = "Namaste, site ready hai." if "TEMPLATE RULES" in content else "free-form"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+    monkeypatch.setattr(agent_module.groq_service, "coordinate", broken_template)
+    summary = asyncio.run(run_bulk_notifications([_request(i, "site_ready") for i in range(5)], max_concurrency=2))
+
+    assert calls.count("template") == 1 and calls.count("message") == 5
+    assert summary.ok == 5 and summary.llm_messages == 5
+    assert all(item.via == "llm" and item.result.translated_message == "free-form" for item in summary.results)
+
+
+def test_llm_errors_fail_the_item_instead_of_sending_a_placeholder(monkeypatch):
+    _patch(monkeypatch)
+
+    async def down(messages, temperature=0.4):
+        raise RuntimeError("groq unavailable")
+
+    monkeypatch.setattr(agent_module.groq_service, "coordinate", down)
+    summary = asyncio.run(run_bulk_notifications([_request(0, "defect_notice")], max_concurrency=1))
+
+    assert summary.ok == 0 and summary.failed == 1
+    assert summary.results[0].status == "failed" and summary.results[0].result is None
@@ -0,0 +1,24 @@
+from app.services.ocr_engines import lines_from_data
+
+
+def test_lines_text_and_confidence_from_one_data_pass():
+    # Two words on one line, one on the next, a new block, and a non-word box
+    data = {
+        "text": ["", "TAX", "INVOICE", "GSTIN", "", "Total"],
+        "conf": ["-1", "96", "90.5", 80, "-1", "70"],
+        "block_num": [1, 1, 1, 1, 2, 2],
+        "par_num": [1, 1, 1, 1, 1, 1],
+        "line_num": [1, 1, 1, 2, 1, 1],
+        "left": [0, 10, 60, 10, 0, 10],
+        "top": [0, 5, 6, 30, 0, 80],
+        "width": [0, 40, 70, 50, 0, 45],
+        "height": [0, 12, 11, 10, 0, 12],
+    }
+    result = lines_from_data(data)
+
+    assert result["text"] == "TAX INVOICE\nGSTIN\n\nTotal"
+    assert [line["text"] for line in result["lines"]] == ["TAX INVOICE", "GSTIN", "Total"]
+    assert result["lines"][0]["bounding_box"] == [10, 5, 130, 5, 130, 17, 10, 17]
+    assert abs(result["lines"][0]["confidence"] - 0.9325) < 1e-9
+    assert abs(result["confidence"] - (0.96 + 0.905 + 0.8 + 0.7) / 4) < 1e-9
+    assert result["provider"] == "tesseract"
@@ -0,0 +1,101 @@
+import asyncio
+import io
+
+from PIL import Image
+from PyPDF2 import PdfReader, PdfWriter
+
+from app.services import pdf_ocr
+from app.services.pdf_ocr import is_pdf, process_pdf
+
+
+def _text_pdf(line: str) -> bytes:
+    """Minimal one-page PDF with a Helvetica text layer."""
+    stream = f"BT /F1 12 Tf 72 720 Td ({line}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = io.BytesIO(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % i + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % o for o in offsets))
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def _scan_pdf() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("L", (200, 260), 255).save(buffer, format="PDF")
+    return buffer.getvalue()
+
+
+def _document(*parts: bytes) -> bytes:
+    writer = PdfWriter()
+    for part in parts:
+        for page in PdfReader(io.BytesIO(part)).pages:
+            writer.add_page(page)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def test_text_layer_pages_skip_ocr_and_pages_stay_in_order(monkeypatch):
+    pdf = _document(_text_pdf("TAX INVOICE No 1042 Shree Ganesh Steel Traders"), _scan_pdf(), _scan_pdf())
+    assert is_pdf(pdf)
+
+    rasterised, progress = [], []
+
+    def fake_rasterise(pdf_bytes, page_number, dpi):
+        rasterised.append((page_number, dpi))
+        return f"page-{page_number}".encode()
+
+    async def fake_ocr(image: bytes) -> dict:
+        # Later pages finish first
+        await asyncio.sleep(0.02 if image == b"page-2" else 0.0)
+        return {"text": f"scanned {image.decode()}", "lines": [{"text": "x"}], "confidence": 0.8, "provider": "tesseract"}
+
+    async def on_page(number, total, page):
+        progress.append((number, total, page["provider"]))
+
+    monkeypatch.setattr(pdf_ocr, "rasterise_page", fake_rasterise)
+    result = asyncio.run(process_pdf(pdf, fake_ocr, on_page=on_page, dpi=250))
+
+    assert sorted(rasterised) == [(2, 250), (3, 250)]
+    assert result["text"].split("\f") == [
+        "TAX INVOICE No 1042 Shree Ganesh Steel Traders", "scanned page-2", "scanned page-3",
+    ]
+    assert [p["provider"] for p in result["pages"]] == ["pdf_text", "tesseract", "tesseract"]
+    assert [line["page"] for line in result["lines"]] == [2, 3]
+    assert result["provider"] == "pdf_text+tesseract"
+    assert sorted(progress) == [(1, 3, "pdf_text"), (2, 3, "tesseract"), (3, 3, "tesseract")]
+    assert progress[-1][0] == 2  # reported as pages finish, not in page order
+
+
+def test_scanned_pages_go_to_the_batch_ocr_in_one_call(monkeypatch):
+    pdf = _document(_scan_pdf(), _text_pdf("TAX INVOICE No 1042 Shree Ganesh Steel Traders"), _scan_pdf())
+    batches, progress = [], []
+
+    async def single(image: bytes) -> dict:
+        raise AssertionError("pages should be batched")
+
+    async def batch(images):
+        batches.append(images)
+        return [{"text": f"scanned {i.decode()}", "confidence": 0.9, "provider": "azure_vision"} for i in images]
+
+    async def on_page(number, total, page):
+        progress.append(number)
+
+    monkeypatch.setattr(pdf_ocr, "rasterise_page", lambda pdf_bytes, page_number, dpi: f"page-{page_number}".encode())
+    result = asyncio.run(process_pdf(pdf, single, on_page=on_page, ocr_batch=batch))
+
+    assert batches == [[b"page-1", b"page-3"]]
+    assert result["text"].split("\f")[::2] == ["scanned page-1", "scanned page-3"]
+    assert [p["provider"] for p in result["pages"]] == ["azure_vision", "pdf_text", "azure_vision"]
+    assert sorted(progress) == [1, 2, 3]
@@ -0,0 +1,45 @@
+import asyncio
+from datetime import date
+
+import numpy as np
+
+from app.services.price_data_source import MarketPrice, PriceSeries, SimulatedDataSource, philox4x32
+
+
+def test_philox_matches_reference_vectors():
+    zero = philox4x32(np.zeros((1, 4), dtype=np.uint32), (0, 0))[0]
+    assert zero.tolist() == [0x6627E8D5, 0xE169C58D, 0xBC57AC4C, 0x9B00DBD8]
+
+    ones = philox4x32(np.full((1, 4), 0xFFFFFFFF, dtype=np.uint32), (0xFFFFFFFF, 0xFFFFFFFF))[0]
+    assert ones.tolist() == [0x408F276D, 0x41C83B0E, 0xA20BC7C6, 0x6D5451FD]
+
+
+def test_any_date_is_independent_of_window():
+    source = SimulatedDataSource()
+    end = date(2025, 8, 15)
+    long = asyncio.run(source.get_price_history("cement", "indore", 365, end_date=end))
+    short = asyncio.run(source.get_price_history("cement", "indore", 7, end_date=end))
+
+    assert len(long) == 365
+    assert long.dates[-1] == np.datetime64("2025-08-15")
+    np.testing.assert_array_equal(long.prices[-7:], short.prices)
+
+    # Random access to a single day gives the same value again
+    single = source.get_prices("cement", "indore", np.array(["2025-03-01"], dtype="datetime64[D]"))
+    idx = int(np.nonzero(long.dates == np.datetime64("2025-03-01"))[0][0])
+    assert single.prices[0] == long.prices[idx]
+
+
+def test_series_keeps_market_price_interface():
+    series = asyncio.run(SimulatedDataSource().get_price_history("steel", "patna", 10, end_date=date(2025, 7, 1)))
+
+    last = series[-1]
+    assert isinstance(last, MarketPrice)
+    assert last.date == "2025-07-01" and last.unit == "INR/Ton"
+    assert [p.date for p in series[-3:]] == ["2025-06-29", "2025-06-30", "2025-07-01"]
+
+    roundtrip = PriceSeries.from_points(list(series))
+    np.testing.assert_array_equal(roundtrip.prices, series.prices)
+    # Different series get different noise streams
+    other = asyncio.run(SimulatedDataSource().get_price_history("steel", "lucknow", 10, end_date=date(2025, 7, 1)))
+    assert not np.allclose(series.prices / 1.05, other.prices / 1.02)
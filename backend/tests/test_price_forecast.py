@@ -0,0 +1,110 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services import price_forecast
+from app.services.price_forecast import ForecastRequest, MaterialType, PriceForecastService, Region
+
+
+def test_precompute_bounds_llm_calls_and_serves_from_store(monkeypatch):
+    calls = {"in_flight": 0, "max_in_flight": 0, "total": 0}
+    saved = []
+
+    async def fake_llm(messages, temperature=0.2):
+        calls["total"] += 1
+        calls["in_flight"] += 1
+        calls["max_in_flight"] = max(calls["max_in_flight"], calls["in_flight"])
+        await asyncio.sleep(0.01)
+        calls["in_flight"] -= 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Seasonal demand."))])
+
+    async def fake_save(rows):
+        saved.extend(rows)
+        return len(rows)
+
+    monkeypatch.setattr(price_forecast.groq_service, "price_forecast", fake_llm)
+    monkeypatch.setattr(price_forecast.forecasts_repo, "save_forecasts", fake_save)
+
+    service = PriceForecastService()
+
+    async def run():
+        forecasts = await service.precompute(max_concurrency=2)
+        pairs = len(MaterialType) * len(Region)
+        assert len(forecasts) == pairs and len(saved) == pairs
+        assert calls["total"] == pairs and calls["max_in_flight"] == 2
+
+        # Requests only do the margin/quantity arithmetic
+        request = ForecastRequest(material="cement", region="indore", quantity=1000, target_margin_percent=12)
+        result = await service.generate_forecast(request)
+        assert calls["total"] == pairs
+        assert result.ai_analysis == "Seasonal demand."
+        assert result.as_of == forecasts[0].as_of
+        assert result.projected_cost_change == round(1000 * (result.forecast_price_30d - result.current_price), 2)
+        assert 0.0 <= result.margin_breach_probability <= 1.0
+
+    asyncio.run(run())
+
+
+def test_monte_carlo_risk_drives_lock_recommendation():
+    service = PriceForecastService()
+    forecast = price_forecast.PrecomputedForecast(
+        as_of="2025-01-01", material="steel", region="patna", unit="INR/Ton",
+        current_price=100.0, forecast_price_30d=101.0, forecast_lower_30d=92.0, forecast_upper_30d=110.0,
+        interval_level=0.9, log_mean_path=list(np.linspace(np.log(100.0), np.log(101.0), 30)),
+        sigma=0.01, alpha=0.3, beta=0.005, phi=0.98,
+        trend_direction="STABLE", confidence_score=0.6, ai_analysis="", historical_data=[],
+    )
+
+    def request(margin, premium=0.0):
+        return ForecastRequest(
+            material="steel", region="patna", quantity=10,
+            target_margin_percent=margin, lock_premium_percent=premium,
+        )
+
+    thin = service.apply_request(forecast, request(3))
+    wide = service.apply_request(forecast, request(25))
+
+    assert thin.margin_breach_probability > wide.margin_breach_probability
+    assert thin.lock_rate_recommendation and not wide.lock_rate_recommendation
+    assert thin.projected_cost_change == 10.0
+    # The wording follows the decision, not the (request-independent) trend commentary
+    assert thin.recommendation.startswith("LOCK: there is a") and "3% margin" in thin.recommendation
+    assert wide.recommendation.startswith("WAIT:")
+
+    risk = wide.risk
+    assert risk.simulations == 20_000 and risk.horizon_days == 30
+    assert risk.touch_probability >= risk.breach_probability
+    assert risk.lock_cost == 1000.0 and risk.lock_var_95 == 0.0
+    assert risk.wait_cvar_95 >= risk.wait_var_95 > 0
+    assert risk.price_percentiles["p5"] < 101.0 < risk.price_percentiles["p95"]
+    # Same forecast and request -> same simulated figures
+    assert service.apply_request(forecast, request(25)).risk == risk
+    # A lock premium shows up as the lock-side overrun
+    assert service.apply_request(forecast, request(25, premium=1.0)).risk.lock_var_95 == 10.0
+
+
+def test_outdated_stored_payloads_are_rebuilt(monkeypatch):
+    saved = []
+
+    async def fake_llm(messages, temperature=0.2):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Rebuilt."))])
+
+    async def old_rows():
+        # A payload stored before the model state fields existed
+        return [{"as_of": price_forecast.ist_today().isoformat(), "material": "steel", "region": "patna",
+                 "unit": "INR/Ton", "current_price": 100.0, "forecast_price_30d": 101.0}]
+
+    async def fake_save(rows):
+        saved.extend(rows)
+        return len(rows)
+
+    monkeypatch.setattr(price_forecast.groq_service, "price_forecast", fake_llm)
+    monkeypatch.setattr(price_forecast.forecasts_repo, "get_latest_forecasts", old_rows)
+    monkeypatch.setattr(price_forecast.forecasts_repo, "save_forecasts", fake_save)
+
+    service = PriceForecastService()
+    request = ForecastRequest(material="steel", region="patna", quantity=10)
+    result = asyncio.run(service.generate_forecast(request))
+    assert result.ai_analysis == "Rebuilt."
+    assert [row["payload_version"] for row in saved] == [price_forecast.FORECAST_PAYLOAD_VERSION]
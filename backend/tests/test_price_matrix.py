@@ -0,0 +1,42 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.core.auth import get_current_user
+from app.main import app
+from app.services.market_data import MarketDataService
+
+
+def test_matrix_matches_per_pair_history():
+    service = MarketDataService()
+    materials, regions = ["steel", "sand"], ["patna", "indore", "delhi_ncr"]
+
+    async def run():
+        matrix = await service.get_price_matrix(materials, regions)
+        singles = [await service.get_price_history(m, r, days=8) for m in materials for r in regions]
+        return matrix, singles
+
+    matrix, singles = asyncio.run(run())
+    assert len(matrix["prices"]) == 6 and matrix["data_date"] == matrix["as_of"]
+    for cell, single in zip(matrix["prices"], singles):
+        assert cell["current_price"] == single["current_price"]
+        assert cell["change_7d_percent"] == single["change_7d_percent"]
+        assert cell["trend"] == single["trend"] and cell["unit"] == single["unit"]
+
+
+def test_price_matrix_endpoint_revalidates_with_etag():
+    app.dependency_overrides[get_current_user] = lambda: {"uid": "dashboard"}
+    try:
+        client = TestClient(app)
+        first = client.get("/api/v1/forecast/price-matrix")
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert len(first.json()["prices"]) == len(first.json()["materials"]) * len(first.json()["regions"])
+
+        again = client.get("/api/v1/forecast/price-matrix", headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.headers["etag"] == etag and not again.content
+
+        stale = client.get("/api/v1/forecast/price-matrix", headers={"If-None-Match": '"old"'})
+        assert stale.status_code == 200
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
@@ -0,0 +1,40 @@
+import asyncio
+from datetime import date
+
+import numpy as np
+
+from app.services.price_data_source import SimulatedDataSource
+from app.services.price_store import PriceStore
+
+
+def test_range_reads_changes_and_rollups(tmp_path):
+    store = PriceStore(str(tmp_path))
+    source = SimulatedDataSource()
+    end = date(2025, 3, 31)
+    full = asyncio.run(source.get_price_history("sand", "patna", 120, end_date=end))
+
+    # Write in two overlapping pieces; the store merges them into one series
+    store.write("sand", "patna", full[:80])
+    store.write("sand", "patna", full[60:])
+    assert store.coverage("sand", "patna") == (date(2024, 12, 2), end)
+
+    window = store.read("sand", "patna", date(2025, 3, 1), end)
+    np.testing.assert_array_equal(window.prices, full.prices[-31:])
+    assert window.dates[0] == np.datetime64("2025-03-01")
+    assert store.read("sand", "patna", date(2024, 11, 1), end) is None
+
+    changes = store.changes("sand", "patna", end)
+    assert np.isclose(changes[7], full.prices[-1] / full.prices[-8] - 1, rtol=1e-6)
+    assert np.isclose(changes[90], full.prices[-1] / full.prices[-91] - 1, rtol=1e-6)
+
+    months = store.rollup("sand", "patna", "month")
+    assert [str(m) for m in months["period_start"]] == ["2024-12-01", "2025-01-01", "2025-02-01", "2025-03-01"]
+    march = full.prices[-31:]
+    assert months[-1]["days"] == 31
+    assert months[-1]["open"] == march[0] and months[-1]["close"] == march[-1]
+    assert np.isclose(months[-1]["mean"], march.mean())
+
+    weeks = store.rollup("sand", "patna", "week", start=date(2025, 3, 1))
+    # Weekly buckets start on Mondays
+    assert all(np.datetime64(w, "D").astype(object).weekday() == 0 for w in weeks["period_start"])
+    assert weeks["days"].tolist() == [7, 7, 7, 7, 1]
@@ -0,0 +1,43 @@
+"""
+Tests for supplier performance profiles used by the award engine.
+Run with: pytest backend/tests/test_supplier_performance.py -v
+"""
+from app.services.supplier_performance import (
+    SupplierProfile,
+    to_engine_bid,
+    DEFAULT_REPUTATION,
+    DEFAULT_DELIVERY_DAYS,
+)
+
+
+def test_new_supplier_gets_neutral_defaults():
+    bid = to_engine_bid({"id": 7, "contractor_name": "New Co", "amount": "1500.00"})
+    assert bid.reputation_score == DEFAULT_REPUTATION
+    assert bid.delivery_days == DEFAULT_DELIVERY_DAYS
+    assert bid.is_verified is False
+
+
+def test_profile_drives_delivery_and_reputation_deterministically():
+    profile = SupplierProfile(
+        supplier_name="Reliable Ltd",
+        awards_count=10,
+        deliveries_count=10,
+        on_time_count=9,
+        total_delivery_days=55,
+    )
+    row = {"id": 1, "contractor_name": "Reliable Ltd", "amount": 100.0}
+
+    first = to_engine_bid(row, profile)
+    second = to_engine_bid(row, profile)
+
+    assert first == second
+    assert first.delivery_days == 6  # round(5.5) from history
+    assert first.reputation_score == 7.9  # (9 + 2) / (10 + 4) * 10
+    assert to_engine_bid({**row, "delivery_days": 3}, profile).delivery_days == 3
+
+
+def test_disputes_lower_reputation():
+    clean = SupplierProfile(supplier_name="A", awards_count=4, deliveries_count=4, on_time_count=4, total_delivery_days=20)
+    disputed = clean.model_copy(update={"dispute_count": 2})
+    assert disputed.reputation_score < clean.reputation_score
+    assert 0.0 <= disputed.reputation_score <= 10.0
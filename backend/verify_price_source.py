@@ -12,7 +12,7 @@ async def verify_market_data():
     
     # 1. Test Steel in Patna
     print("\nFetching Steel prices for Patna (30 days)...")
-    data = market_data_service.get_price_history("steel", "patna", days=30)
+    data = await market_data_service.get_price_history("steel", "patna", days=30)
     
     print(f"Current Price: {data['current_price']} {data['unit']}")
     print(f"Trend: {data['trend']}")
@@ -24,7 +24,7 @@ async def verify_market_data():
 
     # 2. Test Determinism
     print("\nFetching AGAIN to verify determinism...")
-    data2 = market_data_service.get_price_history("steel", "patna", days=30)
+    data2 = await market_data_service.get_price_history("steel", "patna", days=30)
     
     if data['current_price'] == data2['current_price']:
         print("SUCCESS: Prices are consistent (Deterministic).")
@@ -0,0 +1,125 @@
+# Benchmark Script for the BuildBidz Award Engine fast path
+# Compares memory and latency of the pydantic-per-bid path against the
+# orjson -> BidTable (struct-of-arrays) path for very large comparisons.
+#
+# Usage: python verify_award_fastpath.py [num_bids]
+
+import sys
+import os
+import time
+import random
+import tracemalloc
+from typing import Any, Dict, List
+
+import orjson
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from app.services.award_engine import award_engine, load_bid_table, Bid, AwardCriteria
+from app.api.v1.endpoints.award import CompareBidsRequest
+
+
+def make_payload(n: int) -> bytes:
+    rng = random.Random(42)
+    bids = [
+        {
+            "id": f"bid_{i}",
+            "supplier_name": f"Supplier {i}",
+            "price": round(rng.uniform(80000, 150000), 2),
+            "delivery_days": rng.randint(2, 30),
+            "reputation_score": round(rng.uniform(3.0, 10.0), 1),
+            "is_verified": rng.random() > 0.5,
+            "notes": None,
+        }
+        for i in range(n)
+    ]
+    return orjson.dumps({"requirement_description": "TMT steel, 500 tons", "bids": bids})
+
+
+def legacy_calculate_scores(bids: List[Bid], criteria: AwardCriteria) -> List[Dict[str, Any]]:
+    """The original per-bid loop, kept here as the benchmark baseline."""
+    prices = [b.price for b in bids]
+    min_price, max_price = min(prices), max(prices)
+    price_range = max_price - min_price if max_price != min_price else 1
+    deliveries = [b.delivery_days for b in bids]
+    min_delivery, max_delivery = min(deliveries), max(deliveries)
+    delivery_range = max_delivery - min_delivery if max_delivery != min_delivery else 1
+
+    scored_bids = []
+    for bid in bids:
+        price_score = 100 * (1 - (bid.price - min_price) / price_range)
+        delivery_score = 100 * (1 - (bid.delivery_days - min_delivery) / delivery_range)
+        reputation_score = bid.reputation_score * 10
+        final_score = (
+            criteria.weight_price * price_score
+            + criteria.weight_delivery * delivery_score
+            + criteria.weight_reputation * reputation_score
+        )
+        scored_bids.append({
+            "bid": bid,
+            "scores": {
+                "price_raw": bid.price,
+                "price_score": round(price_score, 1),
+                "delivery_raw": bid.delivery_days,
+                "delivery_score": round(delivery_score, 1),
+                "reputation_raw": bid.reputation_score,
+                "reputation_score": round(reputation_score, 1),
+                "total": round(final_score, 1),
+            },
+        })
+    return sorted(scored_bids, key=lambda x: x["scores"]["total"], reverse=True)
+
+
+def legacy_path(payload: bytes) -> bytes:
+    request = CompareBidsRequest.model_validate_json(payload)
+    ranked = legacy_calculate_scores(request.bids, request.criteria)
+    rankings = [
+        {"rank": i + 1, "supplier": r["bid"].supplier_name, "total_score": r["scores"]["total"], "breakdown": r["scores"]}
+        for i, r in enumerate(ranked)
+    ]
+    return orjson.dumps({"ranked_bids": [{"bid": r["bid"].model_dump(), "scores": r["scores"]} for r in ranked], "rankings": rankings})
+
+
+def fast_path(payload: bytes) -> bytes:
+    data = orjson.loads(payload)
+    table = load_bid_table(data["bids"])
+    scored = award_engine.score_table(table, AwardCriteria.model_validate(data.get("criteria") or {}))
+    return orjson.dumps({"ranked_bids": list(scored.iter_rows()), "rankings": scored.rankings()})
+
+
+def measure(name: str, func, payload: bytes, repeats: int = 3) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(payload)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(timings)
+    print(f"{name:<28} best {best * 1000:8.1f} ms   peak {peak / 1_048_576:8.1f} MiB")
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    payload = make_payload(n)
+    print(f"Award Engine fast-path benchmark: {n} bids, {len(payload) / 1_048_576:.1f} MiB payload\n")
+
+    # Both paths must agree on the ranking before timings mean anything
+    legacy = orjson.loads(legacy_path(payload))["rankings"]
+    fast = orjson.loads(fast_path(payload))["rankings"]
+    same = [r["total_score"] for r in legacy] == [r["total_score"] for r in fast]
+    print(f"{'✅ PASS' if same else '❌ FAIL'} - rankings identical\n")
+
+    legacy_s = measure("pydantic per-bid (legacy)", legacy_path, payload)
+    fast_s = measure("orjson + BidTable (fast)", fast_path, payload)
+    print(f"\nSpeed-up: {legacy_s / fast_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()